@@ -9,8 +9,18 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# Every request runs on a thread of its own, so persistent connections would be left open by finished threads
+for database in settings.DATABASES.values():
+    database['CONN_MAX_AGE'] = 0
+
+# Serve the static files like runserver does during development
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
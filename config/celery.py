@@ -1,6 +1,7 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from django.conf import settings
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
@@ -8,4 +9,9 @@ app = Celery('config')
 
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
-app.autodiscover_tasks()
+# Discovery is deferred until the worker or beat imports its default modules, after the Django fixup has set up
+# the apps, and only the project's own apps are searched for task modules.
+app.autodiscover_tasks(lambda: settings.USER_APPS)
+
+# Celery signal hooks recording the queue latency, run time and retries of the tasks
+from config import task_metrics  # noqa: E402,F401
@@ -0,0 +1,305 @@
+import hmac
+import threading
+from collections import defaultdict
+
+import redis
+from django.conf import settings
+from django.http import HttpResponse, Http404
+from django.utils.module_loading import import_string
+
+# Upper bounds in seconds of the histogram buckets, from fast requests to the weekly mail fan-out
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+class InMemoryMetricsBackend:
+    """
+    Process-local metric values, a stand-in for Redis in tests and local development.
+
+    Attributes:
+        location: Unused, accepted for compatibility with the Redis backend.
+    """
+
+    def __init__(self, location=None):
+        self.location = location
+        self._lock = threading.Lock()
+        self._values = defaultdict(float)
+
+    def increment(self, amounts):
+        """
+        Adds amounts to series.
+
+        Args:
+            amounts (dict): The amounts keyed by series.
+        """
+        with self._lock:
+            for series, amount in amounts.items():
+                self._values[series] += amount
+
+    def read(self):
+        """
+        Returns the values of all series.
+
+        Returns:
+            dict: The values keyed by series.
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self):
+        """
+        Drops all values.
+        """
+        with self._lock:
+            self._values.clear()
+
+
+class RedisMetricsBackend:
+    """
+    Metric values shared by the Celery workers, the web workers enqueuing emails and /metrics/, stored in one Redis
+    hash.
+
+    Every series is a field incremented with HINCRBYFLOAT, so the processes never overwrite each other.
+
+    Attributes:
+        client (redis.Redis): The Redis client.
+    """
+    KEY = 'metrics'
+
+    def __init__(self, location):
+        self.client = redis.Redis.from_url(location)
+
+    def increment(self, amounts):
+        """
+        Adds amounts to series in one round trip.
+
+        Metrics are best effort: if Redis is unavailable the amounts are dropped instead of failing the request or
+        the task being measured.
+
+        Args:
+            amounts (dict): The amounts keyed by series.
+        """
+        pipeline = self.client.pipeline(transaction=False)
+        for series, amount in amounts.items():
+            pipeline.hincrbyfloat(self.KEY, series, amount)
+        try:
+            pipeline.execute()
+        except redis.RedisError:
+            pass
+
+    def read(self):
+        """
+        Returns the values of all series.
+
+        Returns:
+            dict: The values keyed by series.
+        """
+        return {series.decode(): float(value) for series, value in self.client.hgetall(self.KEY).items()}
+
+    def clear(self):
+        """
+        Drops all values.
+        """
+        self.client.delete(self.KEY)
+
+
+_backends = {}
+
+
+def get_metrics_backend():
+    """
+    Returns the metrics backend configured by METRICS_BACKEND and METRICS_LOCATION.
+
+    Returns:
+        The metrics backend instance, shared by the process.
+    """
+    key = (settings.METRICS_BACKEND, settings.METRICS_LOCATION)
+    if key not in _backends:
+        _backends[key] = import_string(settings.METRICS_BACKEND)(settings.METRICS_LOCATION)
+    return _backends[key]
+
+
+def _series(name, labels):
+    """
+    Returns the Prometheus series name of a metric with labels.
+
+    Args:
+        name (str): The metric name.
+        labels (dict): The label values.
+
+    Returns:
+        str: The series, e.g. 'name{task="users.tasks.notice_for_users"}'.
+    """
+    if not labels:
+        return name
+    pairs = ','.join(
+        '{}="{}"'.format(label, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for label, value in labels.items()
+    )
+    return f'{name}{{{pairs}}}'
+
+
+class Metric:
+    """
+    Base class of the metrics, registered for the /metrics/ endpoint on creation.
+
+    Attributes:
+        name (str): The metric name.
+        documentation (str): The help text.
+        labelnames (tuple): The names of the labels every observation must carry.
+    """
+    type = None
+    registry = []
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry.append(self)
+
+    def _labels(self, labels):
+        """
+        Checks the labels of an observation and puts them in the declared order.
+
+        Args:
+            labels (dict): The label values.
+
+        Returns:
+            dict: The ordered label values.
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects the labels {", ".join(self.labelnames) or "(none)"}')
+        return {label: labels[label] for label in self.labelnames}
+
+    def samples(self, values):
+        """
+        Returns the stored series of the metric with their values, in exposition order.
+
+        Args:
+            values (dict): The values of all series keyed by series.
+
+        Returns:
+            list: Tuples of series and value.
+        """
+        return sorted((series, value) for series, value in values.items() if series.split('{', 1)[0] == self.name)
+
+
+class Counter(Metric):
+    """
+    A counter that only goes up, e.g. the number of sent emails.
+    """
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """
+        Increments the counter.
+
+        Args:
+            amount (float): The increment.
+            **labels: The label values.
+        """
+        if amount:
+            get_metrics_backend().increment({_series(self.name, self._labels(labels)): amount})
+
+
+class Histogram(Metric):
+    """
+    A histogram of observed values, e.g. durations, with cumulative buckets, a sum and a count.
+
+    Attributes:
+        buckets (tuple): The upper bounds of the buckets.
+    """
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        """
+        Records an observation in one backend round trip.
+
+        Args:
+            value (float): The observed value.
+            **labels: The label values.
+        """
+        labels = self._labels(labels)
+        amounts = {
+            _series(f'{self.name}_bucket', {**labels, 'le': bound}): 1
+            for bound in self.buckets if value <= bound
+        }
+        amounts[_series(f'{self.name}_bucket', {**labels, 'le': '+Inf'})] = 1
+        amounts[_series(f'{self.name}_sum', labels)] = value
+        amounts[_series(f'{self.name}_count', labels)] = 1
+        get_metrics_backend().increment(amounts)
+
+    def samples(self, values):
+        """
+        Returns the buckets, the sum and the count of every observed label set, in exposition order.
+
+        Buckets that never received an observation are exposed as zero, so every label set has all buckets.
+
+        Args:
+            values (dict): The values of all series keyed by series.
+
+        Returns:
+            list: Tuples of series and value.
+        """
+        count_name = f'{self.name}_count'
+        samples = []
+        for count_series in sorted(series for series in values if series.split('{', 1)[0] == count_name):
+            labels = count_series[len(count_name) + 1:-1]
+            for bound in (*self.buckets, '+Inf'):
+                bucket_labels = f'{labels},le="{bound}"' if labels else f'le="{bound}"'
+                bucket_series = f'{self.name}_bucket{{{bucket_labels}}}'
+                samples.append((bucket_series, values.get(bucket_series, 0.0)))
+            sum_series = f'{self.name}_sum' + count_series[len(count_name):]
+            samples += [(sum_series, values.get(sum_series, 0.0)), (count_series, values[count_series])]
+        return samples
+
+
+def render_metrics():
+    """
+    Renders all registered metrics in the Prometheus text exposition format.
+
+    Returns:
+        str: The exposition.
+    """
+    values = get_metrics_backend().read()
+    lines = []
+    for metric in Metric.registry:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for series, value in metric.samples(values):
+            lines.append(f'{series} {int(value) if value.is_integer() else value!r}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Serves the metrics of the Celery tasks and the email outbox to the Prometheus scraper.
+
+    The scraper authenticates with 'Authorization: Bearer <METRICS_TOKEN>'; without a configured token the
+    endpoint does not exist.
+
+    Args:
+        request: The request object.
+
+    Returns:
+        HttpResponse: The metrics in the Prometheus text format, status 401 for a wrong token.
+    """
+    if not settings.METRICS_TOKEN:
+        raise Http404
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        return HttpResponse('Invalid metrics token.', status=401, content_type='text/plain')
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+TASKS_TOTAL = Counter('celery_tasks_total', 'Finished Celery tasks by final state.', ('task', 'state'))
+TASK_RETRIES_TOTAL = Counter('celery_task_retries_total', 'Retries requested by Celery tasks.', ('task',))
+TASK_QUEUE_SECONDS = Histogram('celery_task_queue_seconds', 'Time Celery tasks waited between publishing and start.',
+                               ('task',))
+TASK_RUNTIME_SECONDS = Histogram('celery_task_runtime_seconds', 'Run time of Celery tasks.', ('task',))
+EMAILS_ENQUEUED_TOTAL = Counter('emails_enqueued_total', 'Emails put into the outbox.')
+EMAILS_SENT_TOTAL = Counter('emails_sent_total', 'Emails delivered from the outbox.')
+EMAILS_FAILED_TOTAL = Counter('emails_failed_total', 'Failed email delivery attempts.')
@@ -0,0 +1,485 @@
+import hashlib
+import re
+import zlib
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.module_loading import import_string
+
+from educational_modules.profiling import capture_profile, profiling_user, requested_profile
+
+try:
+    import brotli
+except ImportError:  # brotli is an optional extra; without it only gzip is offered
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+accept_encoding_re = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+class GzipCompressor:
+    """
+    Incremental gzip compressor.
+    """
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        """
+        Compresses a chunk and flushes it, so the client can decode it right away.
+
+        Args:
+            data (bytes): The chunk.
+
+        Returns:
+            bytes: The compressed chunk.
+        """
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        """
+        Ends the stream.
+
+        Returns:
+            bytes: The remaining compressed data.
+        """
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    """
+    Incremental brotli compressor.
+    """
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data):
+        """
+        Compresses a chunk and flushes it, so the client can decode it right away.
+
+        Args:
+            data (bytes): The chunk.
+
+        Returns:
+            bytes: The compressed chunk.
+        """
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        """
+        Ends the stream.
+
+        Returns:
+            bytes: The remaining compressed data.
+        """
+        return self._compressor.finish()
+
+
+COMPRESSORS = {'gzip': GzipCompressor}
+if brotli is not None:
+    COMPRESSORS = {'br': BrotliCompressor, **COMPRESSORS}
+
+
+def compress(encoding, data):
+    """
+    Compresses a whole body.
+
+    Args:
+        encoding (str): The content coding, 'br' or 'gzip'.
+        data (bytes): The body.
+
+    Returns:
+        bytes: The compressed body.
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def choose_encoding(accept_encoding):
+    """
+    Picks the content coding from an Accept-Encoding header, preferring brotli over gzip.
+
+    Args:
+        accept_encoding (str): The header value.
+
+    Returns:
+        str | None: The content coding, or None if the client accepts none of the available ones.
+    """
+    accepted = {}
+    for item in accept_encoding.split(','):
+        match = accept_encoding_re.match(item)
+        if match is None:
+            continue
+        try:
+            quality = float(match[2]) if match[2] is not None else 1.0
+        except ValueError:
+            continue
+        accepted[match[1].lower()] = quality
+    for encoding in COMPRESSORS:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses responses with brotli or gzip, whichever the client prefers and the server supports.
+
+    Bodies shorter than COMPRESSION_MIN_SIZE and content types outside COMPRESSION_CONTENT_TYPES are sent as is.
+    Compressed bodies of at least COMPRESSION_CACHE_MIN_SIZE bytes are kept in the cache, keyed by the hash of the
+    uncompressed body, so the same large response is compressed only once. Streaming responses are compressed
+    chunk by chunk; event streams are left alone.
+    """
+
+    def is_compressible(self, response):
+        """
+        Checks whether a response should be compressed.
+
+        Args:
+            response: The response object.
+
+        Returns:
+            bool: True if the response should be compressed.
+        """
+        if response.has_header('Content-Encoding'):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type == 'text/event-stream':
+            return False
+        if not content_type.startswith(tuple(settings.COMPRESSION_CONTENT_TYPES)):
+            return False
+        return response.streaming or len(response.content) >= settings.COMPRESSION_MIN_SIZE
+
+    def compress_content(self, encoding, content):
+        """
+        Compresses a body, reusing the cached result for large bodies.
+
+        Args:
+            encoding (str): The content coding.
+            content (bytes): The body.
+
+        Returns:
+            bytes: The compressed body.
+        """
+        if len(content) < settings.COMPRESSION_CACHE_MIN_SIZE:
+            return compress(encoding, content)
+        key = f'compressed:{encoding}:{hashlib.sha1(content).hexdigest()}:{len(content)}'
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = compress(encoding, content)
+            cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+        return compressed
+
+    @staticmethod
+    def compress_stream(encoding, chunks):
+        """
+        Compresses the chunks of a streaming response.
+
+        Args:
+            encoding (str): The content coding.
+            chunks: The iterator of chunks.
+
+        Yields:
+            bytes: The compressed chunks.
+        """
+        compressor = COMPRESSORS[encoding]()
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+    @staticmethod
+    async def acompress_stream(encoding, chunks):
+        """
+        Compresses the chunks of an asynchronous streaming response.
+
+        Args:
+            encoding (str): The content coding.
+            chunks: The asynchronous iterator of chunks.
+
+        Yields:
+            bytes: The compressed chunks.
+        """
+        compressor = COMPRESSORS[encoding]()
+        async for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+    def process_response(self, request, response):
+        """
+        Compresses the response if the client accepts it.
+
+        Args:
+            request: The request object.
+            response: The response object.
+
+        Returns:
+            The response, compressed if applicable.
+        """
+        if not self.is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.acompress_stream(encoding, response.streaming_content)
+            else:
+                response.streaming_content = self.compress_stream(encoding, response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed = self.compress_content(encoding, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The compressed representation is a different one, so a strong ETag must not match it
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+class RouteMiddleware:
+    """
+    Runs the ROUTED_MIDDLEWARE only for requests under one of the ROUTED_MIDDLEWARE_PATHS.
+
+    The API authenticates with JWT and needs no session, CSRF, authentication or messages middleware, while the
+    admin does. Routed requests pass through the nested middleware chain, including their process_view and
+    process_exception hooks; other requests go straight to the next middleware. Under ASGI the hooks are
+    coroutines, so requests outside the routed paths do not pay a thread hop for them.
+
+    Attributes:
+        get_response: The next middleware or the view handler.
+        middleware (list): The instances of the routed middleware, outermost first.
+        routed_response: The nested middleware chain.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.middleware = []
+        handler = get_response
+        for middleware_path in reversed(settings.ROUTED_MIDDLEWARE):
+            instance = import_string(middleware_path)(handler)
+            self.middleware.insert(0, instance)
+            handler = convert_exception_to_response(instance)
+        self.routed_response = handler
+        self.view_hooks = [instance.process_view for instance in self.middleware
+                           if hasattr(instance, 'process_view')]
+        self.exception_hooks = [instance.process_exception for instance in reversed(self.middleware)
+                                if hasattr(instance, 'process_exception')]
+
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            self.process_view = self._aprocess_view
+            self.process_exception = self._aprocess_exception
+
+    @staticmethod
+    def is_routed(request):
+        """
+        Checks whether a request goes through the routed middleware.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            bool: True if the path starts with one of the ROUTED_MIDDLEWARE_PATHS, False otherwise.
+        """
+        return request.path_info.startswith(tuple(settings.ROUTED_MIDDLEWARE_PATHS))
+
+    def __call__(self, request):
+        """
+        Passes the request through the routed middleware or straight to the next middleware.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            HttpResponse: The response, or a coroutine returning it under ASGI.
+        """
+        if self.async_mode:
+            return self.__acall__(request)
+        if self.is_routed(request):
+            return self.routed_response(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        """
+        Async version of __call__.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        if self.is_routed(request):
+            return await self.routed_response(request)
+        return await self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Runs the process_view hooks of the routed middleware.
+
+        Args:
+            request: The request object.
+            view_func: The view.
+            view_args (tuple): The positional arguments of the view.
+            view_kwargs (dict): The keyword arguments of the view.
+
+        Returns:
+            HttpResponse | None: The response of the first hook returning one.
+        """
+        if self.is_routed(request):
+            for hook in self.view_hooks:
+                response = hook(request, view_func, view_args, view_kwargs)
+                if response is not None:
+                    return response
+        return None
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Async version of process_view.
+
+        Args:
+            request: The request object.
+            view_func: The view.
+            view_args (tuple): The positional arguments of the view.
+            view_kwargs (dict): The keyword arguments of the view.
+
+        Returns:
+            HttpResponse | None: The response of the first hook returning one.
+        """
+        if self.is_routed(request):
+            return await sync_to_async(RouteMiddleware.process_view, thread_sensitive=True)(
+                self, request, view_func, view_args, view_kwargs)
+        return None
+
+    def process_exception(self, request, exception):
+        """
+        Runs the process_exception hooks of the routed middleware, innermost first.
+
+        Args:
+            request: The request object.
+            exception (Exception): The exception raised by the view.
+
+        Returns:
+            HttpResponse | None: The response of the first hook returning one.
+        """
+        if self.is_routed(request):
+            for hook in self.exception_hooks:
+                response = hook(request, exception)
+                if response is not None:
+                    return response
+        return None
+
+    async def _aprocess_exception(self, request, exception):
+        """
+        Async version of process_exception.
+
+        Args:
+            request: The request object.
+            exception (Exception): The exception raised by the view.
+
+        Returns:
+            HttpResponse | None: The response of the first hook returning one.
+        """
+        if self.is_routed(request):
+            return await sync_to_async(RouteMiddleware.process_exception, thread_sensitive=True)(
+                self, request, exception)
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the requests of superusers who ask for it with the PROFILE_HEADER header or PROFILE_QUERY_PARAMETER.
+
+    'X-Profile: 1' runs the request under cProfile, 'X-Profile: memory' also traces the allocations with
+    tracemalloc. The profiles are stored as RequestProfile objects, browsed and downloaded in the admin. Requests
+    without the flag only pass a header lookup; the user is looked up only for flagged requests, and flags of other
+    users are ignored.
+
+    Under ASGI a profiled request is run synchronously on one thread, like under WSGI, because cProfile only sees
+    the thread it was enabled on.
+
+    Attributes:
+        get_response: The next middleware or the view handler.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def profile(self, request, mode, get_response):
+        """
+        Profiles the request if a superuser asked for it.
+
+        Args:
+            request: The request object.
+            mode (str): The requested profile, PROFILE_CPU or PROFILE_MEMORY.
+            get_response: The synchronous next middleware or view handler.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        user = profiling_user(request)
+        if user is None:
+            return get_response(request)
+        return capture_profile(request, get_response, mode, user)
+
+    def __call__(self, request):
+        """
+        Passes the request on, profiling it if a superuser asked for it.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            HttpResponse: The response, or a coroutine returning it under ASGI.
+        """
+        if self.async_mode:
+            return self.__acall__(request)
+        mode = requested_profile(request)
+        if mode is None:
+            return self.get_response(request)
+        return self.profile(request, mode, self.get_response)
+
+    async def __acall__(self, request):
+        """
+        Async version of __call__.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        mode = requested_profile(request)
+        if mode is None:
+            return await self.get_response(request)
+        return await sync_to_async(self.profile, thread_sensitive=True)(request, mode,
+                                                                        async_to_sync(self.get_response))
@@ -0,0 +1,38 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer that encodes with orjson and produces the same bytes as DRF's JSONRenderer.
+
+    Dates, times and types orjson does not know are passed to DRF's JSON encoder, so they keep DRF's format.
+    Indented output and data orjson rejects, such as integers wider than 64 bits, are rendered by JSONRenderer.
+    """
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders the data into JSON.
+
+        Args:
+            data: The data to render.
+            accepted_media_type (str): The accepted media type.
+            renderer_context (dict): The renderer context.
+
+        Returns:
+            bytes: The rendered JSON.
+        """
+        if data is None:
+            return b''
+        if (self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder.default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, to keep the output a strict JavaScript subset
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,108 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import _SpecRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+from rest_framework.response import Response
+
+# API documentation for project
+schema_info = openapi.Info(
+    title="Educational Modules API Documentation",
+    default_version='v1',
+    description="API Documentation for App Educational Modules",
+    terms_of_service="https://www.example.com/policies/terms/",
+    contact=openapi.Contact(email="pavelakulich1999@gmail.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+BaseSchemaView = get_schema_view(
+    schema_info,
+    public=True,
+    permission_classes=[permissions.AllowAny],
+)
+
+
+def generate_schema(url=None):
+    """
+    Introspects all API views and returns the OpenAPI document as JSON.
+
+    Args:
+        url (str): The base URL of the API written into the document, if any.
+
+    Returns:
+        bytes: The encoded OpenAPI document.
+    """
+    generator = OpenAPISchemaGenerator(schema_info, url=url)
+    return OpenAPICodecJson(validators=[]).encode(generator.get_schema(request=None, public=True))
+
+
+class PrecomputedSchemaView(BaseSchemaView):
+    """
+    Schema view that serves the OpenAPI document generated at deploy time by the generate_schema command.
+
+    The JSON document is read from OPENAPI_SCHEMA_PATH and served with an ETag and long-lived cache headers.
+    If the file is missing, the schema is generated on the first request and memoized for the process.
+    The docs pages themselves only render the UI shell, which does not introspect the views.
+    """
+    _file_cache = {}
+    _schema_cache = {}
+
+    @classmethod
+    def _read_schema_file(cls):
+        """
+        Returns the precomputed document and its ETag, re-reading the file only when it changes.
+
+        Returns:
+            tuple | None: The document bytes and the ETag, or None if the file does not exist.
+        """
+        path = settings.OPENAPI_SCHEMA_PATH
+        try:
+            modified = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = cls._file_cache.get(path)
+        if cached is None or cached[0] != modified:
+            with open(path, 'rb') as schema_file:
+                content = schema_file.read()
+            cached = (modified, content, f'"{hashlib.sha256(content).hexdigest()}"')
+            cls._file_cache[path] = cached
+        return cached[1], cached[2]
+
+    def get(self, request, version='', format=None):
+        """
+        Returns the precomputed document for JSON requests, or the memoized schema otherwise.
+
+        Args:
+            request: The request object.
+            version (str): The API version.
+            format (str): The requested format.
+
+        Returns:
+            HttpResponse: The OpenAPI document or the docs page.
+        """
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, _SpecRenderer):
+            return super().get(request, version, format)
+
+        precomputed = self._read_schema_file() if renderer.format in ('json', 'openapi') else None
+        if precomputed is None:
+            key = request.version or version or ''
+            if key not in self._schema_cache:
+                self._schema_cache[key] = super().get(request, version, format).data
+            return Response(self._schema_cache[key])
+
+        content, etag = precomputed
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content, content_type=renderer.media_type)
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+        return response
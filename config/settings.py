@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import os
 from datetime import timedelta
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -58,14 +59,32 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + USER_APPS
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'config.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'config.middleware.RouteMiddleware',
+    'config.middleware.ProfilingMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Middleware run by RouteMiddleware only for the paths below; the API authenticates with JWT and skips it
+ROUTED_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+ROUTED_MIDDLEWARE_PATHS = ('/admin/',)
+
+# Superusers profile a request by sending the header or the query parameter, '1' for cProfile or 'memory' to also
+# trace allocations; the last PROFILE_KEEP profiles are kept
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_PARAMETER = '_profile'
+PROFILE_KEEP = 100
+PROFILE_SUMMARY_LINES = 40
+
+# The admin checks look for its middleware in MIDDLEWARE, which now only holds RouteMiddleware
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
 
 ROOT_URLCONF = 'config.urls'
 
@@ -108,7 +127,11 @@ DATABASES = {
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'HOST': os.getenv('DB_DOCKER'),
-        'PASSWORD': os.getenv('DB_PASSWORD')
+        'PASSWORD': os.getenv('DB_PASSWORD'),
+        # Seconds a connection is kept open between the requests of a WSGI worker, so the connection opened by the
+        # warm-up serves traffic; config.asgi turns it off, as Django opens a connection per request under ASGI
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE') or 60),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -149,6 +172,28 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# How protected media is sent: '' streams it from Django, 'nginx' hands it to the internal location
+# MEDIA_ACCEL_LOCATION with X-Accel-Redirect and 'apache' to mod_xsendfile with X-Sendfile
+MEDIA_ACCEL = os.getenv('MEDIA_ACCEL', '')
+MEDIA_ACCEL_LOCATION = os.getenv('MEDIA_ACCEL_LOCATION', '/protected-media/')
+# Period in seconds the signed media URLs are built for; a URL stays the same during a period and is valid for one
+# to two periods
+MEDIA_URL_MAX_AGE = 60 * 60
+
+# Uploads are named by the hash of their content, so identical previews and avatars are stored once
+STORAGES = {
+    'default': {
+        'BACKEND': 'config.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# OpenAPI document generated by the generate_schema command and served by the docs endpoints
+OPENAPI_SCHEMA_PATH = os.getenv('OPENAPI_SCHEMA_PATH', os.path.join(BASE_DIR, 'openapi.json'))
+OPENAPI_SCHEMA_MAX_AGE = 60 * 60 * 24
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -159,13 +204,22 @@ AUTH_USER_MODEL = 'users.User'
 # Settings for authentication DRF
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.JWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.ORJSONRenderer',
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    ],
 }
 
+# Lists longer than this use the PostgreSQL planner estimate instead of an exact COUNT(*)
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = 100000
+# How long the table sizes read from pg_class are cached; smaller tables are counted exactly without EXPLAIN
+PAGINATION_TABLE_SIZE_CACHE_TIMEOUT = 60 * 5
+
 # Settings for token expiration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=50000),
@@ -190,6 +244,14 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_USE_SSL = True
 
+# Settings for the email outbox
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_BATCHES = 50
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_RETRY_BACKOFF = 60  # seconds, doubled after every failed attempt
+OUTBOX_MAX_RETRY_DELAY = 60 * 60 * 6
+OUTBOX_CLAIM_TIMEOUT = 60 * 10  # seconds a worker may hold claimed emails before other workers may take them
+
 # Settings for Celery
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND')
@@ -199,4 +261,131 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'users.tasks.notice_for_users',
         'schedule': timedelta(days=7),
     },
+    'send-outbox-emails': {
+        'task': 'users.tasks.send_outbox_emails',
+        'schedule': timedelta(minutes=1),
+    },
+    'flush-lesson-progress': {
+        'task': 'educational_modules.tasks.flush_lesson_progress',
+        'schedule': timedelta(minutes=1),
+    },
+    'prune-changes': {
+        'task': 'educational_modules.tasks.prune_changes',
+        'schedule': timedelta(days=1),
+    },
+    'refresh-content-stats': {
+        'task': 'educational_modules.tasks.refresh_stats',
+        'schedule': timedelta(minutes=5),
+    },
+    'rebuild-content-stats': {
+        'task': 'educational_modules.tasks.rebuild_stats',
+        'schedule': timedelta(days=1),
+    },
+    'delete-module-exports': {
+        'task': 'educational_modules.tasks.delete_exports',
+        'schedule': timedelta(hours=1),
+    },
+    'refresh-related-lessons': {
+        'task': 'educational_modules.tasks.refresh_related',
+        'schedule': timedelta(minutes=15),
+    },
+    'rebuild-related-lessons': {
+        'task': 'educational_modules.tasks.rebuild_related',
+        'schedule': timedelta(days=1),
+    },
+}
+
+# Settings for the lesson progress buffer (Redis when a location is configured, process memory otherwise). The
+# process memory buffer is not shared by the web and Celery workers, so it is only allowed with DEBUG.
+PROGRESS_BUFFER_LOCATION = os.getenv('PROGRESS_BUFFER_LOCATION')
+if not PROGRESS_BUFFER_LOCATION and not DEBUG:
+    raise ImproperlyConfigured('PROGRESS_BUFFER_LOCATION must be set when DEBUG is off.')
+PROGRESS_BUFFER_BACKEND = (
+    'educational_modules.progress.RedisProgressBuffer' if PROGRESS_BUFFER_LOCATION
+    else 'educational_modules.progress.InMemoryProgressBuffer'
+)
+PROGRESS_FLUSH_LOCK_TIMEOUT = 300  # seconds a flush may hold the lock before another worker may take it over
+
+# Settings for the cache (Redis when a location is configured, process memory otherwise)
+CACHE_LOCATION = os.getenv('CACHE_LOCATION')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache' if CACHE_LOCATION
+        else 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': CACHE_LOCATION or '',
+    }
 }
+
+# Settings for the title autocomplete endpoints
+AUTOCOMPLETE_MIN_LENGTH = 2
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
+
+# Maximum number of tags returned by the tag facet endpoints
+TAG_FACETS_LIMIT = 50
+
+# Settings for the change log of the delta sync endpoint
+CHANGE_LOG_RETENTION = timedelta(days=30)
+# Changes younger than this are not served yet on databases other than PostgreSQL, which tracks the running
+# writers instead, see educational_modules.changes
+CHANGE_LOG_SETTLE_SECONDS = 30
+CHANGE_LOG_PAGE_SIZE = 500
+
+# Settings for the moderator statistics rolled up from the change log
+CONTENT_STATS_BATCH_SIZE = 5000
+CONTENT_STATS_DAYS = 30
+CONTENT_STATS_MAX_DAYS = 366
+
+# How long the ZIP archives of the module exports are kept after they are built
+MODULE_EXPORT_TTL = timedelta(hours=24)
+
+# Settings for the related lessons: neighbors kept per lesson, lessons per similarity matrix product and the
+# similarity below which lessons are not related
+RELATED_LESSONS_LIMIT = 10
+RELATED_LESSONS_BATCH_SIZE = 256
+RELATED_LESSONS_MIN_SCORE = 0.1
+
+# Settings for the module change events (Redis pub/sub when a location is configured, process memory otherwise).
+# The process memory broker does not receive the events published by other workers, so it is only allowed with
+# DEBUG.
+EVENT_BROKER_LOCATION = os.getenv('EVENT_BROKER_LOCATION')
+if not EVENT_BROKER_LOCATION and not DEBUG:
+    raise ImproperlyConfigured('EVENT_BROKER_LOCATION must be set when DEBUG is off.')
+EVENT_BROKER_BACKEND = (
+    'educational_modules.events.RedisEventBroker' if EVENT_BROKER_LOCATION
+    else 'educational_modules.events.InMemoryEventBroker'
+)
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MILLISECONDS = 3000
+SSE_MAX_STREAM_SECONDS = 60 * 5  # streams are ended after this and the clients reconnect
+
+# Settings for the metrics of the Celery tasks and the email outbox (Redis when a location is configured, process
+# memory otherwise); /metrics/ is served by the web workers only when a token for the scraper is configured. The
+# process memory backend does not see the values recorded by the Celery workers, so it is only allowed with DEBUG.
+METRICS_LOCATION = os.getenv('METRICS_LOCATION')
+METRICS_BACKEND = (
+    'config.metrics.RedisMetricsBackend' if METRICS_LOCATION
+    else 'config.metrics.InMemoryMetricsBackend'
+)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+if METRICS_TOKEN and not METRICS_LOCATION and not DEBUG:
+    raise ImproperlyConfigured('METRICS_LOCATION must be set to serve the metrics when DEBUG is off.')
+
+# Settings for the production server started by the serve command (0 workers: one per CPU)
+SERVER_BIND = os.getenv('SERVER_BIND', '0.0.0.0:8000')
+SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', 0))
+SERVER_MAX_REQUESTS = int(os.getenv('SERVER_MAX_REQUESTS', 1000))
+SERVER_MAX_REQUESTS_JITTER = int(os.getenv('SERVER_MAX_REQUESTS_JITTER', 100))
+SERVER_TIMEOUT = int(os.getenv('SERVER_TIMEOUT', 30))
+
+# Settings for the response compression
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CACHE_MIN_SIZE = 16 * 1024  # smaller bodies are compressed faster than they are fetched from the cache
+COMPRESSION_CACHE_TIMEOUT = 60 * 10
+COMPRESSION_CONTENT_TYPES = (
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/',
+)
@@ -0,0 +1,272 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import tempfile
+import time
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.signing import Signer
+from django.http import Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.views.static import serve
+
+# Content-addressed names never change their content, so clients may keep them for a year without revalidating
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Stored files of the uploads made before content addressing, which may be overwritten in place
+LEGACY_MAX_AGE = 60 * 60
+
+CONTENT_ADDRESSED_NAME = re.compile(r'(?:^|/)[0-9a-f]{2}/[0-9a-f]{62}(?:\.[0-9a-z]+)?$')
+
+
+def content_digest(content):
+    """
+    Returns the SHA-256 digest of a file, read in chunks.
+
+    Args:
+        content (File): The file.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def media_signature(name, expires):
+    """
+    Returns the signature of a media URL, binding the name of the file to the expiry time.
+
+    Args:
+        name (str): The name of the stored file.
+        expires (int): The Unix time the URL expires at.
+
+    Returns:
+        str: The signature.
+    """
+    return Signer(salt='config.storage.media').signature(f'{name}:{expires}')
+
+
+def signed_media_query(name):
+    """
+    Returns the query string of a signed URL of an uploaded file.
+
+    The expiry is rounded up to the next MEDIA_URL_MAX_AGE period, so the URL of a file stays the same for a while
+    and browsers can reuse their cached copy; a URL is valid for one to two periods.
+
+    Args:
+        name (str): The name of the stored file.
+
+    Returns:
+        str: The query string, without the leading '?'.
+    """
+    period = settings.MEDIA_URL_MAX_AGE
+    expires = (int(time.time()) // period + 2) * period
+    return urlencode({'expires': expires, 'signature': media_signature(name, expires)})
+
+
+def check_media_signature(name, expires, signature):
+    """
+    Checks the signature of a media URL built by signed_media_query.
+
+    Args:
+        name (str): The name of the stored file.
+        expires (str): The 'expires' query parameter.
+        signature (str): The 'signature' query parameter.
+
+    Returns:
+        bool: True if the signature matches the file and has not expired, False otherwise.
+    """
+    if not expires or not expires.isdigit() or not signature or int(expires) < time.time():
+        return False
+    return constant_time_compare(signature, media_signature(name, int(expires)))
+
+
+def is_content_addressed(name):
+    """
+    Checks whether a stored file is named by the hash of its content.
+
+    Args:
+        name (str): The name of the stored file.
+
+    Returns:
+        bool: True for names built by ContentAddressedStorage, False otherwise.
+    """
+    return CONTENT_ADDRESSED_NAME.search(name) is not None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage naming files by the SHA-256 hash of their content.
+
+    The name keeps the directory given by the upload_to of the field and the extension of the upload, e.g.
+    'module_previews/3f/a2...e1.png'. Uploading a file that is already stored returns the existing name without
+    writing it again, so every module, lesson or avatar showing the same image shares one file. URLs are signed
+    for the file, so the serializers hand out links that open in image tags without an access token.
+    """
+
+    def url(self, name):
+        """
+        Returns the signed URL of a stored file.
+
+        Args:
+            name (str): The name of the stored file.
+
+        Returns:
+            str: The URL, with the expiry and the signature in the query string.
+        """
+        return f'{super().url(name)}?{signed_media_query(name)}'
+
+    def hashed_name(self, name, digest):
+        """
+        Builds the content-addressed name of an upload.
+
+        Args:
+            name (str): The name of the upload, including the upload_to directory.
+            digest (str): The hexadecimal digest of the content.
+
+        Returns:
+            str: The name of the stored file.
+        """
+        directory, filename = posixpath.split(name.replace('\\', '/'))
+        extension = os.path.splitext(filename)[1].lower()
+        if not re.fullmatch(r'\.[0-9a-z]{1,10}', extension):
+            extension = ''
+        return posixpath.join(directory, digest[:2], digest[2:] + extension)
+
+    def save(self, name, content, max_length=None):
+        """
+        Stores a file under the hash of its content unless an identical file is stored already.
+
+        Args:
+            name (str): The name of the upload.
+            content: The file or its content.
+            max_length (int): The maximum length of the name.
+
+        Returns:
+            str: The name of the stored file.
+        """
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(self.generate_filename(name), content_digest(content))
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+    def get_available_name(self, name, max_length=None):
+        """
+        Returns the name unchanged: a stored file of the same name has the same content.
+
+        Args:
+            name (str): The content-addressed name.
+            max_length (int): The maximum length of the name.
+
+        Returns:
+            str: The name.
+        """
+        return name
+
+    def _save(self, name, content):
+        """
+        Writes the file to a temporary file and moves it into place.
+
+        Two processes storing the same upload at once both write complete files and the last move wins, which is
+        harmless because the content is the same.
+
+        Args:
+            name (str): The content-addressed name.
+            content (File): The file.
+
+        Returns:
+            str: The name of the stored file.
+        """
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+        fd, temporary_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as destination:
+                for chunk in content.chunks():
+                    destination.write(chunk)
+            os.chmod(temporary_path, self.file_permissions_mode or 0o644)
+            os.replace(temporary_path, full_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        return name
+
+
+def patch_media_cache_control(response, name):
+    """
+    Sets the caching headers of an uploaded file.
+
+    Content-addressed files are cached as immutable, so browsers never revalidate them; files stored before content
+    addressing are revalidated after LEGACY_MAX_AGE. The files are only shown to some users, so shared caches must
+    not keep them.
+
+    Args:
+        response (HttpResponse): The response sending the file.
+        name (str): The name of the stored file.
+    """
+    if is_content_addressed(name):
+        patch_cache_control(response, private=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, private=True, max_age=LEGACY_MAX_AGE)
+
+
+def media_response(request, name):
+    """
+    Sends an uploaded file from MEDIA_ROOT, through the front proxy if MEDIA_ACCEL names one.
+
+    With 'nginx' the response only carries an X-Accel-Redirect to the internal MEDIA_ACCEL_LOCATION, with 'apache'
+    an X-Sendfile with the path of the file, and the proxy sends the file itself. Without a proxy, in development,
+    the file is streamed by Django.
+
+    Args:
+        request: The request object.
+        name (str): The name of the stored file.
+
+    Returns:
+        HttpResponse: The response sending the file.
+
+    Raises:
+        Http404: If the name points outside MEDIA_ROOT, or the file does not exist when streamed by Django.
+        ImproperlyConfigured: If MEDIA_ACCEL is not '', 'nginx' or 'apache'.
+    """
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not settings.MEDIA_ACCEL:
+        response = serve(request, name, document_root=settings.MEDIA_ROOT)
+    elif settings.MEDIA_ACCEL in ('nginx', 'apache'):
+        response = HttpResponse(content_type=mimetypes.guess_type(name)[0] or 'application/octet-stream')
+        if settings.MEDIA_ACCEL == 'nginx':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_LOCATION.rstrip('/') + '/' + quote(name)
+        else:
+            response['X-Sendfile'] = path
+    else:
+        raise ImproperlyConfigured(f"MEDIA_ACCEL must be '', 'nginx' or 'apache', not {settings.MEDIA_ACCEL!r}.")
+    patch_media_cache_control(response, name)
+    return response
@@ -0,0 +1,74 @@
+import time
+
+from celery.signals import before_task_publish, task_prerun, task_postrun, task_retry
+
+from config.metrics import TASKS_TOTAL, TASK_QUEUE_SECONDS, TASK_RETRIES_TOTAL, TASK_RUNTIME_SECONDS
+
+# Message header carrying the wall clock time the task was published at, including by beat
+PUBLISHED_AT_HEADER = 'published_at'
+
+# Start times of the tasks running in this worker process, keyed by task id
+_started = {}
+
+
+@before_task_publish.connect
+def stamp_published_at(sender=None, headers=None, **kwargs):
+    """
+    Stamps the publishing time into the message headers, to measure the queue latency on start.
+
+    Args:
+        sender (str): The name of the published task.
+        headers (dict): The message headers.
+        **kwargs: Additional keyword arguments of the signal.
+    """
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+@task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    """
+    Records the queue latency of a starting task and remembers its start time.
+
+    Tasks published without the header only get their run time recorded.
+
+    Args:
+        task_id (str): The id of the task.
+        task: The task.
+        **kwargs: Additional keyword arguments of the signal.
+    """
+    # Workers expose the message headers as request attributes, eager runs keep them in request.headers
+    published_at = getattr(task.request, PUBLISHED_AT_HEADER, None) or (task.request.headers or {}).get(
+        PUBLISHED_AT_HEADER)
+    if published_at is not None:
+        TASK_QUEUE_SECONDS.observe(max(time.time() - float(published_at), 0), task=task.name)
+    _started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task_end(task_id=None, task=None, state=None, **kwargs):
+    """
+    Records the run time and the final state of a finished task.
+
+    Args:
+        task_id (str): The id of the task.
+        task: The task.
+        state (str): The final state, e.g. 'SUCCESS', 'FAILURE' or 'RETRY'.
+        **kwargs: Additional keyword arguments of the signal.
+    """
+    started = _started.pop(task_id, None)
+    if started is not None:
+        TASK_RUNTIME_SECONDS.observe(time.perf_counter() - started, task=task.name)
+    TASKS_TOTAL.inc(task=task.name, state=state or 'UNKNOWN')
+
+
+@task_retry.connect
+def record_task_retry(sender=None, **kwargs):
+    """
+    Counts a retry requested by a task.
+
+    Args:
+        sender: The task.
+        **kwargs: Additional keyword arguments of the signal.
+    """
+    TASK_RETRIES_TOTAL.inc(task=sender.name)
@@ -16,27 +16,15 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
 
-# API documentation for project
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Educational Modules API Documentation",
-        default_version='v1',
-        description="API Documentation for App Educational Modules",
-        terms_of_service="https://www.example.com/policies/terms/",
-        contact=openapi.Contact(email="pavelakulich1999@gmail.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
+from config.metrics import metrics_view
+from config.schema import PrecomputedSchemaView
 
 urlpatterns = [
-    path('docs/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('docs/', PrecomputedSchemaView.with_ui('swagger'), name='schema-swagger-ui'),
+    path('redoc/', PrecomputedSchemaView.with_ui('redoc'), name='schema-redoc'),
+
+    path('metrics/', metrics_view, name='metrics'),
 
     path('admin/', admin.site.urls),
     path('users/', include('users.urls', namespace='users')),
@@ -0,0 +1,89 @@
+import time
+
+from django.core.cache import cache
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+def iter_views(patterns=None):
+    """
+    Yields the view classes of the URLconf.
+
+    Args:
+        patterns (list): The URL patterns to walk, the root URLconf by default.
+
+    Yields:
+        type: The class of every class-based view, e.g. an APIView or a ViewSet.
+    """
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'cls', None) or getattr(pattern.callback, 'view_class', None)
+            if view_class is not None:
+                yield view_class
+
+
+def resolve_urlconf():
+    """
+    Imports every view module and builds the reverse lookup tables of the URLconf.
+
+    Returns:
+        int: The number of class-based views.
+    """
+    get_resolver().reverse_dict
+    return len(set(iter_views()))
+
+
+def build_serializer_fields():
+    """
+    Builds the fields of throwaway instances of the serializers of all views.
+
+    DRF caches nothing at class level, so every request builds its fields again. This only imports the modules the
+    fields use and fills the model _meta caches the field introspection reads, once per process.
+
+    Returns:
+        int: The number of serializers.
+    """
+    serializer_classes = {getattr(view, 'serializer_class', None) for view in iter_views()} - {None}
+    for serializer_class in serializer_classes:
+        serializer_class(context={}).fields
+    return len(serializer_classes)
+
+
+def open_connections():
+    """
+    Opens the connections to every database and the cache.
+
+    Returns:
+        int: The number of opened database connections.
+    """
+    for connection in connections.all():
+        connection.ensure_connection()
+    cache.get('warmup')
+    return len(connections.all())
+
+
+def warm_up(asgi=False):
+    """
+    Prepares a freshly forked server worker before it accepts traffic.
+
+    Under WSGI the database and cache connections are opened on the thread serving the requests and kept for
+    CONN_MAX_AGE. Django serves every ASGI request on a thread of its own and config.asgi turns persistent database
+    connections off, so a connection opened here would never be used; ASGI workers skip that step.
+
+    Args:
+        asgi (bool): Whether the worker serves the ASGI application.
+
+    Returns:
+        dict: The seconds spent on every step.
+    """
+    steps = [('urlconf', resolve_urlconf), ('serializers', build_serializer_fields)]
+    if not asgi:
+        steps.append(('connections', open_connections))
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    return timings
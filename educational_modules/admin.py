@@ -1,10 +1,15 @@
 from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
 
-from educational_modules.models import Module, Lesson
+from educational_modules.models import Module, Lesson, RequestProfile
+from educational_modules.paginators import EstimatedCountAdminMixin
 
 
 @admin.register(Module)
-class ModuleAdmin(admin.ModelAdmin):
+class ModuleAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """
     Admin configuration for the Module model.
 
@@ -15,7 +20,7 @@ class ModuleAdmin(admin.ModelAdmin):
 
 
 @admin.register(Lesson)
-class LessonAdmin(admin.ModelAdmin):
+class LessonAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """
     Admin configuration for the Lesson model.
 
@@ -23,3 +28,107 @@ class LessonAdmin(admin.ModelAdmin):
         list_display (tuple): Tuple containing the fields to be displayed in the admin list view.
     """
     list_display = ('pk', 'title', 'description', 'preview', 'video_url', 'module', 'owner',)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the RequestProfile model, to browse and download the captured profiles.
+
+    Attributes:
+        list_display (tuple): Tuple containing the fields to be displayed in the admin list view.
+        list_filter (tuple): Tuple containing the fields to filter the list by.
+        search_fields (tuple): Tuple containing the fields searched by the search box.
+        fields (tuple): Tuple containing the fields shown on the detail page.
+        readonly_fields (tuple): All shown fields, profiles are not edited.
+    """
+    list_display = ('pk', 'method', 'path', 'status_code', 'duration', 'peak_memory', 'user', 'created_at',
+                    'download_link',)
+    list_filter = ('method', 'status_code',)
+    search_fields = ('path',)
+    fields = ('method', 'path', 'status_code', 'duration', 'peak_memory', 'user', 'created_at', 'download_link',
+              'summary_text', 'memory_summary_text',)
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        """
+        Profiles are only created by the profiling middleware.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            bool: False.
+        """
+        return False
+
+    def get_urls(self):
+        """
+        Adds the download view of the profiles to the admin URLs.
+
+        Returns:
+            list: The URL patterns.
+        """
+        return [
+            path('<int:pk>/download/', self.admin_site.admin_view(self.download_view),
+                 name='educational_modules_requestprofile_download'),
+            *super().get_urls(),
+        ]
+
+    def download_view(self, request, pk):
+        """
+        Sends the statistics of a profile as a .prof file, for pstats or snakeviz.
+
+        Args:
+            request: The request object.
+            pk (int): The primary key of the profile.
+
+        Returns:
+            HttpResponse: The file, or a 403 response without the view permission.
+        """
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        if not self.has_view_permission(request, profile):
+            return HttpResponse(status=403)
+        response = HttpResponse(bytes(profile.stats), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile.pk}.prof"'
+        return response
+
+    @admin.display(description='statistics')
+    def download_link(self, obj):
+        """
+        Returns the link to download the statistics of a profile.
+
+        Args:
+            obj (RequestProfile): The profile.
+
+        Returns:
+            str: The HTML link.
+        """
+        return format_html('<a href="{}">profile-{}.prof</a>',
+                           reverse('admin:educational_modules_requestprofile_download', args=[obj.pk]), obj.pk)
+
+    @admin.display(description='summary')
+    def summary_text(self, obj):
+        """
+        Returns the pstats summary of a profile, preformatted.
+
+        Args:
+            obj (RequestProfile): The profile.
+
+        Returns:
+            str: The HTML block.
+        """
+        return format_html('<pre>{}</pre>', obj.summary)
+
+    @admin.display(description='memory summary')
+    def memory_summary_text(self, obj):
+        """
+        Returns the tracemalloc summary of a profile, preformatted.
+
+        Args:
+            obj (RequestProfile): The profile.
+
+        Returns:
+            str: The HTML block, empty without a memory trace.
+        """
+        return format_html('<pre>{}</pre>', obj.memory_summary) if obj.memory_summary else ''
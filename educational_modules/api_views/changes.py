@@ -0,0 +1,79 @@
+from rest_framework import generics, status
+from rest_framework.response import Response
+
+from educational_modules.changes import CursorExpired, current_position, decode_cursor, encode_cursor, read_changes
+from educational_modules.models import ChangeLogEntry, Lesson, Module
+from educational_modules.permissions import is_moderator
+from educational_modules.serializers.changes import ChangesSerializer
+from educational_modules.serializers.lesson import LessonSerializer
+from educational_modules.serializers.module import ModuleSerializer
+
+
+class ChangesAPIView(generics.GenericAPIView):
+    """
+    API view for the delta sync of modules and lessons.
+
+    Returns the modules and lessons saved and the ids of those deleted since the 'cursor' query parameter,
+    together with the cursor to pass next time. Without a cursor only the current cursor is returned; clients
+    fetch it before their initial full download. Changes are scoped like the list endpoints: moderators and
+    superusers receive the changes of all objects, other users those of their own.
+
+    Attributes:
+        serializer_class (ChangesSerializer): The serializer class describing the response.
+    """
+    serializer_class = ChangesSerializer
+
+    def get(self, request):
+        """
+        Returns the changes since the cursor.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            Response: The changed objects, the tombstones, the next cursor and whether more changes follow;
+                status 400 for a malformed cursor and 410 for an expired one.
+        """
+        cursor = request.query_params.get('cursor')
+        if not cursor:
+            return Response({'cursor': encode_cursor(current_position()), 'has_more': False,
+                             'modules': [], 'lessons': [], 'deleted': []})
+        try:
+            position = decode_cursor(cursor)
+        except CursorExpired as error:
+            return Response({'detail': str(error)}, status=status.HTTP_410_GONE)
+        except ValueError as error:
+            return Response({'detail': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        see_all = request.user.is_superuser or is_moderator(request.user)
+        owner_id = None if see_all else request.user.pk
+        latest, position, has_more = read_changes(position, owner_id)
+
+        saved = {model: set() for model in (ChangeLogEntry.MODEL_MODULE, ChangeLogEntry.MODEL_LESSON)}
+        deleted = []
+        for (model, object_id), action in latest.items():
+            if action == ChangeLogEntry.ACTION_DELETE:
+                deleted.append({'model': model, 'pk': object_id})
+            else:
+                saved[model].add(object_id)
+
+        modules = Module.objects.filter(pk__in=saved[ChangeLogEntry.MODEL_MODULE]).prefetch_related('lesson_set')
+        lessons = Lesson.objects.filter(pk__in=saved[ChangeLogEntry.MODEL_LESSON])
+        if not see_all:
+            modules = modules.filter(owner=request.user)
+            lessons = lessons.filter(owner=request.user)
+        modules, lessons = list(modules.order_by('pk')), list(lessons.order_by('pk'))
+
+        # Objects saved and since given away or deleted in a later page are no longer visible
+        for model, objects in ((ChangeLogEntry.MODEL_MODULE, modules), (ChangeLogEntry.MODEL_LESSON, lessons)):
+            for object_id in sorted(saved[model] - {obj.pk for obj in objects}):
+                deleted.append({'model': model, 'pk': object_id})
+
+        context = self.get_serializer_context()
+        return Response({
+            'cursor': encode_cursor(position),
+            'has_more': has_more,
+            'modules': ModuleSerializer(modules, many=True, context=context).data,
+            'lessons': LessonSerializer(lessons, many=True, context=context).data,
+            'deleted': deleted,
+        })
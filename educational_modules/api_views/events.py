@@ -0,0 +1,104 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+
+from educational_modules.events import get_event_broker, module_channel
+from educational_modules.models import Module
+from educational_modules.permissions import is_moderator
+from users.authentication import JWTAuthentication
+
+
+def authenticate(request, query_token=True):
+    """
+    Authenticates the request by the JWT access token of the Authorization header or the 'token' query parameter.
+
+    Browsers cannot set headers on EventSource connections, hence the query parameter.
+
+    Args:
+        request: The request object.
+        query_token (bool): Whether the token may be passed as the query parameter.
+
+    Returns:
+        User | None: The authenticated user, or None if the token is missing or invalid.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    try:
+        raw_token = authentication.get_raw_token(header) if header else query_token and request.GET.get('token')
+        if not raw_token:
+            return None
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def can_follow(user, module_id):
+    """
+    Checks whether the user may follow the events of a module, with the rules of the module detail endpoint.
+
+    Args:
+        user (User): The authenticated user.
+        module_id (int): The id of the module.
+
+    Returns:
+        bool: True if the module exists and the user may see it.
+    """
+    owners = list(Module.objects.filter(pk=module_id).values_list('owner_id', flat=True)[:1])
+    return bool(owners) and (owners[0] == user.pk or user.is_superuser or is_moderator(user))
+
+
+async def stream_events(channel):
+    """
+    Yields the events of a channel in the Server-Sent Events format, with a comment line as heartbeat.
+
+    The stream ends after SSE_MAX_STREAM_SECONDS and the client reconnects after the 'retry' delay. A disconnect
+    is not always noticed by the server, so the limit also bounds how long an abandoned stream holds its
+    subscription.
+
+    Args:
+        channel (str): The channel.
+
+    Yields:
+        str: Chunks of the event stream.
+    """
+    yield f'retry: {settings.SSE_RETRY_MILLISECONDS}\n\n'
+    deadline = time.monotonic() + settings.SSE_MAX_STREAM_SECONDS
+    async with get_event_broker().subscribe(channel) as subscription:
+        while (remaining := deadline - time.monotonic()) > 0:
+            message = await subscription.get(min(settings.SSE_HEARTBEAT_SECONDS, remaining))
+            if message is None:
+                yield ': heartbeat\n\n'
+            else:
+                yield f'data: {message}\n\n'
+
+
+async def module_events(request, pk):
+    """
+    Streams the changes of a module and its lessons as Server-Sent Events.
+
+    Every event is a JSON object with the 'event' name ('module.saved', 'module.deleted', 'lesson.saved',
+    'lesson.deleted' or 'lessons.renumbered') and the ids of the changed objects in 'data'. The view is
+    asynchronous, so an open stream holds no worker thread when served over ASGI.
+
+    Args:
+        request: The request object.
+        pk (int): The primary key of the module.
+
+    Returns:
+        StreamingHttpResponse: The event stream, or a JSON error response.
+    """
+    user = await sync_to_async(authenticate)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'},
+                            status=status.HTTP_401_UNAUTHORIZED)
+    if not await sync_to_async(can_follow)(user, pk):
+        return JsonResponse({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    response = StreamingHttpResponse(stream_events(module_channel(pk)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.response import Response
+
+from config.storage import media_response
+from educational_modules.models import Module, ModuleExport
+from educational_modules.permissions import scope_to_owner
+from educational_modules.serializers.export import ModuleExportSerializer
+from educational_modules.tasks import export_module
+
+
+class ModuleExportCreateAPIView(generics.GenericAPIView):
+    """
+    API view for requesting the ZIP archive of a module.
+
+    The archive is built by the export_module task; the response describes the export, which the client polls
+    until it is ready. While an export of the module by the same user is still pending or running, it is returned
+    instead of starting another one; the module row is locked while this is checked, so concurrent requests start
+    one export.
+
+    Attributes:
+        serializer_class (ModuleExportSerializer): The serializer class for ModuleExport objects.
+    """
+    serializer_class = ModuleExportSerializer
+
+    def get_queryset(self):
+        """
+        Returns the modules the user may export, those of the module detail endpoint.
+
+        Returns:
+            QuerySet: Filtered queryset.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return Module.objects.none()
+        return scope_to_owner(Module.objects.all(), self.request.user)
+
+    def post(self, request, pk):
+        """
+        Starts the export of a module the user may see.
+
+        Args:
+            request: The request object.
+            pk (int): The primary key of the module.
+
+        Returns:
+            Response: The export, with status 202 ACCEPTED.
+        """
+        with transaction.atomic():
+            module = get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+            export = ModuleExport.objects.filter(
+                module=module, requested_by=request.user,
+                status__in=(ModuleExport.STATUS_PENDING, ModuleExport.STATUS_RUNNING),
+            ).first()
+            if export is None:
+                export = ModuleExport.objects.create(module=module, requested_by=request.user,
+                                                     expires_at=timezone.now() + settings.MODULE_EXPORT_TTL)
+                transaction.on_commit(lambda: export_module.delay(export.pk))
+        return Response(self.get_serializer(export).data, status=status.HTTP_202_ACCEPTED)
+
+
+class ModuleExportRetrieveAPIView(generics.RetrieveAPIView):
+    """
+    API view for polling the status of a module export.
+
+    Attributes:
+        serializer_class (ModuleExportSerializer): The serializer class for ModuleExport objects.
+    """
+    serializer_class = ModuleExportSerializer
+
+    def get_queryset(self):
+        """
+        Returns all exports for superusers, the own exports otherwise.
+
+        Returns:
+            QuerySet: Filtered queryset.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return ModuleExport.objects.none()
+        if self.request.user.is_superuser:
+            return ModuleExport.objects.all()
+        return ModuleExport.objects.filter(requested_by=self.request.user)
+
+
+class ModuleExportDownloadAPIView(ModuleExportRetrieveAPIView):
+    """
+    API view for downloading the archive of a ready module export.
+
+    The archive is sent like the protected media, by the front proxy when MEDIA_ACCEL is set.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Sends the archive.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            HttpResponse: The archive, or status 409 CONFLICT while it is not ready.
+        """
+        export = self.get_object()
+        if export.status != ModuleExport.STATUS_READY:
+            return Response({'detail': f'The export is {export.status}.'}, status=status.HTTP_409_CONFLICT)
+        response = media_response(request, export.archive.name)
+        response['Content-Disposition'] = f'attachment; filename="module-{export.module_id}.zip"'
+        return response
@@ -1,11 +1,20 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from educational_modules.filters import TagFilter
 from educational_modules.models import Lesson
 from educational_modules.paginators import LessonPaginator
-from educational_modules.permissions import IsNotModerator, IsOwner, IsSuperUser, IsModerator
-from educational_modules.serializers.lesson import LessonSerializer
+from educational_modules.permissions import IsNotModerator, IsOwner, IsSuperUser, IsModerator, is_moderator, \
+    scope_to_owner
+from educational_modules.progress import get_progress_buffer
+from educational_modules.serializers.autocomplete import TitleSuggestionSerializer
+from educational_modules.serializers.fast import LessonReadSerializer
+from educational_modules.serializers.lesson import LessonSerializer, LessonMoveSerializer
+from educational_modules.serializers.tag import TagFacetSerializer
+from educational_modules.services import next_lesson_position, move_lesson, autocomplete_titles, tag_facets
 
 
 class LessonViewSet(viewsets.ModelViewSet):
@@ -22,7 +31,7 @@ class LessonViewSet(viewsets.ModelViewSet):
     serializer_class = LessonSerializer
     queryset = Lesson.objects.all()
     pagination_class = LessonPaginator
-    filter_backends = [SearchFilter]
+    filter_backends = [SearchFilter, TagFilter]
     search_fields = ['title', 'description', 'content']
 
     def get_permissions(self):
@@ -34,9 +43,10 @@ class LessonViewSet(viewsets.ModelViewSet):
         """
         if self.action == 'create':
             permission_classes = [IsNotModerator]
-        elif self.action == 'retrieve':
+        elif self.action == 'retrieve' or self.action == 'view' or self.action == 'complete' \
+                or self.action == 'related':
             permission_classes = [IsOwner | IsModerator | IsSuperUser]
-        elif self.action == 'update' or self.action == 'partial_update':
+        elif self.action == 'update' or self.action == 'partial_update' or self.action == 'move':
             permission_classes = [IsOwner | IsModerator | IsSuperUser]
         elif self.action == 'destroy':
             permission_classes = [IsOwner | IsSuperUser]
@@ -51,9 +61,47 @@ class LessonViewSet(viewsets.ModelViewSet):
         Returns:
             QuerySet: Filtered queryset.
         """
-        if self.request.user.groups.filter(name='moderator').exists() or self.request.user.is_superuser:
-            return Lesson.objects.all()
-        return Lesson.objects.filter(owner=self.request.user)
+        if getattr(self, 'swagger_fake_view', False):
+            return Lesson.objects.none()
+        return scope_to_owner(Lesson.objects.all(), self.request.user)
+
+    def get_autocomplete_scope(self):
+        """
+        Returns the part of the autocomplete cache key that identifies which lessons the user can see.
+
+        Returns:
+            str: 'all' for moderators and superusers, the user id otherwise.
+        """
+        if self.request.user.is_superuser or is_moderator(self.request.user):
+            return 'all'
+        return f'user{self.request.user.pk}'
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns a page of lessons, built from .values() rows by LessonReadSerializer.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            Response: The paginated lessons.
+        """
+        read_serializer = LessonReadSerializer(self.get_serializer_context())
+        page = self.paginate_queryset(read_serializer.values(self.filter_queryset(self.get_queryset())))
+        return self.get_paginated_response(read_serializer.represent(page))
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns a lesson, built by LessonReadSerializer.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            Response: The lesson.
+        """
+        read_serializer = LessonReadSerializer(self.get_serializer_context())
+        return Response(read_serializer.to_representation(read_serializer.row_from_instance(self.get_object())))
 
     def perform_create(self, serializer):
         """
@@ -62,4 +110,125 @@ class LessonViewSet(viewsets.ModelViewSet):
         Args:
             serializer: The serializer instance.
         """
-        serializer.save(owner=self.request.user)
+        module = serializer.validated_data.get('module')
+        serializer.save(owner=self.request.user, position=next_lesson_position(module))
+
+    def perform_update(self, serializer):
+        """
+        Performs update of a Lesson object, appending it to the end of its new module if the module changed.
+
+        Args:
+            serializer: The serializer instance.
+        """
+        if 'module' in serializer.validated_data:
+            module = serializer.validated_data['module']
+            module_changed = (module.pk if module else None) != serializer.instance.module_id
+        else:
+            module, module_changed = None, False
+        if module_changed:
+            serializer.save(position=next_lesson_position(module))
+        else:
+            serializer.save()
+
+    @action(detail=True, methods=['post'])
+    def move(self, request, pk=None):
+        """
+        Moves the lesson inside its module, right after the given lesson or to the start.
+
+        Args:
+            request: The request object with the 'after' lesson id, or null to move the lesson first.
+            pk: The primary key of the lesson.
+
+        Returns:
+            Response: An empty response with status 204.
+        """
+        lesson = self.get_object()
+        serializer = LessonMoveSerializer(data=request.data, context={'lesson': lesson})
+        serializer.is_valid(raise_exception=True)
+        move_lesson(lesson, serializer.validated_data['after'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['post'])
+    def view(self, request, pk=None):
+        """
+        Records that the current user viewed the lesson.
+
+        The event is buffered and written to the database by the flush_lesson_progress task.
+
+        Args:
+            request: The request object.
+            pk: The primary key of the lesson.
+
+        Returns:
+            Response: An empty response with status 202.
+        """
+        lesson = self.get_object()
+        get_progress_buffer().record_view(request.user.pk, lesson.pk)
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """
+        Records that the current user completed the lesson.
+
+        The event is buffered and written to the database by the flush_lesson_progress task.
+
+        Args:
+            request: The request object.
+            pk: The primary key of the lesson.
+
+        Returns:
+            Response: An empty response with status 202.
+        """
+        lesson = self.get_object()
+        get_progress_buffer().record_completion(request.user.pk, lesson.pk)
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], serializer_class=TitleSuggestionSerializer, pagination_class=None,
+            filter_backends=[])
+    def autocomplete(self, request):
+        """
+        Returns the ids and titles of the lessons whose title contains the 'q' query parameter.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            Response: Up to AUTOCOMPLETE_LIMIT lessons, empty if the query is too short.
+        """
+        results = autocomplete_titles(self.get_queryset(), request.query_params.get('q', ''),
+                                      self.get_autocomplete_scope())
+        return Response(results)
+
+    @action(detail=False, methods=['get'], serializer_class=TagFacetSerializer, pagination_class=None)
+    def tags(self, request):
+        """
+        Returns the tag counts of the lessons visible to the user, with the 'search' and 'tags' filters applied.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            Response: The tags with their counts, the most frequent first.
+        """
+        return Response(tag_facets(self.filter_queryset(self.get_queryset())))
+
+    @action(detail=True, methods=['get'], pagination_class=None, filter_backends=[])
+    def related(self, request, pk=None):
+        """
+        Returns the lessons most similar to the lesson, the most similar first.
+
+        The neighbors are computed by the refresh_related_lessons task, so they are read with one lookup of the
+        neighbors index; only the neighbors visible to the user are returned.
+
+        Args:
+            request: The request object.
+            pk: The primary key of the lesson.
+
+        Returns:
+            Response: Up to RELATED_LESSONS_LIMIT lessons.
+        """
+        lesson = self.get_object()
+        read_serializer = LessonReadSerializer(self.get_serializer_context())
+        neighbors = self.get_queryset().filter(neighbor_of__lesson=lesson).order_by('neighbor_of__rank')
+        return Response(read_serializer.represent(list(read_serializer.values(neighbors))))
@@ -0,0 +1,36 @@
+from django.http import JsonResponse
+from rest_framework import status
+
+from config.storage import check_media_signature, media_response
+from educational_modules.api_views.events import authenticate
+from educational_modules.media import can_access_media
+
+
+def protected_media(request, path):
+    """
+    Serves an uploaded preview or avatar to the users allowed to see the object it belongs to.
+
+    The URLs handed out by the API carry a signature of the file that expires after MEDIA_URL_MAX_AGE to twice
+    that, so image tags load them without an access token and without a database query. Requests without a
+    signature need the access token in the Authorization header and the permission to see an object referencing
+    the file. With MEDIA_ACCEL set the front proxy sends the file. Files the user may not see answer 404, like the
+    object lookups of the API.
+
+    Args:
+        request: The request object.
+        path (str): The name of the stored file.
+
+    Returns:
+        HttpResponse: The response sending the file, or a JSON error response.
+    """
+    if 'signature' in request.GET:
+        if not check_media_signature(path, request.GET.get('expires'), request.GET['signature']):
+            return JsonResponse({'detail': 'The link is invalid or has expired.'}, status=status.HTTP_403_FORBIDDEN)
+        return media_response(request, path)
+    user = authenticate(request, query_token=False)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'},
+                            status=status.HTTP_401_UNAUTHORIZED)
+    if not can_access_media(user, path):
+        return JsonResponse({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return media_response(request, path)
@@ -1,10 +1,17 @@
 from rest_framework import generics
 from rest_framework.filters import SearchFilter
+from rest_framework.response import Response
 
+from educational_modules.filters import TagFilter
 from educational_modules.models import Module
 from educational_modules.paginators import ModulePaginator
-from educational_modules.permissions import IsOwner, IsModerator, IsNotModerator, IsSuperUser
+from educational_modules.permissions import IsOwner, IsModerator, IsNotModerator, IsSuperUser, is_moderator, \
+    scope_to_owner
+from educational_modules.serializers.autocomplete import TitleSuggestionSerializer
+from educational_modules.serializers.fast import ModuleReadSerializer
 from educational_modules.serializers.module import ModuleSerializer
+from educational_modules.serializers.tag import TagFacetSerializer
+from educational_modules.services import autocomplete_titles, tag_facets
 
 
 class ModuleCreateAPIView(generics.CreateAPIView):
@@ -43,7 +50,7 @@ class ModuleListAPIView(generics.ListAPIView):
     serializer_class = ModuleSerializer
     queryset = Module.objects.all()
     pagination_class = ModulePaginator
-    filter_backends = [SearchFilter]
+    filter_backends = [SearchFilter, TagFilter]
     search_fields = ['title', 'description']
 
     def get_queryset(self):
@@ -53,9 +60,49 @@ class ModuleListAPIView(generics.ListAPIView):
         Returns:
             QuerySet: Filtered queryset.
         """
-        if self.request.user.groups.filter(name='moderator').exists() or self.request.user.is_superuser:
-            return Module.objects.all()
-        return Module.objects.filter(owner=self.request.user)
+        if getattr(self, 'swagger_fake_view', False):
+            return Module.objects.none()
+        return scope_to_owner(Module.objects.all(), self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns a page of modules, built from .values() rows by ModuleReadSerializer.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            Response: The paginated modules.
+        """
+        read_serializer = ModuleReadSerializer(self.get_serializer_context())
+        page = self.paginate_queryset(read_serializer.values(self.filter_queryset(self.get_queryset())))
+        return self.get_paginated_response(read_serializer.represent(page))
+
+
+class ModuleTagFacetAPIView(ModuleListAPIView):
+    """
+    API view for counting the tags of the Module instances visible to the user.
+
+    The 'search' and 'tags' filters of the module list apply, so the counts describe the current selection.
+
+    Attributes:
+        serializer_class (TagFacetSerializer): The serializer class describing the facets.
+        pagination_class: Facets are not paginated.
+    """
+    serializer_class = TagFacetSerializer
+    pagination_class = None
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the tag counts of the selected modules.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            Response: The tags with their counts, the most frequent first.
+        """
+        return Response(tag_facets(self.filter_queryset(self.get_queryset())))
 
 
 class ModuleRetrieveAPIView(generics.RetrieveAPIView):
@@ -71,6 +118,30 @@ class ModuleRetrieveAPIView(generics.RetrieveAPIView):
     queryset = Module.objects.all()
     permission_classes = [IsOwner | IsModerator | IsSuperUser]
 
+    def get_queryset(self):
+        """
+        Returns all modules for moderators and superusers, the own modules otherwise.
+
+        Returns:
+            QuerySet: Filtered queryset.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return Module.objects.none()
+        return scope_to_owner(super().get_queryset(), self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns a module with its lessons, built by ModuleReadSerializer.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            Response: The module.
+        """
+        read_serializer = ModuleReadSerializer(self.get_serializer_context())
+        return Response(read_serializer.represent([read_serializer.row_from_instance(self.get_object())])[0])
+
 
 class ModuleUpdateAPIView(generics.UpdateAPIView):
     """
@@ -85,6 +156,17 @@ class ModuleUpdateAPIView(generics.UpdateAPIView):
     queryset = Module.objects.all()
     permission_classes = [IsOwner | IsModerator | IsSuperUser]
 
+    def get_queryset(self):
+        """
+        Returns all modules for moderators and superusers, the own modules otherwise.
+
+        Returns:
+            QuerySet: Filtered queryset.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return Module.objects.none()
+        return scope_to_owner(super().get_queryset(), self.request.user)
+
 
 class ModuleDestroyAPIView(generics.DestroyAPIView):
     """
@@ -96,3 +178,54 @@ class ModuleDestroyAPIView(generics.DestroyAPIView):
     """
     queryset = Module.objects.all()
     permission_classes = [IsOwner | IsSuperUser]
+
+    def get_queryset(self):
+        """
+        Returns all modules for superusers, the own modules otherwise.
+
+        Returns:
+            QuerySet: Filtered queryset.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return Module.objects.none()
+        return scope_to_owner(super().get_queryset(), self.request.user, moderators=False)
+
+
+class ModuleAutocompleteAPIView(generics.GenericAPIView):
+    """
+    API view for suggesting Module titles while the user types.
+
+    Returns the ids and titles of the modules visible to the user whose title contains the 'q' query parameter.
+    Results are cached per query and visibility scope.
+
+    Attributes:
+        serializer_class (TitleSuggestionSerializer): The serializer class describing the suggestions.
+    """
+    serializer_class = TitleSuggestionSerializer
+
+    def get_queryset(self):
+        """
+        Returns the queryset based on the user's role.
+
+        Returns:
+            QuerySet: Filtered queryset.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return Module.objects.none()
+        return scope_to_owner(Module.objects.all(), self.request.user)
+
+    def get(self, request):
+        """
+        Returns the modules matching the query.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            Response: Up to AUTOCOMPLETE_LIMIT modules, empty if the query is too short.
+        """
+        if is_moderator(request.user) or request.user.is_superuser:
+            scope = 'all'
+        else:
+            scope = f'user{request.user.pk}'
+        return Response(autocomplete_titles(self.get_queryset(), request.query_params.get('q', ''), scope))
@@ -0,0 +1,31 @@
+from rest_framework import generics
+
+from educational_modules.models import ModuleProgress
+from educational_modules.paginators import ModulePaginator
+from educational_modules.serializers.progress import ModuleProgressSerializer
+
+
+class ModuleProgressListAPIView(generics.ListAPIView):
+    """
+    API view for listing the module completion of the current user.
+
+    The percentages are read from the precomputed ModuleProgress aggregates, which are refreshed when the buffered
+    lesson progress is flushed.
+
+    Attributes:
+        serializer_class (ModuleProgressSerializer): The serializer class for ModuleProgress objects.
+        pagination_class (ModulePaginator): The paginator class for ModuleProgress objects.
+    """
+    serializer_class = ModuleProgressSerializer
+    pagination_class = ModulePaginator
+
+    def get_queryset(self):
+        """
+        Returns the progress of the current user.
+
+        Returns:
+            QuerySet: Filtered queryset.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return ModuleProgress.objects.none()
+        return ModuleProgress.objects.filter(user=self.request.user).order_by('module_id')
@@ -0,0 +1,79 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import generics
+from rest_framework.response import Response
+
+from educational_modules.models import CatalogStats, DailyContentStats, OwnerContentStats
+from educational_modules.paginators import ModulePaginator
+from educational_modules.permissions import IsModerator, IsSuperUser
+from educational_modules.serializers.stats import ContentStatsSerializer, OwnerContentStatsSerializer
+
+
+class ContentStatsAPIView(generics.GenericAPIView):
+    """
+    API view for the catalog statistics of the moderators.
+
+    Returns the catalog totals and the content created per day over the last 'days' days (CONTENT_STATS_DAYS by
+    default). Everything is read from the rollup tables maintained by the refresh_stats task, so the numbers lag
+    behind the catalog by up to one refresh.
+
+    Attributes:
+        serializer_class (ContentStatsSerializer): The serializer class describing the response.
+        permission_classes (list): List of permission classes.
+    """
+    serializer_class = ContentStatsSerializer
+    permission_classes = [IsModerator | IsSuperUser]
+
+    def get(self, request):
+        """
+        Returns the catalog statistics.
+
+        Args:
+            request: The request object.
+
+        Returns:
+            Response: The totals and the daily created content.
+        """
+        try:
+            days = int(request.query_params.get('days', settings.CONTENT_STATS_DAYS))
+        except ValueError:
+            days = settings.CONTENT_STATS_DAYS
+        days = min(max(days, 1), settings.CONTENT_STATS_MAX_DAYS)
+        since = timezone.localdate() - datetime.timedelta(days=days - 1)
+
+        stats = CatalogStats.objects.filter(pk=1).first() or CatalogStats(updated_at=None)
+        serializer = self.get_serializer({
+            'modules': stats.modules,
+            'lessons': stats.lessons,
+            'lessons_with_video': stats.lessons_with_video,
+            'updated_at': stats.updated_at,
+            'daily': DailyContentStats.objects.filter(day__gte=since),
+        })
+        return Response(serializer.data)
+
+
+class OwnerContentStatsListAPIView(generics.ListAPIView):
+    """
+    API view for listing the content of every owner, the owners with the most lessons first.
+
+    Content without an owner is listed with a null 'owner_id'.
+
+    Attributes:
+        serializer_class (OwnerContentStatsSerializer): The serializer class for OwnerContentStats objects.
+        pagination_class (ModulePaginator): The paginator class for OwnerContentStats objects.
+        permission_classes (list): List of permission classes.
+    """
+    serializer_class = OwnerContentStatsSerializer
+    pagination_class = ModulePaginator
+    permission_classes = [IsModerator | IsSuperUser]
+
+    def get_queryset(self):
+        """
+        Returns the owner statistics ordered by the number of lessons.
+
+        Returns:
+            QuerySet: Ordered queryset.
+        """
+        return OwnerContentStats.objects.order_by('-lessons', 'owner_id')
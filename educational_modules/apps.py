@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class EducationalModulesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'educational_modules'
+
+    def ready(self):
+        """
+        Connects the signal receivers that write the change log.
+        """
+        from educational_modules import signals  # noqa: F401
@@ -0,0 +1,477 @@
+import csv
+import io
+import json
+import os
+import uuid
+from pathlib import Path
+
+from django.db import connection, transaction
+
+from educational_modules.changes import record_changes
+from educational_modules.models import CatalogImportRecord, Module, Lesson
+from educational_modules.rendering import render_markdown
+from users.models import User
+
+FORMATS = ('jsonl', 'csv')
+
+MODULE_FIELDS = ('id', 'title', 'description', 'preview', 'tags', 'owner_email')
+LESSON_FIELDS = ('id', 'title', 'description', 'preview', 'video_url', 'content', 'module_id', 'position',
+                 'tags', 'owner_email')
+
+# Columns that may legitimately be empty; in CSV files an empty value in them is read back as NULL.
+NULLABLE_FIELDS = {'preview', 'video_url', 'module_id', 'position', 'owner_email'}
+
+# JSON columns; in CSV files they are written as JSON text.
+JSON_FIELDS = {'tags'}
+
+
+def catalog_file(directory, name, fmt):
+    """
+    Returns the path of a catalog file inside the transfer directory.
+
+    Args:
+        directory (str | Path): The transfer directory.
+        name (str): The catalog name, either 'modules' or 'lessons'.
+        fmt (str): The file format, either 'jsonl' or 'csv'.
+
+    Returns:
+        Path: The path of the catalog file.
+    """
+    return Path(directory) / f'{name}.{fmt}'
+
+
+def is_postgresql():
+    """
+    Checks whether the default database connection is PostgreSQL, so COPY can be used.
+
+    Returns:
+        bool: True for PostgreSQL, False otherwise.
+    """
+    return connection.vendor == 'postgresql'
+
+
+def _export_select(model, fields):
+    """
+    Builds the SELECT statement that exports one catalog table together with the owner's email.
+
+    Args:
+        model: The Module or Lesson model class.
+        fields (tuple): The exported columns.
+
+    Returns:
+        str: The SQL query.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    users_table = connection.ops.quote_name(User._meta.db_table)
+    columns = [f't.{connection.ops.quote_name(field)}' for field in fields if field != 'owner_email']
+    columns.append('u.email AS owner_email')
+    return (
+        f'SELECT {", ".join(columns)} FROM {table} t '
+        f'LEFT JOIN {users_table} u ON u.id = t.owner_id ORDER BY t.id'
+    )
+
+
+def _export_with_copy(model, fields, fmt, output):
+    """
+    Exports one catalog table on PostgreSQL with COPY ... TO STDOUT.
+
+    CSV is streamed to the file as is. For JSONL every row is rendered by row_to_json; the only escaping
+    the COPY text format applies to JSON text is doubling of backslashes, which is undone here.
+
+    Args:
+        model: The Module or Lesson model class.
+        fields (tuple): The exported columns.
+        fmt (str): The file format.
+        output: The text file object to write into.
+    """
+    select = _export_select(model, fields)
+    with connection.cursor() as cursor:
+        if fmt == 'csv':
+            cursor.copy_expert(f'COPY ({select}) TO STDOUT WITH (FORMAT csv, HEADER)', output)
+            return
+
+        buffer = io.StringIO()
+        cursor.copy_expert(f'COPY (SELECT row_to_json(r) FROM ({select}) r) TO STDOUT', buffer)
+        buffer.seek(0)
+        for line in buffer:
+            output.write(line.replace('\\\\', '\\'))
+
+
+def _export_with_orm(model, fields, fmt, output, batch_size):
+    """
+    Exports one catalog table through the ORM with a chunked iterator.
+
+    Args:
+        model: The Module or Lesson model class.
+        fields (tuple): The exported columns.
+        fmt (str): The file format.
+        output: The text file object to write into.
+        batch_size (int): The number of rows fetched per round trip.
+    """
+    lookups = [field if field != 'owner_email' else 'owner__email' for field in fields]
+    rows = model.objects.order_by('pk').values_list(*lookups).iterator(chunk_size=batch_size)
+
+    if fmt == 'csv':
+        json_columns = [index for index, field in enumerate(fields) if field in JSON_FIELDS]
+        writer = csv.writer(output)
+        writer.writerow(fields)
+        for row in rows:
+            row = list(row)
+            for index in json_columns:
+                row[index] = json.dumps(row[index], ensure_ascii=False)
+            writer.writerow(row)
+        return
+
+    for row in rows:
+        output.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + '\n')
+
+
+def export_catalog(directory, fmt='jsonl', batch_size=2000):
+    """
+    Exports all modules and lessons into the transfer directory.
+
+    Args:
+        directory (str | Path): The directory to write 'modules.<fmt>' and 'lessons.<fmt>' into.
+        fmt (str): The file format, either 'jsonl' or 'csv'.
+        batch_size (int): The number of rows fetched per round trip when COPY is not available.
+
+    Returns:
+        dict: The paths of the written files keyed by catalog name.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, model, fields in (('modules', Module, MODULE_FIELDS), ('lessons', Lesson, LESSON_FIELDS)):
+        path = catalog_file(directory, name, fmt)
+        with open(path, 'w', encoding='utf-8', newline='') as output:
+            if is_postgresql():
+                _export_with_copy(model, fields, fmt, output)
+            else:
+                _export_with_orm(model, fields, fmt, output, batch_size)
+        paths[name] = path
+    return paths
+
+
+def read_catalog(path, fmt, fields):
+    """
+    Yields catalog records from an exported file.
+
+    Args:
+        path (Path): The catalog file.
+        fmt (str): The file format.
+        fields (tuple): The expected columns.
+
+    Yields:
+        dict: One record per module or lesson.
+    """
+    with open(path, encoding='utf-8', newline='') as source:
+        if fmt == 'jsonl':
+            for line in source:
+                if line.strip():
+                    record = json.loads(line)
+                    yield {field: record.get(field) for field in fields}
+            return
+
+        for record in csv.DictReader(source):
+            values = {
+                field: (None if field in NULLABLE_FIELDS and record.get(field) == '' else record.get(field))
+                for field in fields
+            }
+            for field in JSON_FIELDS.intersection(fields):
+                values[field] = json.loads(values[field]) if values[field] else None
+            yield values
+
+
+def _copy_escape(value):
+    """
+    Escapes a value for the PostgreSQL COPY text format.
+
+    Args:
+        value: The value to escape.
+
+    Returns:
+        str: The escaped value, with None written as the NULL marker and lists as JSON text.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value, ensure_ascii=False)
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+class CatalogImporter:
+    """
+    Loads exported modules and lessons in batches, remapping ids and owners.
+
+    Modules and lessons get fresh ids in the target database. The old-to-new id map is written to
+    CatalogImportRecord in the transaction of every batch, so lessons are attached to the imported modules and a
+    batch that committed is skipped when it is read again. Owners are matched by email. The imported objects are
+    recorded in the change log, since the bulk inserts bypass the model signals. The counters are saved to a small
+    checkpoint file after every batch, so an interrupted import resumes where it stopped; the file is deleted once
+    the import finishes.
+
+    Attributes:
+        directory (Path): The transfer directory.
+        fmt (str): The file format.
+        batch_size (int): The number of rows inserted per transaction.
+        checkpoint_path (Path): The checkpoint file.
+        default_owner (User): The owner for records whose email is unknown in this database.
+        state (dict): The checkpoint state, with the id of the import.
+    """
+
+    def __init__(self, directory, fmt='jsonl', batch_size=2000, checkpoint_path=None, default_owner=None):
+        self.directory = Path(directory)
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.checkpoint_path = Path(checkpoint_path or self.directory / '.import_checkpoint.json')
+        self.default_owner = default_owner
+        self.state = self._load_checkpoint()
+        self._owner_ids = {}
+        self._unknown_emails = set()
+
+    def _load_checkpoint(self):
+        """
+        Loads the checkpoint state, or returns a fresh one.
+
+        Returns:
+            dict: The checkpoint state.
+        """
+        if self.checkpoint_path.exists():
+            with open(self.checkpoint_path, encoding='utf-8') as source:
+                state = json.load(source)
+        else:
+            state = {'modules': 0, 'lessons': 0, 'unknown_owners': 0, 'orphan_lessons': 0}
+        if 'import_id' not in state:
+            state['import_id'] = str(uuid.uuid4())
+            # Checkpoints written before the id map moved to the database carry the module ids themselves
+            CatalogImportRecord.objects.bulk_create([
+                CatalogImportRecord(import_id=state['import_id'], model=CatalogImportRecord.MODEL_MODULE,
+                                    source_id=int(source_id), target_id=target_id)
+                for source_id, target_id in state.pop('module_ids', {}).items()
+            ], batch_size=self.batch_size)
+        return state
+
+    def _save_checkpoint(self):
+        """
+        Atomically writes the checkpoint state to disk.
+        """
+        temporary_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(temporary_path, 'w', encoding='utf-8') as output:
+            json.dump(self.state, output)
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def _imported_ids(self, model, source_ids):
+        """
+        Looks up the new ids of exported records inserted by this import.
+
+        Args:
+            model (str): CatalogImportRecord.MODEL_MODULE or MODEL_LESSON.
+            source_ids (set): The exported ids.
+
+        Returns:
+            dict: The new ids keyed by exported id.
+        """
+        return dict(CatalogImportRecord.objects.filter(
+            import_id=self.state['import_id'], model=model, source_id__in=source_ids,
+        ).values_list('source_id', 'target_id'))
+
+    def _new_records(self, model, batch):
+        """
+        Drops the records of a batch that were inserted before the import was interrupted.
+
+        Args:
+            model (str): CatalogImportRecord.MODEL_MODULE or MODEL_LESSON.
+            batch (list): The batch of records.
+
+        Returns:
+            list: The records not inserted yet.
+        """
+        for record in batch:
+            record['id'] = int(record['id'])
+        imported = self._imported_ids(model, {record['id'] for record in batch})
+        return [record for record in batch if record['id'] not in imported]
+
+    def _record_imported(self, model, batch, new_ids):
+        """
+        Writes the id map of an inserted batch, inside the transaction of the batch.
+
+        Args:
+            model (str): CatalogImportRecord.MODEL_MODULE or MODEL_LESSON.
+            batch (list): The inserted records.
+            new_ids (list): Their new ids, in order.
+        """
+        CatalogImportRecord.objects.bulk_create([
+            CatalogImportRecord(import_id=self.state['import_id'], model=model, source_id=record['id'],
+                                target_id=new_id)
+            for record, new_id in zip(batch, new_ids)
+        ])
+
+    def _resolve_owners(self, records):
+        """
+        Resolves the owners' emails of a batch to user ids with a single query.
+
+        Args:
+            records (list): The batch of records.
+        """
+        missing = {record['owner_email'] for record in records
+                   if record['owner_email'] and record['owner_email'] not in self._owner_ids}
+        if not missing:
+            return
+        self._owner_ids.update(User.objects.filter(email__in=missing).values_list('email', 'pk'))
+        for email in missing - self._owner_ids.keys():
+            self._unknown_emails.add(email)
+            self._owner_ids[email] = self.default_owner.pk if self.default_owner else None
+
+    def _owner_id(self, record):
+        """
+        Returns the target owner id of a record.
+
+        Args:
+            record (dict): The catalog record.
+
+        Returns:
+            int | None: The owner id.
+        """
+        email = record['owner_email']
+        if not email:
+            return None
+        if email in self._unknown_emails:
+            self.state['unknown_owners'] += 1
+        return self._owner_ids[email]
+
+    def _batches(self, name, fields):
+        """
+        Yields batches of records that have not been imported yet.
+
+        Args:
+            name (str): The catalog name.
+            fields (tuple): The expected columns.
+
+        Yields:
+            list: A batch of records.
+        """
+        skip = self.state[name]
+        batch = []
+        for index, record in enumerate(read_catalog(catalog_file(self.directory, name, self.fmt), self.fmt, fields)):
+            if index < skip:
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _insert(self, model, rows):
+        """
+        Inserts rows and returns their new ids, in order.
+
+        On PostgreSQL the ids are reserved from the table sequence and the rows are streamed with COPY;
+        elsewhere they are inserted with bulk_create.
+
+        Args:
+            model: The Module or Lesson model class.
+            rows (list): The rows as dictionaries of column values, without ids.
+
+        Returns:
+            list: The new ids.
+        """
+        if not is_postgresql():
+            objects = model.objects.bulk_create([model(**row) for row in rows], batch_size=self.batch_size)
+            return [obj.pk for obj in objects]
+
+        table = model._meta.db_table
+        columns = ['id'] + list(rows[0])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                [table, len(rows)],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            buffer = io.StringIO()
+            for new_id, row in zip(ids, rows):
+                buffer.write('\t'.join(_copy_escape(value) for value in [new_id, *row.values()]) + '\n')
+            buffer.seek(0)
+            quoted_columns = ', '.join(connection.ops.quote_name(column) for column in columns)
+            cursor.copy_expert(f'COPY {connection.ops.quote_name(table)} ({quoted_columns}) FROM STDIN', buffer)
+        return ids
+
+    def import_modules(self):
+        """
+        Imports the modules catalog.
+        """
+        for batch in self._batches('modules', MODULE_FIELDS):
+            count = len(batch)
+            batch = self._new_records(CatalogImportRecord.MODEL_MODULE, batch)
+            if not batch:
+                self.state['modules'] += count
+                self._save_checkpoint()
+                continue
+            self._resolve_owners(batch)
+            rows = [
+                {
+                    'title': record['title'],
+                    'description': record['description'],
+                    'preview': record['preview'],
+                    'tags': record['tags'] or [],
+                    'owner_id': self._owner_id(record),
+                }
+                for record in batch
+            ]
+            with transaction.atomic():
+                new_ids = self._insert(Module, rows)
+                record_changes(Module, [(new_id, row['owner_id']) for new_id, row in zip(new_ids, rows)])
+                self._record_imported(CatalogImportRecord.MODEL_MODULE, batch, new_ids)
+            self.state['modules'] += count
+            self._save_checkpoint()
+
+    def import_lessons(self):
+        """
+        Imports the lessons catalog, attaching every lesson to its imported module.
+        """
+        for batch in self._batches('lessons', LESSON_FIELDS):
+            count = len(batch)
+            batch = self._new_records(CatalogImportRecord.MODEL_LESSON, batch)
+            if not batch:
+                self.state['lessons'] += count
+                self._save_checkpoint()
+                continue
+            self._resolve_owners(batch)
+            module_ids = self._imported_ids(CatalogImportRecord.MODEL_MODULE, {
+                int(record['module_id']) for record in batch if record['module_id'] is not None})
+            rows = []
+            for record in batch:
+                module_id = module_ids.get(int(record['module_id'])) if record['module_id'] is not None else None
+                if record['module_id'] is not None and module_id is None:
+                    self.state['orphan_lessons'] += 1
+                rows.append({
+                    'title': record['title'],
+                    'description': record['description'],
+                    'preview': record['preview'],
+                    'video_url': record['video_url'],
+                    'content': record['content'],
+                    'content_html': render_markdown(record['content']),
+                    'module_id': module_id,
+                    'position': record['position'] or 0,
+                    'tags': record['tags'] or [],
+                    'owner_id': self._owner_id(record),
+                })
+            with transaction.atomic():
+                new_ids = self._insert(Lesson, rows)
+                record_changes(Lesson, [(new_id, row['owner_id']) for new_id, row in zip(new_ids, rows)])
+                self._record_imported(CatalogImportRecord.MODEL_LESSON, batch, new_ids)
+            self.state['lessons'] += count
+            self._save_checkpoint()
+
+    def run(self):
+        """
+        Imports modules and then lessons, and drops the id map and the checkpoint file once both catalogs are in.
+
+        Returns:
+            dict: The final checkpoint state.
+        """
+        self._save_checkpoint()
+        self.import_modules()
+        self.import_lessons()
+        CatalogImportRecord.objects.filter(import_id=self.state['import_id']).delete()
+        self.checkpoint_path.unlink()
+        return self.state
@@ -0,0 +1,222 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from educational_modules.models import ChangeLogEntry, Lesson, Module
+
+CHANGE_LOG_MODELS = {
+    Module: ChangeLogEntry.MODEL_MODULE,
+    Lesson: ChangeLogEntry.MODEL_LESSON,
+}
+
+
+# Namespace of the advisory locks held by the change log writers on PostgreSQL, in the upper 16 bits of the lock
+# key; the lower 48 bits hold a change log position
+WRITER_LOCK_NAMESPACE = 0x4348
+WRITER_LOCK_POSITION_BITS = 48
+
+
+class CursorExpired(Exception):
+    """
+    Raised when the change log entries following a cursor may already have been pruned.
+    """
+
+
+def record_change(instance, action):
+    """
+    Writes a change log entry for a saved or deleted module or lesson.
+
+    The model signals call it inside the transaction writing the object: Module.save and Lesson.save open one, and
+    deletions run their post_delete receivers inside the transaction of the deletion.
+
+    Args:
+        instance (Module | Lesson): The changed object.
+        action (str): ChangeLogEntry.ACTION_CREATE, ACTION_SAVE or ACTION_DELETE.
+    """
+    with transaction.atomic(savepoint=False):
+        _hold_writer_lock()
+        ChangeLogEntry.objects.create(model=CHANGE_LOG_MODELS[type(instance)], object_id=instance.pk,
+                                      owner_id=instance.owner_id, action=action)
+
+
+def record_changes(model, rows, action=ChangeLogEntry.ACTION_CREATE):
+    """
+    Writes change log entries for objects written in bulk, bypassing the model signals.
+
+    Args:
+        model: The Module or Lesson model class.
+        rows (list): Tuples of object id and owner id.
+        action (str): ChangeLogEntry.ACTION_CREATE, ACTION_SAVE or ACTION_DELETE.
+    """
+    with transaction.atomic(savepoint=False):
+        _hold_writer_lock()
+        ChangeLogEntry.objects.bulk_create([
+            ChangeLogEntry(model=CHANGE_LOG_MODELS[model], object_id=object_id, owner_id=owner_id, action=action)
+            for object_id, owner_id in rows
+        ])
+
+
+def _sequence_position(cursor):
+    """
+    Reads the last id handed out by the change log sequence, whether its transaction committed or not.
+
+    Args:
+        cursor: A database cursor.
+
+    Returns:
+        int: The id, 0 if none was handed out yet.
+    """
+    cursor.execute("SELECT COALESCE(pg_sequence_last_value(pg_get_serial_sequence(%s, 'id')::regclass), 0)",
+                   [ChangeLogEntry._meta.db_table])
+    return cursor.fetchone()[0]
+
+
+def _hold_writer_lock():
+    """
+    Marks the current transaction as a change log writer on PostgreSQL, before it allocates entry ids.
+
+    The transaction holds a shared advisory lock until it ends, keyed by the last id handed out so far; all ids it
+    allocates afterwards are higher. settled_position reads these locks to find the lowest id that may still be
+    uncommitted.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        position = _sequence_position(cursor)
+        cursor.execute('SELECT pg_advisory_xact_lock_shared(%s)',
+                       [(WRITER_LOCK_NAMESPACE << WRITER_LOCK_POSITION_BITS) | position])
+
+
+def encode_cursor(position, issued_at=None):
+    """
+    Builds the opaque cursor handed to the sync clients.
+
+    Args:
+        position (int): The id of the last change log entry the client has seen.
+        issued_at (datetime): The time the cursor was issued, now by default.
+
+    Returns:
+        str: The cursor.
+    """
+    issued_at = issued_at or timezone.now()
+    payload = json.dumps({'p': position, 't': int(issued_at.timestamp())}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Reads the position from a cursor built by encode_cursor.
+
+    Args:
+        cursor (str): The cursor.
+
+    Returns:
+        int: The id of the last change log entry the client has seen.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+        CursorExpired: If the cursor is older than the change log retention.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        position, issued_at = int(payload['p']), int(payload['t'])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise ValueError('Malformed cursor.')
+    # Entries are pruned by age; a cursor older than the retention may point before the oldest kept entry
+    oldest_kept = timezone.now() - settings.CHANGE_LOG_RETENTION + datetime.timedelta(
+        seconds=settings.CHANGE_LOG_SETTLE_SECONDS)
+    if issued_at < oldest_kept.timestamp():
+        raise CursorExpired('The cursor has expired, a full sync is required.')
+    return position
+
+
+def current_position():
+    """
+    Returns the position of the newest settled change log entry.
+
+    Returns:
+        int: The id of the entry, 0 if the log is empty.
+    """
+    return settled_entries().order_by('-pk').values_list('pk', flat=True).first() or 0
+
+
+def settled_position():
+    """
+    Returns the highest id below which every change log entry is committed or rolled back, on PostgreSQL.
+
+    The sequence is read before the writer locks: a writer that takes its lock afterwards allocates ids above the
+    sequence value read, and a writer holding its lock allocated only ids above its lock key.
+
+    Returns:
+        int: The id.
+    """
+    mask = (1 << WRITER_LOCK_POSITION_BITS) - 1
+    with connection.cursor() as cursor:
+        position = _sequence_position(cursor)
+        cursor.execute(
+            "SELECT MIN(((classid::bigint << 32) | objid::bigint) & %s) FROM pg_locks "
+            "WHERE locktype = 'advisory' AND objsubid = 1 AND classid::bigint >> %s = %s",
+            [mask, WRITER_LOCK_POSITION_BITS - 32, WRITER_LOCK_NAMESPACE],
+        )
+        oldest_writer = cursor.fetchone()[0]
+    return position if oldest_writer is None else min(position, oldest_writer)
+
+
+def settled_entries():
+    """
+    Returns the change log entries that can be served or rolled up without skipping any later committed entry.
+
+    Entry ids are allocated before the writing transaction commits, so an entry with a lower id may become
+    visible after a higher one. On PostgreSQL only the entries up to settled_position are served, which holds back
+    everything above the first id of the oldest running writer, however long it runs. Other databases serve the
+    entries older than CHANGE_LOG_SETTLE_SECONDS, which skips the entries of a writer that commits later than
+    that; SQLite runs one writer at a time, so it commits in id order.
+
+    Returns:
+        QuerySet: The settled entries.
+    """
+    if connection.vendor == 'postgresql':
+        return ChangeLogEntry.objects.filter(pk__lte=settled_position())
+    settled_at = timezone.now() - datetime.timedelta(seconds=settings.CHANGE_LOG_SETTLE_SECONDS)
+    return ChangeLogEntry.objects.filter(changed_at__lte=settled_at)
+
+
+def read_changes(position, owner_id=None, limit=None):
+    """
+    Reads the changes following a cursor position, keeping only the latest change of every object.
+
+    Args:
+        position (int): The id of the last change log entry the client has seen.
+        owner_id (int): Restricts the changes to objects of this owner; None returns the changes of all owners.
+        limit (int): The maximum number of change log entries to read, CHANGE_LOG_PAGE_SIZE by default.
+
+    Returns:
+        tuple: The latest action per (model, object_id), the new position and whether more changes follow.
+    """
+    limit = limit or settings.CHANGE_LOG_PAGE_SIZE
+    entries = settled_entries().filter(pk__gt=position)
+    if owner_id is not None:
+        entries = entries.filter(owner_id=owner_id)
+    rows = list(entries.order_by('pk').values_list('pk', 'model', 'object_id', 'action')[:limit])
+
+    latest = {}
+    for pk, model, object_id, action in rows:
+        latest[(model, object_id)] = action
+    new_position = rows[-1][0] if rows else position
+    return latest, new_position, len(rows) == limit
+
+
+def prune_change_log():
+    """
+    Deletes the change log entries older than CHANGE_LOG_RETENTION.
+
+    Returns:
+        int: The number of deleted entries.
+    """
+    deleted, _ = ChangeLogEntry.objects.filter(changed_at__lt=timezone.now() - settings.CHANGE_LOG_RETENTION).delete()
+    return deleted
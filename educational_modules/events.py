@@ -0,0 +1,213 @@
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+def module_channel(module_id):
+    """
+    Returns the channel the events of a module are published on.
+
+    Args:
+        module_id (int): The id of the module.
+
+    Returns:
+        str: The channel name.
+    """
+    return f'module-events:{module_id}'
+
+
+class InMemorySubscription:
+    """
+    Subscription to a channel of the in-memory broker.
+
+    Attributes:
+        queue (asyncio.Queue): The messages received by the subscriber.
+        loop: The event loop of the subscriber, used to hand over messages published from other threads.
+    """
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.loop = asyncio.get_running_loop()
+
+    def put(self, message):
+        """
+        Hands a message over to the subscriber's event loop.
+
+        Args:
+            message (str): The message.
+        """
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, message)
+
+    async def get(self, timeout):
+        """
+        Waits for the next message.
+
+        Args:
+            timeout (float): The number of seconds to wait.
+
+        Returns:
+            str | None: The message, or None if nothing was published in time.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InMemoryEventBroker:
+    """
+    Process-local publish/subscribe broker, a stand-in for Redis in tests and local development.
+
+    Attributes:
+        location: Unused, accepted for compatibility with the Redis broker.
+    """
+
+    def __init__(self, location=None):
+        self.location = location
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def publish(self, channel, message):
+        """
+        Delivers a message to all current subscribers of a channel.
+
+        Args:
+            channel (str): The channel.
+            message (str): The message.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        """
+        Subscribes to a channel for the duration of the context.
+
+        Args:
+            channel (str): The channel.
+
+        Yields:
+            InMemorySubscription: The subscription.
+        """
+        subscription = InMemorySubscription()
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions[channel].discard(subscription)
+                if not self._subscriptions[channel]:
+                    del self._subscriptions[channel]
+
+
+class RedisSubscription:
+    """
+    Subscription to a Redis pub/sub channel.
+
+    Attributes:
+        pubsub: The asyncio Redis pub/sub connection.
+    """
+
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        """
+        Waits for the next message.
+
+        Args:
+            timeout (float): The number of seconds to wait.
+
+        Returns:
+            str | None: The message, or None if nothing was published in time.
+        """
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return message['data'].decode()
+
+
+class RedisEventBroker:
+    """
+    Publish/subscribe broker on Redis, shared by all web and Celery workers.
+
+    Attributes:
+        location (str): The Redis URL.
+        client (redis.Redis): The client used for publishing.
+    """
+
+    def __init__(self, location):
+        self.location = location
+        self.client = redis.Redis.from_url(location)
+
+    def publish(self, channel, message):
+        """
+        Publishes a message on a channel.
+
+        Args:
+            channel (str): The channel.
+            message (str): The message.
+        """
+        self.client.publish(channel, message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        """
+        Subscribes to a channel for the duration of the context, on a dedicated connection.
+
+        Args:
+            channel (str): The channel.
+
+        Yields:
+            RedisSubscription: The subscription.
+        """
+        client = redis.asyncio.Redis.from_url(self.location)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+            await client.aclose()
+
+
+_brokers = {}
+
+
+def get_event_broker():
+    """
+    Returns the event broker configured by EVENT_BROKER_BACKEND and EVENT_BROKER_LOCATION.
+
+    Returns:
+        The event broker instance, shared by the process.
+    """
+    key = (settings.EVENT_BROKER_BACKEND, settings.EVENT_BROKER_LOCATION)
+    if key not in _brokers:
+        _brokers[key] = import_string(settings.EVENT_BROKER_BACKEND)(settings.EVENT_BROKER_LOCATION)
+    return _brokers[key]
+
+
+def publish_module_event(module_id, event, data):
+    """
+    Publishes an event to the subscribers of a module once the current transaction commits.
+
+    Events are best effort: a failing broker is logged and does not fail the request that made the change.
+
+    Args:
+        module_id (int): The id of the module.
+        event (str): The event name, e.g. 'lesson.saved'.
+        data (dict): The event payload.
+    """
+    message = json.dumps({'event': event, 'data': data})
+    transaction.on_commit(lambda: get_event_broker().publish(module_channel(module_id), message), robust=True)
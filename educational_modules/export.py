@@ -0,0 +1,185 @@
+import json
+import shutil
+import tempfile
+import time
+import zipfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.text import slugify
+
+from educational_modules.models import Lesson, ModuleExport
+
+# Chunk size of the lesson queries and of the copies of the preview files
+EXPORT_CHUNK_SIZE = 1024 * 64
+
+
+def _preview_path(name):
+    """
+    Returns the path of a preview inside the archive.
+
+    Args:
+        name (str): The name of the stored preview.
+
+    Returns:
+        str | None: The path, or None without a preview.
+    """
+    return f'previews/{name}' if name else None
+
+
+def _lesson_rows(module):
+    """
+    Yields the lessons of a module in their order, without keeping them all in memory.
+
+    Args:
+        module (Module): The module.
+
+    Yields:
+        dict: The fields of a lesson.
+    """
+    lessons = Lesson.objects.filter(module=module).order_by('position', 'pk').values(
+        'pk', 'title', 'description', 'preview', 'video_url', 'content', 'position', 'tags')
+    yield from lessons.iterator(chunk_size=500)
+
+
+def lesson_markdown(lesson):
+    """
+    Renders a lesson as a Markdown document.
+
+    Args:
+        lesson (dict): The fields of the lesson.
+
+    Returns:
+        str: The document.
+    """
+    parts = [f'# {lesson["title"]}', lesson['description']]
+    if lesson['preview']:
+        parts.append(f'![preview](../{_preview_path(lesson["preview"])})')
+    if lesson['video_url']:
+        parts.append(f'Video: <{lesson["video_url"]}>')
+    parts.append(lesson['content'])
+    return '\n\n'.join(parts) + '\n'
+
+
+def _add_file(archive, arcname, name):
+    """
+    Copies a stored file into the archive in chunks, uncompressed because images are compressed already.
+
+    Args:
+        archive (zipfile.ZipFile): The archive.
+        arcname (str): The path inside the archive.
+        name (str): The name of the stored file.
+
+    Returns:
+        bool: True if the file was added, False if it is missing from the storage.
+    """
+    info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+    info.compress_type = zipfile.ZIP_STORED
+    try:
+        with default_storage.open(name) as source, archive.open(info, 'w', force_zip64=True) as target:
+            shutil.copyfileobj(source, target, EXPORT_CHUNK_SIZE)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def write_archive(module, output):
+    """
+    Writes the ZIP archive of a module.
+
+    The archive holds 'module.json' with the module, 'lessons.jsonl' with one lesson per line, a Markdown document
+    per lesson under 'lessons/' and the previews of the module and its lessons under 'previews/'. The lessons are
+    read in chunks and the previews copied in chunks, so the memory use does not grow with the module.
+
+    Args:
+        module (Module): The module.
+        output: The binary file to write the archive to.
+    """
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('module.json', json.dumps({
+            'pk': module.pk,
+            'title': module.title,
+            'description': module.description,
+            'preview': _preview_path(module.preview.name),
+            'tags': module.tags,
+            'exported_at': timezone.now().isoformat(),
+        }, ensure_ascii=False, indent=2))
+
+        with archive.open('lessons.jsonl', 'w') as lessons_file:
+            for lesson in _lesson_rows(module):
+                row = {**lesson, 'preview': _preview_path(lesson['preview'])}
+                lessons_file.write(json.dumps(row, ensure_ascii=False).encode() + b'\n')
+
+        previews = {module.preview.name} - {''}
+        for index, lesson in enumerate(_lesson_rows(module), start=1):
+            archive.writestr(f'lessons/{index:03d}-{slugify(lesson["title"]) or "lesson"}.md', lesson_markdown(lesson))
+            if lesson['preview']:
+                previews.add(lesson['preview'])
+
+        for name in sorted(previews):
+            _add_file(archive, _preview_path(name), name)
+
+
+def build_export(export_id):
+    """
+    Builds the archive of an export and keeps it for MODULE_EXPORT_TTL.
+
+    The archive is written to a temporary file first and then stored. A failure is recorded on the export for the
+    client polling it. If the export is deleted while the archive is built, the stored archive is deleted too.
+
+    Args:
+        export_id (int): The id of the export.
+
+    Returns:
+        str | None: The final status, None if the export was deleted in the meantime.
+    """
+    export = ModuleExport.objects.select_related('module').filter(pk=export_id).first()
+    if export is None:
+        return None
+    ModuleExport.objects.filter(pk=export_id).update(status=ModuleExport.STATUS_RUNNING)
+
+    try:
+        with tempfile.TemporaryFile() as output:
+            write_archive(export.module, output)
+            export.archive.save(f'module-{export.module_id}.zip', File(output), save=False)
+        export.size = export.archive.size
+        export.status = ModuleExport.STATUS_READY
+    except Exception as error:
+        export.status = ModuleExport.STATUS_FAILED
+        export.error = str(error) or type(error).__name__
+    export.finished_at = timezone.now()
+    export.expires_at = export.finished_at + settings.MODULE_EXPORT_TTL
+    updated = ModuleExport.objects.filter(pk=export_id).update(
+        status=export.status, archive=export.archive, size=export.size, error=export.error,
+        finished_at=export.finished_at, expires_at=export.expires_at,
+    )
+    if not updated:
+        delete_unused_archives({export.archive.name} - {None, ''})
+        return None
+    return export.status
+
+
+def delete_unused_archives(names):
+    """
+    Deletes the stored archives that no export holds.
+
+    Identical archives share one stored file, so a file is only deleted when no remaining export holds it.
+
+    Args:
+        names (set): The names of the stored archives.
+    """
+    for name in names - set(ModuleExport.objects.filter(archive__in=names).values_list('archive', flat=True)):
+        default_storage.delete(name)
+
+
+def delete_expired_exports():
+    """
+    Deletes the expired exports; their archives are deleted by the post_delete receiver of the exports.
+
+    Returns:
+        int: The number of deleted exports.
+    """
+    _, deleted = ModuleExport.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted.get(ModuleExport._meta.label, 0)
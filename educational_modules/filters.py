@@ -0,0 +1,83 @@
+import json
+
+from django.db import connections
+from rest_framework.filters import BaseFilterBackend
+
+
+def parse_tags(value):
+    """
+    Parses a comma-separated list of tags from a query parameter.
+
+    Args:
+        value (str): The query parameter value.
+
+    Returns:
+        list: The normalized tags, without duplicates.
+    """
+    return sorted({tag.strip().lower() for tag in value.split(',') if tag.strip()})
+
+
+def filter_by_tags(queryset, tags):
+    """
+    Filters a queryset to the objects having all the given tags.
+
+    On PostgreSQL this is a single jsonb containment (@>) served by the GIN index on the tags. Other databases
+    fall back to matching the JSON-encoded tags in the column text.
+
+    Args:
+        queryset (QuerySet): The objects to filter.
+        tags (list): The required tags.
+
+    Returns:
+        QuerySet: The filtered queryset.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        return queryset.filter(tags__contains=tags)
+    for tag in tags:
+        queryset = queryset.filter(tags__icontains=json.dumps(tag))
+    return queryset
+
+
+class TagFilter(BaseFilterBackend):
+    """
+    Filter backend that restricts the list to objects having all tags of the 'tags' query parameter.
+
+    Attributes:
+        tags_param (str): The query parameter with the comma-separated tags.
+    """
+    tags_param = 'tags'
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Filters the queryset by the requested tags.
+
+        Args:
+            request: The request object.
+            queryset (QuerySet): The queryset to filter.
+            view: The view.
+
+        Returns:
+            QuerySet: The filtered queryset.
+        """
+        tags = parse_tags(request.query_params.get(self.tags_param, ''))
+        if not tags:
+            return queryset
+        return filter_by_tags(queryset, tags)
+
+    def get_schema_operation_parameters(self, view):
+        """
+        Returns the OpenAPI description of the query parameter.
+
+        Args:
+            view: The view.
+
+        Returns:
+            list: The parameter descriptions.
+        """
+        return [{
+            'name': self.tags_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Comma-separated tags; only objects having all of them are returned.',
+            'schema': {'type': 'string'},
+        }]
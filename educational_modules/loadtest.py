@@ -0,0 +1,372 @@
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from educational_modules.models import Lesson, Module
+from users.models import User
+
+LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+SEED_EMAIL = 'loadtest-{}@example.com'
+SEARCH_WORDS = ('python', 'django', 'lesson', 'async', 'query', 'cache')
+
+# Default share of every operation in the workload
+DEFAULT_MIX = {'list': 40, 'search': 30, 'detail': 20, 'create': 10}
+
+
+class HTTPError(Exception):
+    """
+    Raised when the server closes the connection or sends a malformed response.
+    """
+
+
+def parse_local_url(url):
+    """
+    Parses the URL of the server under test, which has to run on this machine.
+
+    Args:
+        url (str): The base URL, e.g. 'http://127.0.0.1:8000'.
+
+    Returns:
+        tuple: The host and the port.
+
+    Raises:
+        ValueError: If the URL is not a plain HTTP URL of localhost.
+    """
+    parts = urlsplit(url)
+    if parts.scheme != 'http' or parts.hostname not in LOCAL_HOSTS:
+        raise ValueError(f'The load test only runs against http://localhost, not {url}.')
+    return parts.hostname, parts.port or 80
+
+
+def parse_mix(mix):
+    """
+    Parses a workload mix such as 'list=40,search=30,detail=20,create=10'.
+
+    Args:
+        mix (str): Comma separated operation=weight pairs.
+
+    Returns:
+        dict: The weights keyed by operation.
+
+    Raises:
+        ValueError: If an operation is unknown or a weight is not a non-negative integer.
+    """
+    weights = {}
+    for pair in filter(None, (pair.strip() for pair in mix.split(','))):
+        operation, _, weight = pair.partition('=')
+        operation = operation.strip()
+        if operation not in DEFAULT_MIX:
+            raise ValueError(f'Unknown operation {operation!r}, expected one of {", ".join(DEFAULT_MIX)}.')
+        if not weight.strip().isdigit():
+            raise ValueError(f'The weight of {operation} must be a non-negative integer.')
+        weights[operation] = int(weight)
+    if not any(weights.values()):
+        raise ValueError('The mix needs at least one operation with a positive weight.')
+    return weights
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of sorted values.
+
+    Args:
+        values (list): The sorted values.
+        fraction (float): The percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        float: The percentile, 0 for no values.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values), max(1, math.ceil(fraction * len(values)))) - 1]
+
+
+@transaction.atomic
+def seed_users(count, password, lessons_per_module=3):
+    """
+    Creates the load test users, each with a module and a few lessons to read.
+
+    Existing load test users are reused, so the command can run repeatedly. The password is hashed once for all
+    users.
+
+    Args:
+        count (int): The number of users.
+        password (str): The password of the users.
+        lessons_per_module (int): The number of lessons in the module of a new user.
+
+    Returns:
+        dict: The ids of the modules of every user, keyed by email.
+    """
+    emails = [SEED_EMAIL.format(index) for index in range(count)]
+    existing = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+    hashed = make_password(password)
+    User.objects.bulk_create([User(email=email, password=hashed) for email in emails if email not in existing])
+    User.objects.filter(email__in=existing).update(password=hashed, is_active=True)
+
+    users = dict(User.objects.filter(email__in=emails).values_list('email', 'pk'))
+    modules = defaultdict(list)
+    for owner_id, pk in Module.objects.filter(owner_id__in=users.values()).values_list('owner_id', 'pk'):
+        modules[owner_id].append(pk)
+    for email, user_id in users.items():
+        if modules[user_id]:
+            continue
+        module = Module.objects.create(title=f'Load test module of {email}', description='Seeded for load tests',
+                                       owner_id=user_id)
+        Lesson.objects.bulk_create([
+            Lesson(title=f'{random.choice(SEARCH_WORDS)} lesson {index}', description='Seeded for load tests',
+                   content='Seeded for load tests', module=module, owner_id=user_id, position=(index + 1) * 1024)
+            for index in range(lessons_per_module)
+        ])
+        modules[user_id].append(module.pk)
+    return {email: modules[user_id] for email, user_id in users.items()}
+
+
+def delete_seeded_users():
+    """
+    Deletes the load test users together with their modules and lessons.
+
+    Returns:
+        int: The number of deleted users.
+    """
+    users = User.objects.filter(email__startswith='loadtest-', email__endswith='@example.com')
+    Module.objects.filter(owner__in=users).delete()
+    Lesson.objects.filter(owner__in=users).delete()
+    deleted, _ = users.delete()
+    return deleted
+
+
+class HTTPConnection:
+    """
+    Minimal keep-alive HTTP/1.1 client connection over asyncio streams.
+
+    Attributes:
+        host (str): The server host.
+        port (int): The server port.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def close(self):
+        """
+        Closes the connection, if open.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    async def request(self, method, path, headers=None, body=None):
+        """
+        Sends a request and reads the response, reconnecting if the connection was closed.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The path with the query string.
+            headers (dict): Additional request headers.
+            body (dict): A JSON body, if any.
+
+        Returns:
+            tuple: The status code and the response body.
+
+        Raises:
+            HTTPError: If the response cannot be read.
+        """
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b''
+        host = f'[{self.host}]' if ':' in self.host else self.host
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {host}:{self.port}', 'Accept: application/json',
+                 f'Content-Length: {len(payload)}']
+        if body is not None:
+            lines.append('Content-Type: application/json')
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        self._writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + payload)
+        try:
+            await self._writer.drain()
+            status, response_headers, content = await self._read_response()
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as error:
+            await self.close()
+            raise HTTPError(str(error) or type(error).__name__)
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, content
+
+    async def _read_response(self):
+        """
+        Reads a response with a Content-Length or a chunked body.
+
+        Returns:
+            tuple: The status code, the lower-cased headers and the body.
+        """
+        status_line = await self._reader.readuntil(b'\r\n')
+        status = int(status_line.split(b' ', 2)[1])
+        headers = {}
+        while (line := await self._reader.readuntil(b'\r\n')) != b'\r\n':
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while size := int((await self._reader.readuntil(b'\r\n')).split(b';', 1)[0], 16):
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readexactly(2)
+            await self._reader.readuntil(b'\r\n')
+            return status, headers, b''.join(chunks)
+        return status, headers, await self._reader.readexactly(int(headers.get('content-length', 0)))
+
+
+class LoadGenerator:
+    """
+    Replays a weighted mix of API calls from concurrent workers and collects the latencies.
+
+    Every worker keeps one connection open and picks a random user and operation for every request.
+
+    Attributes:
+        host (str): The server host.
+        port (int): The server port.
+        mix (dict): The weights of the operations.
+        concurrency (int): The number of concurrent workers.
+        latencies (dict): The latencies in seconds of the successful requests, keyed by operation.
+        errors (dict): Counters of the failures, keyed by operation and then by status code or error.
+    """
+
+    def __init__(self, host, port, mix, concurrency):
+        self.host = host
+        self.port = port
+        self.mix = mix
+        self.concurrency = concurrency
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+        self.sessions = []
+
+    async def authenticate(self, modules, password):
+        """
+        Obtains an access token for every seeded user through the token endpoint.
+
+        Args:
+            modules (dict): The ids of the modules of every user, keyed by email.
+            password (str): The password of the users.
+
+        Raises:
+            HTTPError: If a user cannot log in.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def login(email):
+            async with semaphore:
+                connection = HTTPConnection(self.host, self.port)
+                try:
+                    status, content = await connection.request('POST', '/users/token/',
+                                                               body={'email': email, 'password': password})
+                finally:
+                    await connection.close()
+            if status != 200:
+                raise HTTPError(f'{email} could not log in, status {status}.')
+            return {'Authorization': f'Bearer {json.loads(content)["access"]}'}, modules[email]
+
+        self.sessions = await asyncio.gather(*(login(email) for email in modules))
+
+    def _next_request(self):
+        """
+        Picks the operation, the user and the request of the next call.
+
+        Returns:
+            tuple: The operation, the method, the path, the headers and the body.
+        """
+        operation = random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        headers, module_ids = random.choice(self.sessions)
+        if operation == 'list':
+            return operation, 'GET', '/module/list/', headers, None
+        if operation == 'search':
+            return operation, 'GET', '/lessons/?' + urlencode({'search': random.choice(SEARCH_WORDS)}), headers, None
+        if operation == 'detail':
+            return operation, 'GET', f'/module/detail/{random.choice(module_ids)}/', headers, None
+        body = {'title': f'Load test module {random.getrandbits(32)}', 'description': 'Created by the load test'}
+        return operation, 'POST', '/module/create/', headers, body
+
+    async def _worker(self, deadline):
+        """
+        Sends requests until the deadline.
+
+        Args:
+            deadline (float): The loop time to stop at.
+        """
+        connection = HTTPConnection(self.host, self.port)
+        loop = asyncio.get_running_loop()
+        try:
+            while loop.time() < deadline:
+                operation, method, path, headers, body = self._next_request()
+                started = time.perf_counter()
+                try:
+                    status, _ = await connection.request(method, path, headers, body)
+                except (HTTPError, OSError) as error:
+                    self.errors[operation][type(error).__name__] += 1
+                    continue
+                if status >= 400:
+                    self.errors[operation][status] += 1
+                else:
+                    self.latencies[operation].append(time.perf_counter() - started)
+        finally:
+            await connection.close()
+
+    async def run(self, duration):
+        """
+        Runs the workers for a duration.
+
+        Args:
+            duration (float): The duration in seconds.
+
+        Returns:
+            float: The measured wall time in seconds.
+        """
+        started = time.perf_counter()
+        deadline = asyncio.get_running_loop().time() + duration
+        await asyncio.gather(*(self._worker(deadline) for _ in range(self.concurrency)))
+        return time.perf_counter() - started
+
+    def report(self, elapsed):
+        """
+        Summarizes the run per operation and in total.
+
+        Args:
+            elapsed (float): The wall time of the run in seconds.
+
+        Returns:
+            list: Dictionaries with the operation, the requests, the errors, the throughput in requests per
+                second and the p50, p90, p99 and maximum latencies in milliseconds.
+        """
+        rows = []
+        operations = [operation for operation in self.mix if operation in self.latencies or operation in self.errors]
+        all_latencies = sorted(latency for operation in operations for latency in self.latencies[operation])
+        for operation, latencies in [*((operation, sorted(self.latencies[operation])) for operation in operations),
+                                     ('total', all_latencies)]:
+            errors = (sum(sum(self.errors[name].values()) for name in operations) if operation == 'total'
+                      else sum(self.errors[operation].values()))
+            requests = len(latencies) + errors
+            rows.append({
+                'operation': operation,
+                'requests': requests,
+                'errors': errors,
+                'error_rate': errors / requests if requests else 0.0,
+                'throughput': requests / elapsed if elapsed else 0.0,
+                'p50': percentile(latencies, 0.5) * 1000,
+                'p90': percentile(latencies, 0.9) * 1000,
+                'p99': percentile(latencies, 0.99) * 1000,
+                'max': (latencies[-1] if latencies else 0.0) * 1000,
+            })
+        return rows
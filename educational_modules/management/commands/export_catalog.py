@@ -0,0 +1,35 @@
+from django.core.management import BaseCommand
+
+from educational_modules.catalog import FORMATS, export_catalog
+
+
+class Command(BaseCommand):
+    """
+    Management command to export all modules and lessons for transfer to another environment.
+
+    On PostgreSQL the tables are streamed with COPY, elsewhere they are read with a chunked ORM iterator.
+    """
+    help = 'Exports modules and lessons as JSONL or CSV files.'
+
+    def add_arguments(self, parser):
+        """
+        Adds the command arguments.
+
+        Args:
+            parser: The argument parser.
+        """
+        parser.add_argument('directory', help='Directory to write modules.<format> and lessons.<format> into.')
+        parser.add_argument('--format', choices=FORMATS, default='jsonl', help='File format (default: jsonl).')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows fetched per round trip.')
+
+    def handle(self, *args, **options):
+        """
+        Handle method for executing the command.
+
+        Args:
+            *args: Additional arguments.
+            **options: Additional keyword arguments.
+        """
+        paths = export_catalog(options['directory'], fmt=options['format'], batch_size=options['batch_size'])
+        for name, path in paths.items():
+            self.stdout.write(self.style.SUCCESS(f'Exported {name} to {path}'))
@@ -0,0 +1,41 @@
+import os
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from config.schema import generate_schema
+
+
+class Command(BaseCommand):
+    """
+    Management command to generate the OpenAPI document once, at build or deploy time.
+
+    The docs endpoints serve the written file instead of introspecting every view on each request.
+    """
+    help = 'Generates the OpenAPI document served by the /docs/ and /redoc/ endpoints.'
+
+    def add_arguments(self, parser):
+        """
+        Adds the command arguments.
+
+        Args:
+            parser: The argument parser.
+        """
+        parser.add_argument('--output', help='Output path (default: the OPENAPI_SCHEMA_PATH setting).')
+        parser.add_argument('--url', help='Base URL of the API to write into the document.')
+
+    def handle(self, *args, **options):
+        """
+        Handle method for executing the command.
+
+        Args:
+            *args: Additional arguments.
+            **options: Additional keyword arguments.
+        """
+        path = options['output'] or settings.OPENAPI_SCHEMA_PATH
+        content = generate_schema(url=options['url'])
+        temporary_path = f'{path}.tmp'
+        with open(temporary_path, 'wb') as schema_file:
+            schema_file.write(content)
+        os.replace(temporary_path, path)
+        self.stdout.write(self.style.SUCCESS(f'OpenAPI document written to {path}'))
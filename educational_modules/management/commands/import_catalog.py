@@ -0,0 +1,61 @@
+from django.core.management import BaseCommand, CommandError
+
+from educational_modules.catalog import FORMATS, CatalogImporter
+from users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Management command to import modules and lessons exported with export_catalog.
+
+    Records get new ids, lessons are attached to the imported modules and owners are matched by email.
+    Progress is checkpointed after every batch, so running the command again resumes an interrupted import.
+    """
+    help = 'Imports modules and lessons from JSONL or CSV files.'
+
+    def add_arguments(self, parser):
+        """
+        Adds the command arguments.
+
+        Args:
+            parser: The argument parser.
+        """
+        parser.add_argument('directory', help='Directory containing modules.<format> and lessons.<format>.')
+        parser.add_argument('--format', choices=FORMATS, default='jsonl', help='File format (default: jsonl).')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows inserted per transaction.')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <directory>/.import_checkpoint.json).')
+        parser.add_argument('--default-owner', help='Email of the owner for records whose owner does not exist.')
+
+    def handle(self, *args, **options):
+        """
+        Handle method for executing the command.
+
+        Args:
+            *args: Additional arguments.
+            **options: Additional keyword arguments.
+        """
+        default_owner = None
+        if options['default_owner']:
+            default_owner = User.objects.filter(email=options['default_owner']).first()
+            if default_owner is None:
+                raise CommandError(f"User {options['default_owner']} does not exist.")
+
+        importer = CatalogImporter(
+            options['directory'],
+            fmt=options['format'],
+            batch_size=options['batch_size'],
+            checkpoint_path=options['checkpoint'],
+            default_owner=default_owner,
+        )
+        try:
+            state = importer.run()
+        except FileNotFoundError as error:
+            raise CommandError(f'Catalog file not found: {error.filename}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {state['modules']} modules and {state['lessons']} lessons"
+        ))
+        if state['unknown_owners']:
+            self.stdout.write(self.style.WARNING(f"{state['unknown_owners']} records had an unknown owner email."))
+        if state['orphan_lessons']:
+            self.stdout.write(self.style.WARNING(f"{state['orphan_lessons']} lessons referenced a missing module."))
@@ -0,0 +1,146 @@
+import asyncio
+import secrets
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from educational_modules.loadtest import DEFAULT_MIX, HTTPError, LoadGenerator, delete_seeded_users, \
+    parse_local_url, parse_mix, seed_users
+
+
+def free_port():
+    """
+    Returns a free TCP port on localhost.
+
+    Returns:
+        int: The port.
+    """
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+class Command(BaseCommand):
+    """
+    Management command to load test the API from concurrent asyncio workers.
+
+    Seeded users log in through the token endpoint, then the workers replay a weighted mix of module list, lesson
+    search, module detail and module create calls. Without --url a uvicorn server is started on a free localhost
+    port for the run. Only localhost servers are accepted, and only with DEBUG on, so the command cannot create
+    accounts on a production database. The users get a random password unless one is given and are deleted after
+    the run unless --keep is passed.
+    """
+    help = 'Runs a concurrent load test against a server on localhost and reports throughput and latencies.'
+
+    def add_arguments(self, parser):
+        """
+        Adds the command arguments.
+
+        Args:
+            parser: The argument parser.
+        """
+        parser.add_argument('--url', help='Base URL of a running local server (default: start one with uvicorn).')
+        parser.add_argument('--server-workers', type=int, default=1,
+                            help='Worker processes of the started uvicorn server (default: 1).')
+        parser.add_argument('--users', type=int, default=20, help='Number of seeded users (default: 20).')
+        parser.add_argument('--password', help='Password of the seeded users (default: a random one per run).')
+        parser.add_argument('--concurrency', type=int, default=20, help='Concurrent connections (default: 20).')
+        parser.add_argument('--duration', type=float, default=10, help='Duration in seconds (default: 10).')
+        parser.add_argument('--mix', default=','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items()),
+                            help='Weights of the operations (default: %(default)s).')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the seeded users and their content after the run.')
+
+    def start_server(self, workers):
+        """
+        Starts uvicorn on a free localhost port and waits until it accepts connections.
+
+        Args:
+            workers (int): The number of worker processes.
+
+        Returns:
+            tuple: The server process and its base URL.
+        """
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'config.asgi:application', '--host', '127.0.0.1', '--port', str(port),
+             '--workers', str(workers), '--no-access-log', '--log-level', 'warning'],
+            cwd=settings.BASE_DIR,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'The server exited with code {process.returncode}.')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return process, f'http://127.0.0.1:{port}'
+            except OSError:
+                time.sleep(0.2)
+        process.terminate()
+        raise CommandError('The server did not start within 30 seconds.')
+
+    async def run_load(self, generator, modules, password, duration):
+        """
+        Logs the users in and runs the workload.
+
+        Args:
+            generator (LoadGenerator): The load generator.
+            modules (dict): The ids of the modules of every user, keyed by email.
+            password (str): The password of the users.
+            duration (float): The duration in seconds.
+
+        Returns:
+            float: The measured wall time in seconds.
+        """
+        await generator.authenticate(modules, password)
+        return await generator.run(duration)
+
+    def handle(self, *args, **options):
+        """
+        Handle method for executing the command.
+
+        Args:
+            *args: Additional arguments.
+            **options: Additional keyword arguments.
+        """
+        if not settings.DEBUG:
+            raise CommandError('The load test seeds user accounts and only runs with DEBUG on.')
+        try:
+            mix = parse_mix(options['mix'])
+            if options['url']:
+                parse_local_url(options['url'])
+        except ValueError as error:
+            raise CommandError(str(error))
+        if options['users'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--users and --concurrency must be at least 1.')
+
+        password = options['password'] or secrets.token_urlsafe(16)
+        modules = seed_users(options['users'], password)
+        process, url = (None, options['url']) if options['url'] else self.start_server(options['server_workers'])
+        try:
+            generator = LoadGenerator(*parse_local_url(url), mix, options['concurrency'])
+            self.stdout.write(f"Running {options['duration']:g}s against {url} with {options['users']} users "
+                              f"and {options['concurrency']} connections")
+            try:
+                elapsed = asyncio.run(self.run_load(generator, modules, password, options['duration']))
+            except (HTTPError, OSError) as error:
+                raise CommandError(f'The load test could not start: {error}')
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+            if not options['keep']:
+                delete_seeded_users()
+
+        self.stdout.write(f'{"operation":<10} {"requests":>9} {"errors":>7} {"error %":>8} {"req/s":>9} '
+                          f'{"p50 ms":>8} {"p90 ms":>8} {"p99 ms":>8} {"max ms":>8}')
+        for row in generator.report(elapsed):
+            line = (f'{row["operation"]:<10} {row["requests"]:>9} {row["errors"]:>7} {row["error_rate"]:>8.2%} '
+                    f'{row["throughput"]:>9.1f} {row["p50"]:>8.1f} {row["p90"]:>8.1f} {row["p99"]:>8.1f} '
+                    f'{row["max"]:>8.1f}')
+            style = self.style.MIGRATE_HEADING if row['operation'] == 'total' else str
+            self.stdout.write(style(line))
@@ -0,0 +1,115 @@
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+# Code run in a fresh interpreter to reproduce the start-up of every entry point
+ENTRY_POINTS = {
+    'web': (
+        'import config.wsgi\n'
+        'from django.urls import get_resolver\n'
+        'get_resolver().url_patterns\n'
+    ),
+    'worker': (
+        'from config.celery import app\n'
+        'app.loader.import_default_modules()\n'
+        'app.finalize()\n'
+    ),
+    'beat': (
+        'from config.celery import app\n'
+        'app.loader.import_default_modules()\n'
+        'app.finalize()\n'
+        'import django_celery_beat.schedulers\n'
+    ),
+}
+
+
+def parse_importtime(output):
+    """
+    Parses the output of 'python -X importtime'.
+
+    Args:
+        output (str): The standard error of the interpreter.
+
+    Returns:
+        list: Tuples of module name, self time and cumulative time in microseconds.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, cumulative_time, module = line[len('import time:'):].split('|', 2)
+        imports.append((module.strip(), int(self_time), int(cumulative_time)))
+    return imports
+
+
+class Command(BaseCommand):
+    """
+    Management command to report the slowest imports of the web, worker and beat entry points.
+
+    Every entry point is started in a fresh interpreter with '-X importtime', so the report reflects a cold start.
+    """
+    help = 'Reports the slowest imports of the web, worker and beat entry points.'
+
+    def add_arguments(self, parser):
+        """
+        Adds the command arguments.
+
+        Args:
+            parser: The argument parser.
+        """
+        parser.add_argument('entry_points', nargs='*', help=f'Entry points to profile: {", ".join(ENTRY_POINTS)} '
+                                                            f'(default: all).')
+        parser.add_argument('--limit', type=int, default=20, help='Number of imports to report per entry point.')
+        parser.add_argument('--sort', choices=('cumulative', 'self'), default='cumulative',
+                            help='Sort by cumulative or self import time (default: cumulative).')
+
+    def profile(self, entry_point):
+        """
+        Starts an entry point in a fresh interpreter and collects its import times.
+
+        Args:
+            entry_point (str): The name of the entry point.
+
+        Returns:
+            tuple: The parsed imports and the wall time of the start-up in seconds.
+        """
+        environment = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE',
+                                                                              'config.settings')}
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', ENTRY_POINTS[entry_point]],
+            cwd=settings.BASE_DIR, env=environment, capture_output=True, text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'unknown error'
+            raise CommandError(f'The {entry_point} entry point failed to start: {error}')
+        return parse_importtime(result.stderr), elapsed
+
+    def handle(self, *args, **options):
+        """
+        Handle method for executing the command.
+
+        Args:
+            *args: Additional arguments.
+            **options: Additional keyword arguments.
+        """
+        unknown = set(options['entry_points']) - ENTRY_POINTS.keys()
+        if unknown:
+            raise CommandError(f'Unknown entry points: {", ".join(sorted(unknown))}')
+
+        column = 2 if options['sort'] == 'cumulative' else 1
+        for entry_point in options['entry_points'] or ENTRY_POINTS:
+            imports, elapsed = self.profile(entry_point)
+            total = sum(self_time for _, self_time, _ in imports)
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{entry_point}: {elapsed:.2f}s start-up, {total / 1e6:.2f}s in {len(imports)} imports'
+            ))
+            self.stdout.write(f'{"self ms":>10} {"cumulative ms":>14}  module')
+            for module, self_time, cumulative_time in sorted(imports, key=lambda row: row[column],
+                                                             reverse=True)[:options['limit']]:
+                self.stdout.write(f'{self_time / 1000:>10.1f} {cumulative_time / 1000:>14.1f}  {module}')
@@ -0,0 +1,35 @@
+from django.core.management import BaseCommand
+
+from educational_modules.services import render_lessons
+
+
+class Command(BaseCommand):
+    """
+    Management command to render the content of lessons to HTML.
+
+    Saving a lesson renders its content already; the command fills the lessons inserted without saving them, e.g.
+    by bulk_create or before the rendered column existed, and renders all lessons again with --all.
+    """
+    help = 'Renders the Markdown content of lessons to sanitized HTML.'
+
+    def add_arguments(self, parser):
+        """
+        Adds the command arguments.
+
+        Args:
+            parser: The argument parser.
+        """
+        parser.add_argument('--all', action='store_true', dest='everything',
+                            help='Render all lessons, not only those without rendered content.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Lessons rendered per batch.')
+
+    def handle(self, *args, **options):
+        """
+        Handle method for executing the command.
+
+        Args:
+            *args: Additional arguments.
+            **options: Additional keyword arguments.
+        """
+        rendered = render_lessons(everything=options['everything'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rendered {rendered} lessons'))
@@ -0,0 +1,137 @@
+import os
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import connections
+from django.utils.module_loading import import_string
+from gunicorn.app.base import BaseApplication
+
+from config.warmup import build_serializer_fields, resolve_urlconf, warm_up
+
+WORKER_CLASSES = {
+    'asgi': ('config.asgi.application', 'uvicorn_worker.UvicornWorker'),
+    'wsgi': ('config.wsgi.application', 'sync'),
+}
+
+
+class ServerApplication(BaseApplication):
+    """
+    Gunicorn application serving the project with the options of the serve command.
+
+    Attributes:
+        application_path (str): The dotted path of the ASGI or WSGI application.
+        options (dict): The Gunicorn settings.
+    """
+
+    def __init__(self, application_path, options):
+        self.application_path = application_path
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        """
+        Applies the options to the Gunicorn configuration.
+        """
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        """
+        Imports the application; with preload_app this happens once in the master, before the workers are forked.
+
+        The URLconf is built and the serializer fields are warmed here too, so the forked workers share the loaded
+        modules and model metadata.
+
+        Returns:
+            The ASGI or WSGI application.
+        """
+        application = import_string(self.application_path)
+        resolve_urlconf()
+        build_serializer_fields()
+        return application
+
+
+def close_connections(server, worker):
+    """
+    Gunicorn pre_fork hook closing the master's connections, so no socket is shared with the forked workers.
+
+    Args:
+        server: The Gunicorn arbiter.
+        worker: The worker about to be forked.
+    """
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    """
+    Management command to serve the project with Gunicorn in production.
+
+    The application is imported once in the master and shared by the forked workers. Every worker warms up before
+    it accepts traffic: it resolves the URLconf and builds the serializer fields. Sync workers also open the database
+    and cache connections they keep for CONN_MAX_AGE; ASGI workers, the default, open a connection per request, so
+    there is nothing to open in advance. Workers are recycled after a jittered number of requests, so they restart
+    one by one.
+    """
+    help = 'Serves the project with preloaded, warmed and recycled Gunicorn workers.'
+
+    def add_arguments(self, parser):
+        """
+        Adds the command arguments.
+
+        Args:
+            parser: The argument parser.
+        """
+        parser.add_argument('--bind', default=settings.SERVER_BIND, help='Address to listen on (default: %(default)s).')
+        parser.add_argument('--workers', type=int, default=settings.SERVER_WORKERS or os.cpu_count() or 1,
+                            help='Number of worker processes (default: %(default)s).')
+        parser.add_argument('--worker-class', choices=WORKER_CLASSES, default='asgi',
+                            help='Serve the ASGI application with uvicorn workers or the WSGI application with sync '
+                                 'workers (default: asgi).')
+        parser.add_argument('--max-requests', type=int, default=settings.SERVER_MAX_REQUESTS,
+                            help='Requests after which a worker is restarted, 0 to disable (default: %(default)s).')
+        parser.add_argument('--max-requests-jitter', type=int, default=settings.SERVER_MAX_REQUESTS_JITTER,
+                            help='Random extra requests per worker, spreading the restarts (default: %(default)s).')
+        parser.add_argument('--timeout', type=int, default=settings.SERVER_TIMEOUT,
+                            help='Seconds after which a silent worker is restarted (default: %(default)s).')
+
+    def get_server_options(self, options):
+        """
+        Builds the Gunicorn settings from the command options.
+
+        Args:
+            options (dict): The command options.
+
+        Returns:
+            tuple: The dotted path of the application and the Gunicorn settings.
+        """
+        application_path, worker_class = WORKER_CLASSES[options['worker_class']]
+        asgi = options['worker_class'] == 'asgi'
+
+        def warm_up_worker(worker):
+            timings = warm_up(asgi=asgi)
+            worker.log.info('Worker %s warmed up: %s', worker.pid,
+                            ', '.join(f'{step} {seconds * 1000:.0f} ms' for step, seconds in timings.items()))
+
+        return application_path, {
+            'bind': options['bind'],
+            'workers': options['workers'],
+            'worker_class': worker_class,
+            'preload_app': True,
+            'max_requests': options['max_requests'],
+            'max_requests_jitter': options['max_requests_jitter'],
+            'timeout': options['timeout'],
+            'graceful_timeout': options['timeout'],
+            'accesslog': None,
+            'pre_fork': close_connections,
+            'post_worker_init': warm_up_worker,
+        }
+
+    def handle(self, *args, **options):
+        """
+        Handle method for executing the command.
+
+        Args:
+            *args: Additional arguments.
+            **options: Additional keyword arguments.
+        """
+        ServerApplication(*self.get_server_options(options)).run()
@@ -0,0 +1,46 @@
+from educational_modules.models import Lesson, Module
+from educational_modules.permissions import scope_to_owner
+from users.models import User
+
+# The file fields holding uploads, keyed by their upload_to directory
+MEDIA_FIELDS = {
+    model._meta.get_field(field).upload_to: (model, field)
+    for model, field in ((Module, 'preview'), (Lesson, 'preview'), (User, 'avatar'))
+}
+
+
+def _visible_to(model, user):
+    """
+    Returns the objects whose uploads the user may see, with the rules of their detail endpoints: superusers and
+    moderators see all objects, other users their own.
+
+    Args:
+        model: Module, Lesson or User.
+        user: The authenticated user.
+
+    Returns:
+        QuerySet: The visible objects.
+    """
+    return scope_to_owner(model.objects.all(), user, owner_field='pk' if model is User else 'owner_id')
+
+
+def can_access_media(user, name):
+    """
+    Checks whether the user may download an uploaded file.
+
+    The user has to be allowed to see an object referencing the file. Identical uploads share one file, so that
+    is any module, lesson or user holding the name, not only the one the file was uploaded for. The check is one
+    query on the indexed file field, after the moderator check of users other than superusers.
+
+    Args:
+        user: The authenticated user.
+        name (str): The name of the stored file.
+
+    Returns:
+        bool: True if the user may download the file, False otherwise.
+    """
+    directory = name.split('/', 1)[0] + '/'
+    if directory not in MEDIA_FIELDS:
+        return False
+    model, field = MEDIA_FIELDS[directory]
+    return _visible_to(model, user).filter(**{field: name}).exists()
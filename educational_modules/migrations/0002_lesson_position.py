@@ -0,0 +1,50 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+POSITION_GAP = 1024
+
+
+def number_existing_lessons(apps, schema_editor):
+    """
+    Spaces the positions of existing lessons in every module, keeping their creation order.
+    """
+    Lesson = apps.get_model('educational_modules', 'Lesson')
+    batch = []
+    current_module_id, position = object(), 0
+    for lesson in Lesson.objects.order_by('module_id', 'pk').only('pk', 'module_id').iterator(chunk_size=2000):
+        if lesson.module_id != current_module_id:
+            current_module_id, position = lesson.module_id, 0
+        position += POSITION_GAP
+        lesson.position = position
+        batch.append(lesson)
+        if len(batch) >= 2000:
+            Lesson.objects.bulk_update(batch, ['position'])
+            batch = []
+    Lesson.objects.bulk_update(batch, ['position'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='lesson',
+            options={'ordering': ('module', 'position', 'pk'), 'verbose_name': 'lesson', 'verbose_name_plural': 'lessons'},
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='position',
+            field=models.PositiveIntegerField(default=0, verbose_name='position in the module'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['module', 'position'], name='lesson_module_position_idx'),
+        ),
+        migrations.RunPython(number_existing_lessons, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0002_lesson_position'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='views')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='completed at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='educational_modules.lesson', verbose_name='lesson')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='user')),
+            ],
+            options={
+                'verbose_name': 'lesson progress',
+                'verbose_name_plural': 'lesson progress',
+            },
+        ),
+        migrations.CreateModel(
+            name='ModuleProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_lessons', models.PositiveIntegerField(default=0, verbose_name='completed lessons')),
+                ('total_lessons', models.PositiveIntegerField(default=0, verbose_name='total lessons')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+                ('module', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='educational_modules.module', verbose_name='module')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='user')),
+            ],
+            options={
+                'verbose_name': 'module progress',
+                'verbose_name_plural': 'module progress',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='lessonprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'lesson'), name='unique_lesson_progress'),
+        ),
+        migrations.AddConstraint(
+            model_name='moduleprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'module'), name='unique_module_progress'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+TRIGRAM_INDEXES = (
+    ('module_title_trgm_idx', 'educational_modules_module'),
+    ('lesson_title_trgm_idx', 'educational_modules_lesson'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Creates pg_trgm GIN indexes on the module and lesson titles for the autocomplete endpoints.
+
+    The indexes are built on upper(title), which is the expression Django's icontains lookup compares on
+    PostgreSQL. They exist only on PostgreSQL; other databases keep serving the lookups without them.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table in TRIGRAM_INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (upper(title) gin_trgm_ops)')
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    """
+    Drops the trigram indexes created by create_trigram_indexes.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0003_progress'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
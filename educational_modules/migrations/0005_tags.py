@@ -0,0 +1,52 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:08
+
+from django.db import migrations, models
+
+TAG_INDEXES = (
+    ('module_tags_gin_idx', 'educational_modules_module'),
+    ('lesson_tags_gin_idx', 'educational_modules_lesson'),
+)
+
+
+def create_tag_indexes(apps, schema_editor):
+    """
+    Creates GIN indexes on the module and lesson tags.
+
+    The jsonb_path_ops operator class serves the containment (@>) queries of the tag filter. The indexes exist
+    only on PostgreSQL; other databases filter the tags without them.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table in TAG_INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (tags jsonb_path_ops)')
+
+
+def drop_tag_indexes(apps, schema_editor):
+    """
+    Drops the tag indexes created by create_tag_indexes.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in TAG_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0004_title_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='tags',
+            field=models.JSONField(blank=True, default=list, verbose_name='tags of the lesson'),
+        ),
+        migrations.AddField(
+            model_name='module',
+            name='tags',
+            field=models.JSONField(blank=True, default=list, verbose_name='tags of the module'),
+        ),
+        migrations.RunPython(create_tag_indexes, drop_tag_indexes),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0005_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('module', 'module'), ('lesson', 'lesson')], max_length=10, verbose_name='model')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='object id')),
+                ('owner_id', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='owner id')),
+                ('action', models.CharField(choices=[('save', 'saved'), ('delete', 'deleted')], max_length=10, verbose_name='action')),
+                ('changed_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='changed at')),
+            ],
+            options={
+                'verbose_name': 'change log entry',
+                'verbose_name_plural': 'change log',
+                'indexes': [models.Index(fields=['owner_id', 'id'], name='changelog_owner_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0006_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modules', models.PositiveIntegerField(default=0, verbose_name='modules')),
+                ('lessons', models.PositiveIntegerField(default=0, verbose_name='lessons')),
+                ('lessons_with_video', models.PositiveIntegerField(default=0, verbose_name='lessons with video')),
+                ('change_log_position', models.PositiveBigIntegerField(default=0, verbose_name='change log position')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+            options={
+                'verbose_name': 'catalog stats',
+                'verbose_name_plural': 'catalog stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyContentStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='day')),
+                ('modules_created', models.PositiveIntegerField(default=0, verbose_name='modules created')),
+                ('lessons_created', models.PositiveIntegerField(default=0, verbose_name='lessons created')),
+            ],
+            options={
+                'verbose_name': 'daily content stats',
+                'verbose_name_plural': 'daily content stats',
+                'ordering': ('-day',),
+            },
+        ),
+        migrations.AlterField(
+            model_name='changelogentry',
+            name='action',
+            field=models.CharField(choices=[('create', 'created'), ('save', 'saved'), ('delete', 'deleted')], max_length=10, verbose_name='action'),
+        ),
+        migrations.CreateModel(
+            name='OwnerContentStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner_id', models.PositiveBigIntegerField(blank=True, null=True, unique=True, verbose_name='owner id')),
+                ('modules', models.PositiveIntegerField(default=0, verbose_name='modules')),
+                ('lessons', models.PositiveIntegerField(default=0, verbose_name='lessons')),
+                ('lessons_with_video', models.PositiveIntegerField(default=0, verbose_name='lessons with video')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+            options={
+                'verbose_name': 'owner content stats',
+                'verbose_name_plural': 'owner content stats',
+                'indexes': [models.Index(fields=['-lessons', 'owner_id'], name='owner_stats_lessons_idx')],
+            },
+        ),
+    ]
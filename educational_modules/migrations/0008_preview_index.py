@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0007_content_stats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lesson',
+            name='preview',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='lesson_previews/', verbose_name='preview of lesson'),
+        ),
+        migrations.AlterField(
+            model_name='module',
+            name='preview',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='module_previews/', verbose_name='preview of module'),
+        ),
+    ]
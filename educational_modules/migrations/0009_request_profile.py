@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0008_preview_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10, verbose_name='method')),
+                ('path', models.CharField(max_length=2000, verbose_name='path')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='status code')),
+                ('duration', models.FloatField(verbose_name='duration in seconds')),
+                ('stats', models.BinaryField(verbose_name='profiler statistics')),
+                ('summary', models.TextField(verbose_name='summary')),
+                ('memory_summary', models.TextField(blank=True, verbose_name='memory summary')),
+                ('peak_memory', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='peak traced memory in bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='created at')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='profiled by')),
+            ],
+            options={
+                'verbose_name': 'request profile',
+                'verbose_name_plural': 'request profiles',
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
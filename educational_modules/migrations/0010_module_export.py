@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0009_request_profile'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModuleExport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('ready', 'ready'), ('failed', 'failed')], default='pending', max_length=10, verbose_name='status')),
+                ('archive', models.FileField(blank=True, null=True, upload_to='module_exports/', verbose_name='archive')),
+                ('size', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='size in bytes')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='finished at')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='expires at')),
+                ('module', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exports', to='educational_modules.module', verbose_name='module')),
+                ('requested_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='requested by')),
+            ],
+            options={
+                'verbose_name': 'module export',
+                'verbose_name_plural': 'module exports',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0010_module_export'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='content_html',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='content as HTML'),
+        ),
+    ]
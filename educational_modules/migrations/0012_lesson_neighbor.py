@@ -0,0 +1,45 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0011_lesson_content_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedLessonsState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('change_log_position', models.PositiveBigIntegerField(default=0, verbose_name='change log position')),
+                ('rebuilt_at', models.DateTimeField(blank=True, null=True, verbose_name='rebuilt at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+            options={
+                'verbose_name': 'related lessons state',
+                'verbose_name_plural': 'related lessons state',
+            },
+        ),
+        migrations.CreateModel(
+            name='LessonNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='rank')),
+                ('score', models.FloatField(verbose_name='similarity')),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='educational_modules.lesson', verbose_name='lesson')),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbor_of', to='educational_modules.lesson', verbose_name='similar lesson')),
+            ],
+            options={
+                'verbose_name': 'lesson neighbor',
+                'verbose_name_plural': 'lesson neighbors',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='lessonneighbor',
+            constraint=models.UniqueConstraint(fields=('lesson', 'rank'), name='lesson_neighbor_rank_unique'),
+        ),
+    ]
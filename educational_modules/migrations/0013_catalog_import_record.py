@@ -0,0 +1,31 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0012_lesson_neighbor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogImportRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('import_id', models.UUIDField(verbose_name='import id')),
+                ('model', models.CharField(choices=[('module', 'module'), ('lesson', 'lesson')], max_length=10, verbose_name='model')),
+                ('source_id', models.BigIntegerField(verbose_name='exported id')),
+                ('target_id', models.PositiveBigIntegerField(verbose_name='imported id')),
+            ],
+            options={
+                'verbose_name': 'catalog import record',
+                'verbose_name_plural': 'catalog import records',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='catalogimportrecord',
+            constraint=models.UniqueConstraint(fields=('import_id', 'model', 'source_id'), name='catalog_import_record_unique'),
+        ),
+    ]
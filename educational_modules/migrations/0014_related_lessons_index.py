@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 15:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('educational_modules', '0013_catalog_import_record'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='relatedlessonsstate',
+            name='index',
+            field=models.BinaryField(blank=True, null=True, verbose_name='index'),
+        ),
+    ]
@@ -1,8 +1,14 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 
+from educational_modules.rendering import render_markdown
 from users.models import NULLABLE
 
+LESSON_POSITION_GAP = 1024
+
+MAX_TAGS = 20
+MAX_TAG_LENGTH = 50
+
 
 class Module(models.Model):
     """
@@ -13,12 +19,15 @@ class Module(models.Model):
         description (TextField): Description of the module.
         preview (ImageField): Path to the preview image of the module.
         owner (User): The owner of the module.
+        tags (JSONField): The normalized tags of the module, a JSON array of strings.
     """
     title = models.CharField(max_length=150, verbose_name='module name')
     description = models.TextField(verbose_name='description of the module')
-    preview = models.ImageField(upload_to='module_previews/', verbose_name='preview of module', **NULLABLE)
+    preview = models.ImageField(upload_to='module_previews/', verbose_name='preview of module', db_index=True,
+                                **NULLABLE)
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, verbose_name='owner of the module',
                               **NULLABLE)
+    tags = models.JSONField(default=list, blank=True, verbose_name='tags of the module')
 
     def __str__(self):
         """
@@ -29,6 +38,17 @@ class Module(models.Model):
         """
         return f'{self.title} {self.owner}'
 
+    def save(self, *args, **kwargs):
+        """
+        Saves the module in one transaction with its change log entry, written by the post_save receiver.
+
+        Args:
+            *args: Positional arguments of Model.save.
+            **kwargs: Keyword arguments of Model.save.
+        """
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'module'
         verbose_name_plural = 'modules'
@@ -43,19 +63,27 @@ class Lesson(models.Model):
         description (TextField): Description of the lesson.
         preview (ImageField): Field for storing the preview image of the lesson.
         video_url (URLField): The URL link to the video associated with the lesson.
-        content (TextField): Content of the lesson.
+        content (TextField): Content of the lesson, in Markdown.
+        content_html (TextField): The content rendered to sanitized HTML, refreshed whenever the content is saved.
         module (Module): The module to which the lesson belongs.
         owner (User): The owner of the lesson.
+        position (PositiveIntegerField): The sort key of the lesson inside its module. Positions are spaced by
+            LESSON_POSITION_GAP, so a lesson can be moved between two others by updating only its own row.
+        tags (JSONField): The normalized tags of the lesson, a JSON array of strings.
     """
     title = models.CharField(max_length=150, verbose_name='lesson name')
     description = models.TextField(verbose_name='description of the lesson')
-    preview = models.ImageField(upload_to='lesson_previews/', verbose_name='preview of lesson', **NULLABLE)
+    preview = models.ImageField(upload_to='lesson_previews/', verbose_name='preview of lesson', db_index=True,
+                                **NULLABLE)
     video_url = models.URLField(verbose_name='link to video', **NULLABLE)
     content = models.TextField(verbose_name='content of the lesson')
+    content_html = models.TextField(blank=True, default='', editable=False, verbose_name='content as HTML')
 
     module = models.ForeignKey(Module, on_delete=models.CASCADE, **NULLABLE, verbose_name='module')
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, verbose_name='owner of the lesson',
                               **NULLABLE)
+    position = models.PositiveIntegerField(default=0, verbose_name='position in the module')
+    tags = models.JSONField(default=list, blank=True, verbose_name='tags of the lesson')
 
     def __str__(self):
         """
@@ -66,6 +94,458 @@ class Lesson(models.Model):
         """
         return f'{self.title}'
 
+    def save(self, *args, **kwargs):
+        """
+        Saves the lesson, rendering the content to HTML unless only other fields are updated. The lesson is saved in
+        one transaction with its change log entry, written by the post_save receiver.
+
+        Args:
+            *args: Positional arguments of Model.save.
+            **kwargs: Keyword arguments of Model.save.
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.content_html = render_markdown(self.content)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'content_html'}
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'lesson'
         verbose_name_plural = 'lessons'
+        ordering = ('module', 'position', 'pk')
+        indexes = [
+            models.Index(fields=['module', 'position'], name='lesson_module_position_idx'),
+        ]
+
+
+class LessonProgress(models.Model):
+    """
+    A class representing the progress of a user in a lesson.
+
+    Rows are written in batches from the progress buffer by the flush_lesson_progress task, not per request.
+
+    Attributes:
+        user (User): The learner.
+        lesson (Lesson): The lesson.
+        views (PositiveIntegerField): The number of times the user viewed the lesson.
+        completed_at (DateTimeField): The time the user first completed the lesson.
+        updated_at (DateTimeField): The time of the last flush that changed the row.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name='user')
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, verbose_name='lesson')
+    views = models.PositiveIntegerField(default=0, verbose_name='views')
+    completed_at = models.DateTimeField(verbose_name='completed at', **NULLABLE)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='updated at')
+
+    def __str__(self):
+        """
+        Returns a string representation of the lesson progress.
+
+        Returns:
+            str: The user and the lesson.
+        """
+        return f'{self.user_id} {self.lesson_id}'
+
+    class Meta:
+        verbose_name = 'lesson progress'
+        verbose_name_plural = 'lesson progress'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'lesson'], name='unique_lesson_progress'),
+        ]
+
+
+class ModuleProgress(models.Model):
+    """
+    A class representing the precomputed completion of a module by a user.
+
+    Attributes:
+        user (User): The learner.
+        module (Module): The module.
+        completed_lessons (PositiveIntegerField): The number of completed lessons of the module.
+        total_lessons (PositiveIntegerField): The number of lessons in the module at the time of the last flush.
+        updated_at (DateTimeField): The time of the last recalculation.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name='user')
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, verbose_name='module')
+    completed_lessons = models.PositiveIntegerField(default=0, verbose_name='completed lessons')
+    total_lessons = models.PositiveIntegerField(default=0, verbose_name='total lessons')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='updated at')
+
+    def __str__(self):
+        """
+        Returns a string representation of the module progress.
+
+        Returns:
+            str: The user, the module and the completion percentage.
+        """
+        return f'{self.user_id} {self.module_id} {self.percent}%'
+
+    @property
+    def percent(self):
+        """
+        Returns the completion percentage of the module.
+
+        Returns:
+            float: The share of completed lessons in percent.
+        """
+        if not self.total_lessons:
+            return 0.0
+        return round(min(self.completed_lessons, self.total_lessons) * 100 / self.total_lessons, 1)
+
+    class Meta:
+        verbose_name = 'module progress'
+        verbose_name_plural = 'module progress'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'module'], name='unique_module_progress'),
+        ]
+
+
+class ChangeLogEntry(models.Model):
+    """
+    A class representing a change of a module or a lesson, read by the delta sync endpoint.
+
+    The entry id is the sync cursor position. Deleted objects keep their entry as a tombstone until the log is
+    pruned.
+
+    Attributes:
+        model (CharField): The changed model, either 'module' or 'lesson'.
+        object_id (PositiveBigIntegerField): The id of the changed object.
+        owner_id (PositiveBigIntegerField): The id of the object's owner at the time of the change; kept as a plain
+            number so tombstones stay scoped after the owner is deleted.
+        action (CharField): Whether the object was created, saved or deleted.
+        changed_at (DateTimeField): The time of the change.
+    """
+    MODEL_MODULE = 'module'
+    MODEL_LESSON = 'lesson'
+    MODEL_CHOICES = (
+        (MODEL_MODULE, 'module'),
+        (MODEL_LESSON, 'lesson'),
+    )
+
+    ACTION_CREATE = 'create'
+    ACTION_SAVE = 'save'
+    ACTION_DELETE = 'delete'
+    ACTION_CHOICES = (
+        (ACTION_CREATE, 'created'),
+        (ACTION_SAVE, 'saved'),
+        (ACTION_DELETE, 'deleted'),
+    )
+
+    model = models.CharField(max_length=10, choices=MODEL_CHOICES, verbose_name='model')
+    object_id = models.PositiveBigIntegerField(verbose_name='object id')
+    owner_id = models.PositiveBigIntegerField(verbose_name='owner id', **NULLABLE)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name='action')
+    changed_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='changed at')
+
+    def __str__(self):
+        """
+        Returns a string representation of the change.
+
+        Returns:
+            str: The action, the model and the object id.
+        """
+        return f'{self.action} {self.model} {self.object_id}'
+
+    class Meta:
+        verbose_name = 'change log entry'
+        verbose_name_plural = 'change log'
+        indexes = [
+            models.Index(fields=['owner_id', 'id'], name='changelog_owner_idx'),
+        ]
+
+
+class CatalogStats(models.Model):
+    """
+    A class representing the catalog totals, a single row maintained by the refresh_content_stats task.
+
+    Attributes:
+        modules (PositiveIntegerField): The number of modules.
+        lessons (PositiveIntegerField): The number of lessons.
+        lessons_with_video (PositiveIntegerField): The number of lessons with a video link.
+        change_log_position (PositiveBigIntegerField): The id of the last change log entry rolled up.
+        updated_at (DateTimeField): The time of the last refresh.
+    """
+    modules = models.PositiveIntegerField(default=0, verbose_name='modules')
+    lessons = models.PositiveIntegerField(default=0, verbose_name='lessons')
+    lessons_with_video = models.PositiveIntegerField(default=0, verbose_name='lessons with video')
+    change_log_position = models.PositiveBigIntegerField(default=0, verbose_name='change log position')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='updated at')
+
+    def __str__(self):
+        """
+        Returns a string representation of the catalog totals.
+
+        Returns:
+            str: The number of modules and lessons.
+        """
+        return f'{self.modules} modules, {self.lessons} lessons'
+
+    class Meta:
+        verbose_name = 'catalog stats'
+        verbose_name_plural = 'catalog stats'
+
+
+class OwnerContentStats(models.Model):
+    """
+    A class representing the rolled up content of an owner.
+
+    Attributes:
+        owner_id (PositiveBigIntegerField): The id of the owner, None for the content without an owner; kept as a
+            plain number like in the change log.
+        modules (PositiveIntegerField): The number of modules of the owner.
+        lessons (PositiveIntegerField): The number of lessons of the owner.
+        lessons_with_video (PositiveIntegerField): The number of lessons of the owner with a video link.
+        updated_at (DateTimeField): The time of the last recalculation.
+    """
+    owner_id = models.PositiveBigIntegerField(unique=True, verbose_name='owner id', **NULLABLE)
+    modules = models.PositiveIntegerField(default=0, verbose_name='modules')
+    lessons = models.PositiveIntegerField(default=0, verbose_name='lessons')
+    lessons_with_video = models.PositiveIntegerField(default=0, verbose_name='lessons with video')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='updated at')
+
+    def __str__(self):
+        """
+        Returns a string representation of the owner stats.
+
+        Returns:
+            str: The owner id and the number of modules and lessons.
+        """
+        return f'{self.owner_id}: {self.modules} modules, {self.lessons} lessons'
+
+    class Meta:
+        verbose_name = 'owner content stats'
+        verbose_name_plural = 'owner content stats'
+        indexes = [
+            models.Index(fields=['-lessons', 'owner_id'], name='owner_stats_lessons_idx'),
+        ]
+
+
+class DailyContentStats(models.Model):
+    """
+    A class representing the content created on a day.
+
+    Attributes:
+        day (DateField): The day, in the project time zone.
+        modules_created (PositiveIntegerField): The number of modules created on the day.
+        lessons_created (PositiveIntegerField): The number of lessons created on the day.
+    """
+    day = models.DateField(unique=True, verbose_name='day')
+    modules_created = models.PositiveIntegerField(default=0, verbose_name='modules created')
+    lessons_created = models.PositiveIntegerField(default=0, verbose_name='lessons created')
+
+    def __str__(self):
+        """
+        Returns a string representation of the daily stats.
+
+        Returns:
+            str: The day and the number of created modules and lessons.
+        """
+        return f'{self.day}: {self.modules_created} modules, {self.lessons_created} lessons'
+
+    class Meta:
+        verbose_name = 'daily content stats'
+        verbose_name_plural = 'daily content stats'
+        ordering = ('-day',)
+
+
+class RequestProfile(models.Model):
+    """
+    A class representing the profile of a request captured on demand by a superuser.
+
+    Attributes:
+        method (CharField): The HTTP method of the request.
+        path (CharField): The path of the request, with the query string.
+        status_code (PositiveSmallIntegerField): The status code of the response.
+        duration (FloatField): The time spent on the request in seconds, including the profiler overhead.
+        user (User): The superuser who triggered the profile.
+        stats (BinaryField): The cProfile statistics in the marshal format of pstats, loadable by pstats or snakeviz.
+        summary (TextField): The functions with the highest cumulative time, as printed by pstats.
+        memory_summary (TextField): The lines allocating the most memory, if tracemalloc was requested.
+        peak_memory (PositiveBigIntegerField): The peak of the memory traced by tracemalloc in bytes.
+        created_at (DateTimeField): The time of the request.
+    """
+    method = models.CharField(max_length=10, verbose_name='method')
+    path = models.CharField(max_length=2000, verbose_name='path')
+    status_code = models.PositiveSmallIntegerField(verbose_name='status code')
+    duration = models.FloatField(verbose_name='duration in seconds')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, verbose_name='profiled by',
+                             **NULLABLE)
+    stats = models.BinaryField(verbose_name='profiler statistics')
+    summary = models.TextField(verbose_name='summary')
+    memory_summary = models.TextField(blank=True, verbose_name='memory summary')
+    peak_memory = models.PositiveBigIntegerField(verbose_name='peak traced memory in bytes', **NULLABLE)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='created at')
+
+    def __str__(self):
+        """
+        Returns a string representation of the profile.
+
+        Returns:
+            str: The method, the path and the duration.
+        """
+        return f'{self.method} {self.path} ({self.duration * 1000:.0f} ms)'
+
+    class Meta:
+        verbose_name = 'request profile'
+        verbose_name_plural = 'request profiles'
+        ordering = ('-created_at',)
+
+
+class ModuleExport(models.Model):
+    """
+    A class representing a ZIP archive of a module built for offline use by the export_module task.
+
+    Attributes:
+        module (Module): The exported module.
+        requested_by (User): The user who requested the export; only they can poll and download it.
+        status (CharField): Whether the archive is pending, being built, ready or failed.
+        archive (FileField): The built archive.
+        size (PositiveBigIntegerField): The size of the archive in bytes.
+        error (TextField): The reason of a failed export.
+        created_at (DateTimeField): The time of the request.
+        finished_at (DateTimeField): The time the archive was built or the export failed.
+        expires_at (DateTimeField): The time after which the export and its archive are deleted, MODULE_EXPORT_TTL
+            after the request and again after the archive is built.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'pending'),
+        (STATUS_RUNNING, 'running'),
+        (STATUS_READY, 'ready'),
+        (STATUS_FAILED, 'failed'),
+    )
+
+    module = models.ForeignKey(Module, on_delete=models.CASCADE, related_name='exports', verbose_name='module')
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                     verbose_name='requested by')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='status')
+    archive = models.FileField(upload_to='module_exports/', verbose_name='archive', **NULLABLE)
+    size = models.PositiveBigIntegerField(verbose_name='size in bytes', **NULLABLE)
+    error = models.TextField(blank=True, verbose_name='error')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='created at')
+    finished_at = models.DateTimeField(verbose_name='finished at', **NULLABLE)
+    expires_at = models.DateTimeField(db_index=True, verbose_name='expires at')
+
+    def __str__(self):
+        """
+        Returns a string representation of the export.
+
+        Returns:
+            str: The module id and the status.
+        """
+        return f'export of module {self.module_id} ({self.status})'
+
+    class Meta:
+        verbose_name = 'module export'
+        verbose_name_plural = 'module exports'
+
+
+class LessonNeighbor(models.Model):
+    """
+    A class representing a lesson similar to another one, maintained by the refresh_related_lessons task.
+
+    Attributes:
+        lesson (Lesson): The lesson.
+        neighbor (Lesson): The similar lesson.
+        rank (PositiveSmallIntegerField): The place of the neighbor among the neighbors of the lesson, from 1.
+        score (FloatField): The cosine similarity of the TF-IDF vectors of both lessons.
+    """
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='neighbors', verbose_name='lesson')
+    neighbor = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='neighbor_of',
+                                 verbose_name='similar lesson')
+    rank = models.PositiveSmallIntegerField(verbose_name='rank')
+    score = models.FloatField(verbose_name='similarity')
+
+    def __str__(self):
+        """
+        Returns a string representation of the neighbor.
+
+        Returns:
+            str: The ids of both lessons and the rank.
+        """
+        return f'{self.lesson_id} -> {self.neighbor_id} (#{self.rank})'
+
+    class Meta:
+        verbose_name = 'lesson neighbor'
+        verbose_name_plural = 'lesson neighbors'
+        constraints = [
+            models.UniqueConstraint(fields=['lesson', 'rank'], name='lesson_neighbor_rank_unique'),
+        ]
+
+
+class RelatedLessonsState(models.Model):
+    """
+    A class representing the progress of the related lessons, a single row maintained by the
+    refresh_related_lessons task.
+
+    Attributes:
+        change_log_position (PositiveBigIntegerField): The id of the last change log entry taken into account.
+        index (BinaryField): The lesson vectors the neighbors were computed from, as a compressed NumPy archive,
+            read by the next refresh.
+        rebuilt_at (DateTimeField): The time the neighbors of all lessons were last computed.
+        updated_at (DateTimeField): The time of the last refresh.
+    """
+    change_log_position = models.PositiveBigIntegerField(default=0, verbose_name='change log position')
+    index = models.BinaryField(verbose_name='index', **NULLABLE)
+    rebuilt_at = models.DateTimeField(verbose_name='rebuilt at', **NULLABLE)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='updated at')
+
+    def __str__(self):
+        """
+        Returns a string representation of the state.
+
+        Returns:
+            str: The change log position.
+        """
+        return f'related lessons at change {self.change_log_position}'
+
+    class Meta:
+        verbose_name = 'related lessons state'
+        verbose_name_plural = 'related lessons state'
+
+
+class CatalogImportRecord(models.Model):
+    """
+    A class representing a module or lesson inserted by a catalog import, mapping its exported id to its new id.
+
+    The rows are written in the transaction of their batch, so a batch that committed is never inserted again when
+    the import resumes. They are deleted when the import finishes.
+
+    Attributes:
+        import_id (UUIDField): The import, as stored in its checkpoint file.
+        model (CharField): The imported model, either 'module' or 'lesson'.
+        source_id (BigIntegerField): The id in the exported catalog.
+        target_id (PositiveBigIntegerField): The id in this database.
+    """
+    MODEL_MODULE = 'module'
+    MODEL_LESSON = 'lesson'
+    MODEL_CHOICES = (
+        (MODEL_MODULE, 'module'),
+        (MODEL_LESSON, 'lesson'),
+    )
+
+    import_id = models.UUIDField(verbose_name='import id')
+    model = models.CharField(max_length=10, choices=MODEL_CHOICES, verbose_name='model')
+    source_id = models.BigIntegerField(verbose_name='exported id')
+    target_id = models.PositiveBigIntegerField(verbose_name='imported id')
+
+    def __str__(self):
+        """
+        Returns a string representation of the record.
+
+        Returns:
+            str: The model and both ids.
+        """
+        return f'{self.model} {self.source_id} -> {self.target_id}'
+
+    class Meta:
+        verbose_name = 'catalog import record'
+        verbose_name_plural = 'catalog import records'
+        constraints = [
+            models.UniqueConstraint(fields=['import_id', 'model', 'source_id'], name='catalog_import_record_unique'),
+        ]
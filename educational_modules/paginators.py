@@ -1,7 +1,301 @@
+import json
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.core.paginator import Paginator, Page, PageNotAnInteger, EmptyPage
+from django.db import connections
+from django.db.models import Count, QuerySet, Window
+from django.db.models.query import ModelIterable, ValuesIterable
+from django.utils.functional import cached_property
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+class EstimatedCountPage(Page):
+    """
+    Page of a paginator whose count is estimated.
+
+    The estimate cannot tell whether more rows exist, so the paginator fetches one extra row to find out.
+
+    Attributes:
+        has_more (bool): Whether at least one more row follows this page.
+    """
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        """
+        Checks whether there is a next page.
+
+        Returns:
+            bool: True if rows follow this page, False otherwise.
+        """
+        return self.has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that replaces COUNT(*) with PostgreSQL planner estimates on large tables.
+
+    Unfiltered querysets are estimated from pg_class.reltuples, which is cached for
+    PAGINATION_TABLE_SIZE_CACHE_TIMEOUT seconds. A filtered queryset is only planned with EXPLAIN when the table
+    itself is above PAGINATION_COUNT_ESTIMATE_THRESHOLD; lists of smaller tables are counted exactly without
+    asking the planner. If the estimate is below the threshold, or the database is not PostgreSQL, the exact count
+    is used. When the count is estimated, any page number is accepted and the end of the list is detected by
+    fetching one extra row. An exact count is read with COUNT(*) OVER () in the query of the page itself, unless
+    the page is empty.
+
+    Attributes:
+        count_is_estimated (bool): Whether the count is a planner estimate.
+    """
+    count_is_estimated = False
+    TOTAL_ALIAS = '_pagination_total'
+
+    @staticmethod
+    def _table_size(connection, model):
+        """
+        Returns the row count of a table estimated by pg_class.reltuples, cached for a while.
+
+        Args:
+            connection: The PostgreSQL connection.
+            model: The model of the table.
+
+        Returns:
+            int | None: The estimate, or None for never analyzed tables.
+        """
+        table = model._meta.db_table
+        key = f'pagination:table-size:{connection.alias}:{table}'
+        size = cache.get(key)
+        if size is None:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                               [connection.ops.quote_name(table)])
+                row = cursor.fetchone()
+            size = row[0] if row else -1
+            cache.set(key, size, settings.PAGINATION_TABLE_SIZE_CACHE_TIMEOUT)
+        return size if size >= 0 else None
+
+    def _estimate_count(self):
+        """
+        Returns the planner estimate of the number of rows, if it can be obtained.
+
+        Returns:
+            int | None: The estimate, or None for lists, other databases and never analyzed tables.
+        """
+        if not isinstance(self.object_list, QuerySet):
+            return None
+        queryset = self.object_list.order_by()
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        table_size = self._table_size(connection, queryset.model)
+        if not queryset.query.where and not queryset.query.distinct and queryset.query.group_by is None:
+            return table_size
+        if table_size is None or table_size < settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+            return None
+
+        with connection.cursor() as cursor:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    @cached_property
+    def _estimate(self):
+        """
+        Returns the planner estimate when it is large enough to replace the exact count.
+
+        Returns:
+            int | None: The estimate, or None if the objects have to be counted.
+        """
+        estimate = self._estimate_count()
+        if estimate is not None and estimate >= settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+            return estimate
+        return None
+
+    @cached_property
+    def count(self):
+        """
+        Returns the total number of objects, estimated for large tables.
+
+        Returns:
+            int: The number of objects.
+        """
+        if self._estimate is not None:
+            self.count_is_estimated = True
+            return self._estimate
+        if isinstance(self.object_list, QuerySet):
+            return self.object_list.count()
+        return len(self.object_list)
+
+    def _parse_number(self, number):
+        """
+        Converts a page number to a positive integer without comparing it to the count.
+
+        Args:
+            number: The requested page number.
+
+        Returns:
+            int: The page number.
+
+        Raises:
+            PageNotAnInteger: If the number is not an integer.
+            EmptyPage: If the number is below 1.
+        """
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def _page_with_count(self, number):
+        """
+        Fetches a page of a queryset together with the exact count, in one query.
+
+        Args:
+            number (int): The page number.
+
+        Returns:
+            Page | None: The page, or None if the count cannot be read this way or the page is empty.
+        """
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or self.orphans or queryset.query.distinct \
+                or queryset._iterable_class not in (ModelIterable, ValuesIterable):
+            return None
+        bottom = (number - 1) * self.per_page
+        rows = list(queryset.annotate(**{self.TOTAL_ALIAS: Window(Count('*'))})[bottom:bottom + self.per_page])
+        if not rows:
+            return None
+        for row in rows:
+            total = (row if queryset._iterable_class is ValuesIterable else vars(row)).pop(self.TOTAL_ALIAS)
+        self.__dict__['count'] = total
+        return self._get_page(rows, number, self)
+
+    def validate_number(self, number):
+        """
+        Validates the page number; with an estimated count pages past the estimate are allowed.
+
+        Args:
+            number: The requested page number.
+
+        Returns:
+            int: The validated page number.
+
+        Raises:
+            PageNotAnInteger: If the number is not an integer.
+            EmptyPage: If the number is out of range.
+        """
+        if not self.count or not self.count_is_estimated:
+            return super().validate_number(number)
+        return self._parse_number(number)
+
+    def page(self, number):
+        """
+        Returns the page with the given number.
+
+        Args:
+            number: The page number.
+
+        Returns:
+            Page: The requested page.
+        """
+        if 'count' not in self.__dict__ and self._estimate is None:
+            page = self._page_with_count(self._parse_number(number))
+            if page is not None:
+                return page
+        number = self.validate_number(number)
+        if not self.count_is_estimated:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return EstimatedCountPage(rows[:self.per_page], number, self, has_more=len(rows) > self.per_page)
+
+
+class EstimatedCountAdminMixin:
+    """
+    Admin mixin that paginates the changelist with EstimatedCountPaginator and tells when the count is estimated.
+
+    Attributes:
+        paginator (EstimatedCountPaginator): Paginator that estimates the count of large tables.
+        show_full_result_count (bool): Disables the second, unfiltered COUNT(*) of the changelist.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def changelist_view(self, request, extra_context=None):
+        """
+        Renders the changelist, with a message when the number of results is a planner estimate.
+
+        Args:
+            request: The request object.
+            extra_context (dict): Extra context of the template.
+
+        Returns:
+            HttpResponse: The changelist response.
+        """
+        response = super().changelist_view(request, extra_context)
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if changelist is not None and changelist.paginator.count_is_estimated:
+            messages.info(request, f'The number of {changelist.opts.verbose_name_plural} is an estimate: about '
+                                   f'{changelist.result_count}.')
+        return response
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page number pagination backed by EstimatedCountPaginator.
+
+    The response contains a 'count_is_estimated' flag next to the count.
+
+    Attributes:
+        django_paginator_class (EstimatedCountPaginator): The Django paginator class.
+    """
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        """
+        Returns the paginated response with the estimate flag.
+
+        Args:
+            data: The serialized page.
+
+        Returns:
+            Response: The paginated response.
+        """
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_estimated': self.page.paginator.count_is_estimated,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        """
+        Returns the schema of the paginated response.
+
+        Args:
+            schema (dict): The schema of the results.
+
+        Returns:
+            dict: The schema of the paginated response.
+        """
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimated'] = {'type': 'boolean', 'example': False}
+        return response_schema
 
 
-class ModulePaginator(PageNumberPagination):
+class ModulePaginator(EstimatedCountPagination):
     """
     Paginator for Module objects.
 
@@ -15,7 +309,7 @@ class ModulePaginator(PageNumberPagination):
     max_page_size = 20
 
 
-class LessonPaginator(PageNumberPagination):
+class LessonPaginator(EstimatedCountPagination):
     """
     Paginator for Lesson objects.
 
@@ -1,6 +1,45 @@
 from rest_framework.permissions import BasePermission
 
 
+def is_moderator(user):
+    """
+    Checks if the user is a moderator, querying the groups once per user object.
+
+    The result is stored on the user, so the permission classes and the view of a request share one query.
+
+    Args:
+        user: The user of the request.
+
+    Returns:
+        bool: True if the user is a moderator, False otherwise.
+    """
+    if not hasattr(user, '_is_moderator'):
+        user._is_moderator = user.groups.filter(name='moderator').exists()
+    return user._is_moderator
+
+
+def scope_to_owner(queryset, user, moderators=True, owner_field='owner_id'):
+    """
+    Restricts a queryset to the objects of the user unless the user may access all of them.
+
+    Object lookups of other users then miss in SQL instead of loading the object to check it in Python.
+
+    Args:
+        queryset (QuerySet): The modules, lessons or users.
+        user: The user of the request.
+        moderators (bool): Whether moderators may access all objects.
+        owner_field (str): The field holding the id of the owner, 'pk' for the users themselves.
+
+    Returns:
+        QuerySet: Filtered queryset.
+    """
+    if user.is_superuser or (moderators and is_moderator(user)):
+        return queryset
+    if not user.is_authenticated:
+        return queryset.none()
+    return queryset.filter(**{owner_field: user.pk})
+
+
 class IsModerator(BasePermission):
     """
     Permission class to check if the user is a moderator.
@@ -21,7 +60,7 @@ class IsModerator(BasePermission):
         Returns:
             bool: True if the user is a moderator, False otherwise.
         """
-        if request.user.groups.filter(name='moderator').exists():
+        if is_moderator(request.user):
             return True
         return False
 
@@ -46,7 +85,7 @@ class IsNotModerator(BasePermission):
         Returns:
             bool: True if the user is not a moderator, False otherwise.
         """
-        if not request.user.groups.filter(name='moderator').exists():
+        if not is_moderator(request.user):
             return True
         return False
 
@@ -87,7 +126,7 @@ class IsOwner(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         """
-        Checks if the user is the owner of the object.
+        Checks if the user is the owner of the object by comparing ids, without loading the owner.
 
         Args:
             request: The request object.
@@ -97,6 +136,6 @@ class IsOwner(BasePermission):
         Returns:
             bool: True if the user is the owner, False otherwise.
         """
-        if request.user == obj.owner:
+        if request.user.is_authenticated and obj.owner_id == request.user.pk:
             return True
         return False
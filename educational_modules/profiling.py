@@ -0,0 +1,166 @@
+import cProfile
+import io
+import marshal
+import pstats
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.utils.encoding import escape_uri_path
+
+from educational_modules.api_views.events import authenticate
+from educational_modules.models import RequestProfile
+
+PROFILE_CPU = 'cpu'
+PROFILE_MEMORY = 'memory'
+
+
+def requested_profile(request):
+    """
+    Reads the profiling flag of a request from the PROFILE_HEADER header or the PROFILE_QUERY_PARAMETER parameter.
+
+    Only the raw header and query string are looked at, so requests without the flag pay a dictionary lookup.
+
+    Args:
+        request: The request object.
+
+    Returns:
+        str | None: PROFILE_MEMORY for 'memory', PROFILE_CPU for any other value, None without the flag or for
+            '0'.
+    """
+    value = request.META.get('HTTP_' + settings.PROFILE_HEADER.upper().replace('-', '_'))
+    if value is None and f'{settings.PROFILE_QUERY_PARAMETER}=' in request.META.get('QUERY_STRING', ''):
+        value = request.GET.get(settings.PROFILE_QUERY_PARAMETER)
+    if value is None or value.strip() in ('', '0'):
+        return None
+    return PROFILE_MEMORY if value.strip().lower() == PROFILE_MEMORY else PROFILE_CPU
+
+
+def profiling_user(request):
+    """
+    Returns the superuser who asked for the profile.
+
+    Admin requests carry the user of the session; API requests are authenticated by their JWT access token, which
+    the API views do again later.
+
+    Args:
+        request: The request object.
+
+    Returns:
+        User | None: The superuser, or None if the request is not made by a superuser.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        user = authenticate(request)
+    return user if user is not None and user.is_superuser else None
+
+
+def _memory_summary(snapshot):
+    """
+    Formats the lines holding the most memory in a tracemalloc snapshot.
+
+    Args:
+        snapshot (tracemalloc.Snapshot): The snapshot.
+
+    Returns:
+        str: One line per source line, largest first.
+    """
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+    return '\n'.join(str(statistic) for statistic in snapshot.statistics('lineno')[:settings.PROFILE_SUMMARY_LINES])
+
+
+def profiled_path(request):
+    """
+    Returns the path of a request with its query string, without the access token of the 'token' parameter.
+
+    Args:
+        request: The request object.
+
+    Returns:
+        str: The path.
+    """
+    query = request.GET.copy()
+    query.pop('token', None)
+    path = escape_uri_path(request.path)
+    return f'{path}?{query.urlencode()}' if query else path
+
+
+def save_profile(request, response, user, profiler, duration, snapshot=None, peak_memory=None):
+    """
+    Stores a captured profile and drops the oldest ones beyond PROFILE_KEEP.
+
+    Args:
+        request: The request object.
+        response (HttpResponse): The response.
+        user (User): The superuser who asked for the profile.
+        profiler (cProfile.Profile): The stopped profiler.
+        duration (float): The time spent on the request in seconds.
+        snapshot (tracemalloc.Snapshot): The memory snapshot, if requested.
+        peak_memory (int): The peak of the traced memory in bytes, if requested.
+
+    Returns:
+        RequestProfile: The stored profile.
+    """
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(settings.PROFILE_SUMMARY_LINES)
+    profile = RequestProfile.objects.create(
+        method=request.method,
+        path=profiled_path(request)[:2000],
+        status_code=response.status_code,
+        duration=duration,
+        user=user,
+        stats=marshal.dumps(stats.stats),
+        summary=summary.getvalue(),
+        memory_summary=_memory_summary(snapshot) if snapshot is not None else '',
+        peak_memory=peak_memory,
+    )
+    stale = list(RequestProfile.objects.order_by('-pk').values_list('pk', flat=True)[settings.PROFILE_KEEP:])
+    RequestProfile.objects.filter(pk__in=stale).delete()
+    return profile
+
+
+def capture_profile(request, get_response, mode, user):
+    """
+    Runs a request under cProfile, and tracemalloc if asked for, and stores the profile.
+
+    The id of the profile is returned in the X-Profile-Id header. The body of a streaming response is produced
+    after the profiler stops, so only the view itself is profiled for it.
+
+    Args:
+        request: The request object.
+        get_response: The next middleware or the view handler.
+        mode (str): PROFILE_CPU or PROFILE_MEMORY.
+        user (User): The superuser who asked for the profile.
+
+    Returns:
+        HttpResponse: The response.
+    """
+    trace_memory = mode == PROFILE_MEMORY
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    elif trace_memory:
+        tracemalloc.reset_peak()
+
+    snapshot = peak_memory = None
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        response = get_response(request)
+    finally:
+        profiler.disable()
+        duration = time.perf_counter() - started
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+
+    profile = save_profile(request, response, user, profiler, duration, snapshot, peak_memory)
+    response['X-Profile-Id'] = str(profile.pk)
+    return response
@@ -0,0 +1,355 @@
+import contextlib
+import datetime
+import threading
+from collections import Counter
+
+import redis
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from educational_modules.models import Lesson, LessonProgress, ModuleProgress
+from users.models import User
+
+UPSERT_BATCH_SIZE = 500
+
+
+class InMemoryProgressBuffer:
+    """
+    Process-local progress buffer, a stand-in for Redis in tests and local development. The flush runs in the Celery
+    worker, which never sees the events buffered by the web workers, so the settings refuse it without DEBUG.
+
+    Events move to a flushing area on drain and are dropped only after the flush is acknowledged, so a failed
+    flush is retried with the same events.
+
+    Attributes:
+        location: Unused, accepted for compatibility with the Redis buffer.
+    """
+
+    def __init__(self, location=None):
+        self.location = location
+        self._lock = threading.Lock()
+        self._views = Counter()
+        self._completions = {}
+        self._flushing = None
+        self._flush_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def flush_lock(self):
+        """
+        Holds the flush lock of the process for the duration of a flush.
+
+        Yields:
+            bool: True if the lock was acquired, False if another flush is running.
+        """
+        acquired = self._flush_lock.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._flush_lock.release()
+
+    def record_view(self, user_id, lesson_id):
+        """
+        Buffers a view of a lesson.
+
+        Args:
+            user_id (int): The id of the user.
+            lesson_id (int): The id of the lesson.
+        """
+        with self._lock:
+            self._views[(user_id, lesson_id)] += 1
+
+    def record_completion(self, user_id, lesson_id):
+        """
+        Buffers a completion of a lesson; only the first completion time is kept.
+
+        Args:
+            user_id (int): The id of the user.
+            lesson_id (int): The id of the lesson.
+        """
+        with self._lock:
+            self._completions.setdefault((user_id, lesson_id), timezone.now())
+
+    def drain(self):
+        """
+        Returns the buffered events that have to be flushed.
+
+        Returns:
+            tuple: The view counts and the completion times keyed by (user_id, lesson_id).
+        """
+        with self._lock:
+            if self._flushing is None:
+                self._flushing = (dict(self._views), dict(self._completions))
+                self._views.clear()
+                self._completions.clear()
+            return self._flushing
+
+    def acknowledge(self):
+        """
+        Drops the drained events after they were written to the database.
+        """
+        with self._lock:
+            self._flushing = None
+
+
+class RedisProgressBuffer:
+    """
+    Progress buffer shared by all web workers, stored in two Redis hashes.
+
+    Views are counted with HINCRBY and completions are stored with HSETNX. On drain the hashes are renamed to
+    flushing keys, which are deleted only after the flush is acknowledged. Flushes hold a lock in Redis, so two
+    workers never drain and write the same flushing keys.
+
+    Attributes:
+        client (redis.Redis): The Redis client.
+    """
+    VIEWS_KEY = 'progress:views'
+    COMPLETIONS_KEY = 'progress:completions'
+    FLUSHING_SUFFIX = ':flushing'
+    FLUSH_LOCK_KEY = 'progress:flush-lock'
+
+    def __init__(self, location):
+        self.client = redis.Redis.from_url(location)
+
+    @contextlib.contextmanager
+    def flush_lock(self):
+        """
+        Holds the flush lock, a key set with SET NX and an expiry of PROGRESS_FLUSH_LOCK_TIMEOUT seconds, so a
+        crashed worker does not block the flushes for good.
+
+        Yields:
+            bool: True if the lock was acquired, False if another flush is running.
+        """
+        lock = self.client.lock(self.FLUSH_LOCK_KEY, timeout=settings.PROGRESS_FLUSH_LOCK_TIMEOUT, blocking=False)
+        acquired = lock.acquire()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+
+    @staticmethod
+    def _field(user_id, lesson_id):
+        """
+        Returns the hash field of a (user, lesson) pair.
+
+        Args:
+            user_id (int): The id of the user.
+            lesson_id (int): The id of the lesson.
+
+        Returns:
+            str: The hash field.
+        """
+        return f'{user_id}:{lesson_id}'
+
+    @staticmethod
+    def _parse_field(field):
+        """
+        Parses a hash field back into a (user, lesson) pair.
+
+        Args:
+            field (bytes): The hash field.
+
+        Returns:
+            tuple: The user id and the lesson id.
+        """
+        user_id, lesson_id = field.decode().split(':')
+        return int(user_id), int(lesson_id)
+
+    def record_view(self, user_id, lesson_id):
+        """
+        Buffers a view of a lesson.
+
+        Args:
+            user_id (int): The id of the user.
+            lesson_id (int): The id of the lesson.
+        """
+        self.client.hincrby(self.VIEWS_KEY, self._field(user_id, lesson_id), 1)
+
+    def record_completion(self, user_id, lesson_id):
+        """
+        Buffers a completion of a lesson; only the first completion time is kept.
+
+        Args:
+            user_id (int): The id of the user.
+            lesson_id (int): The id of the lesson.
+        """
+        self.client.hsetnx(self.COMPLETIONS_KEY, self._field(user_id, lesson_id), timezone.now().timestamp())
+
+    def _take(self, key):
+        """
+        Renames a buffer hash to its flushing key unless an unacknowledged flush is still pending, and reads it.
+
+        RENAMENX checks and renames in one command, so events buffered meanwhile are never merged into a pending
+        flush.
+
+        Args:
+            key (str): The buffer key.
+
+        Returns:
+            dict: The raw hash contents.
+        """
+        flushing_key = key + self.FLUSHING_SUFFIX
+        try:
+            self.client.renamenx(key, flushing_key)
+        except redis.ResponseError:
+            # Nothing was buffered since the last flush
+            pass
+        return self.client.hgetall(flushing_key)
+
+    def drain(self):
+        """
+        Returns the buffered events that have to be flushed.
+
+        Returns:
+            tuple: The view counts and the completion times keyed by (user_id, lesson_id).
+        """
+        views = {self._parse_field(field): int(value) for field, value in self._take(self.VIEWS_KEY).items()}
+        completions = {
+            self._parse_field(field): datetime.datetime.fromtimestamp(float(value), tz=datetime.timezone.utc)
+            for field, value in self._take(self.COMPLETIONS_KEY).items()
+        }
+        return views, completions
+
+    def acknowledge(self):
+        """
+        Drops the drained events after they were written to the database.
+        """
+        self.client.delete(self.VIEWS_KEY + self.FLUSHING_SUFFIX, self.COMPLETIONS_KEY + self.FLUSHING_SUFFIX)
+
+
+_buffers = {}
+
+
+def get_progress_buffer():
+    """
+    Returns the progress buffer configured by PROGRESS_BUFFER_BACKEND and PROGRESS_BUFFER_LOCATION.
+
+    Returns:
+        The progress buffer instance, shared by the process.
+    """
+    key = (settings.PROGRESS_BUFFER_BACKEND, settings.PROGRESS_BUFFER_LOCATION)
+    if key not in _buffers:
+        _buffers[key] = import_string(settings.PROGRESS_BUFFER_BACKEND)(settings.PROGRESS_BUFFER_LOCATION)
+    return _buffers[key]
+
+
+def _upsert_lesson_progress(rows):
+    """
+    Inserts or increments lesson progress rows with INSERT ... ON CONFLICT.
+
+    Views are added to the stored count and the first completion time is kept. The statement is understood by
+    both PostgreSQL and SQLite.
+
+    Args:
+        rows (list): Tuples of user id, lesson id, new views and completion time.
+    """
+    table = connection.ops.quote_name(LessonProgress._meta.db_table)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[start:start + UPSERT_BATCH_SIZE]
+        values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))
+        params = []
+        for user_id, lesson_id, views, completed_at in batch:
+            params += [user_id, lesson_id, views, connection.ops.adapt_datetimefield_value(completed_at), now]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (user_id, lesson_id, views, completed_at, updated_at) VALUES {values} '
+                f'ON CONFLICT (user_id, lesson_id) DO UPDATE SET '
+                f'views = {table}.views + EXCLUDED.views, '
+                f'completed_at = COALESCE({table}.completed_at, EXCLUDED.completed_at), '
+                f'updated_at = EXCLUDED.updated_at',
+                params,
+            )
+
+
+def _refresh_module_progress(pairs):
+    """
+    Recalculates the module progress aggregates of the given users and modules with grouped queries.
+
+    Args:
+        pairs (set): Tuples of user id and module id.
+    """
+    user_ids = {user_id for user_id, _ in pairs}
+    module_ids = {module_id for _, module_id in pairs}
+    completed = {
+        (row['user_id'], row['lesson__module_id']): row['count']
+        for row in LessonProgress.objects.filter(
+            user_id__in=user_ids, lesson__module_id__in=module_ids, completed_at__isnull=False,
+        ).values('user_id', 'lesson__module_id').annotate(count=Count('pk')).order_by()
+    }
+    totals = dict(
+        Lesson.objects.filter(module_id__in=module_ids).values('module_id').annotate(count=Count('pk'))
+        .order_by().values_list('module_id', 'count')
+    )
+    ModuleProgress.objects.bulk_create(
+        [
+            ModuleProgress(user_id=user_id, module_id=module_id, completed_lessons=completed.get((user_id, module_id), 0),
+                           total_lessons=totals.get(module_id, 0))
+            for user_id, module_id in pairs
+        ],
+        batch_size=UPSERT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['user', 'module'],
+        update_fields=['completed_lessons', 'total_lessons', 'updated_at'],
+    )
+
+
+def flush_progress(buffer=None):
+    """
+    Writes the buffered progress events to the database and refreshes the affected module aggregates.
+
+    Events for lessons or users deleted in the meantime are dropped. The drain, the write and the acknowledgement
+    run under the flush lock of the buffer; a flush started while another one runs does nothing, since both would
+    add the same drained views.
+
+    Args:
+        buffer: The progress buffer, the configured one by default.
+
+    Returns:
+        int: The number of flushed (user, lesson) pairs.
+    """
+    buffer = buffer or get_progress_buffer()
+    with buffer.flush_lock() as acquired:
+        if not acquired:
+            return 0
+        return _flush(buffer)
+
+
+def _flush(buffer):
+    """
+    Drains the buffer, writes the events and acknowledges them.
+
+    Args:
+        buffer: The progress buffer.
+
+    Returns:
+        int: The number of flushed (user, lesson) pairs.
+    """
+    views, completions = buffer.drain()
+    keys = views.keys() | completions.keys()
+    if not keys:
+        return 0
+
+    lesson_modules = dict(
+        Lesson.objects.filter(pk__in={lesson_id for _, lesson_id in keys}).values_list('pk', 'module_id')
+    )
+    user_ids = set(User.objects.filter(pk__in={user_id for user_id, _ in keys}).values_list('pk', flat=True))
+    keys = sorted(key for key in keys if key[0] in user_ids and key[1] in lesson_modules)
+
+    with transaction.atomic():
+        _upsert_lesson_progress([
+            (user_id, lesson_id, views.get((user_id, lesson_id), 0), completions.get((user_id, lesson_id)))
+            for user_id, lesson_id in keys
+        ])
+        pairs = {
+            (user_id, lesson_modules[lesson_id]) for user_id, lesson_id in keys
+            if (user_id, lesson_id) in completions and lesson_modules[lesson_id] is not None
+        }
+        if pairs:
+            _refresh_module_progress(pairs)
+    buffer.acknowledge()
+    return len(keys)
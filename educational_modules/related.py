@@ -0,0 +1,389 @@
+import io
+import re
+from array import array
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from scipy import sparse
+
+from educational_modules.changes import current_position, settled_entries
+from educational_modules.models import ChangeLogEntry, Lesson, LessonNeighbor, RelatedLessonsState
+
+# Words of two or more letters or digits, in any alphabet
+TOKEN = re.compile(r'\w{2,}')
+
+# Words left out of the vectors: they occur in most lessons, so they only add weak similarities between all of them
+STOP_WORDS = frozenset("""
+    about above after again all also am an and any are as at be because been before being below between both but by
+    can could did do does doing down during each few for from further had has have having he her here hers him his
+    how if in into is it its itself just me more most my no nor not now of off on once only or other our ours out
+    over own same she should so some such than that the their theirs them then there these they this those through
+    to too under until up very was we were what when where which while who whom why will with you your yours
+    без был была были было быть во вот все всё всех вы где да для до его ее её если есть еще ещё же за из или им их
+    как ко когда кто ли мы на над не нет ни но об однако он она они оно от по под при про раз так также там то
+    того тоже только том ты уже чем что чтобы эта эти это этот
+""".split())
+
+
+def tokenize(text):
+    """
+    Splits a text into lowercase words, without the stop words.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list: The words.
+    """
+    return [word for word in TOKEN.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def _read_terms(lessons, vocabulary):
+    """
+    Counts the terms of the title, description and content of lessons.
+
+    Args:
+        lessons (QuerySet): The lessons, in ascending order of their ids.
+        vocabulary (dict): The columns of the terms, extended with the terms seen for the first time.
+
+    Returns:
+        tuple: The lesson ids, and the columns, counts and row offsets of their terms, as NumPy arrays.
+    """
+    ids, indices, counts, indptr = array('q'), array('i'), array('f'), array('q', [0])
+    for pk, title, description, content in lessons.values_list('pk', 'title', 'description', 'content') \
+            .iterator(chunk_size=2000):
+        terms = Counter(tokenize(f'{title}\n{description}\n{content}'))
+        ids.append(pk)
+        indices.extend(vocabulary.setdefault(term, len(vocabulary)) for term in terms)
+        counts.extend(terms.values())
+        indptr.append(len(indices))
+    return (np.frombuffer(ids, dtype=np.int64), np.frombuffer(indices, dtype=np.int32),
+            np.frombuffer(counts, dtype=np.float32), np.frombuffer(indptr, dtype=np.int64))
+
+
+def _weigh(indices, counts, indptr, inverse_frequency):
+    """
+    Builds unit length TF-IDF vectors from term counts, with logarithmically dampened term frequencies.
+
+    Args:
+        indices (ndarray): The columns of the terms.
+        counts (ndarray): The counts of the terms.
+        indptr (ndarray): The offsets of the rows in indices and counts.
+        inverse_frequency (ndarray): The inverse document frequency of every column.
+
+    Returns:
+        csr_array: The vectors, one row per lesson.
+    """
+    data = (1 + np.log(counts)) * inverse_frequency[indices]
+    row_lengths = np.diff(indptr)
+    norms = np.sqrt(np.bincount(np.repeat(np.arange(len(row_lengths)), row_lengths), weights=data ** 2,
+                                minlength=len(row_lengths)))
+    data /= np.repeat(norms, row_lengths).astype(np.float32)
+    return sparse.csr_array((data, indices, indptr), shape=(len(row_lengths), len(inverse_frequency)))
+
+
+def build_index():
+    """
+    Builds the TF-IDF vectors of the title, description and content of all lessons.
+
+    The inverse document frequencies are smoothed, and every vector is scaled to unit length, so the product of two
+    vectors is their cosine similarity. The lessons are read in chunks and only the sparse matrix is kept in memory.
+
+    Returns:
+        dict: The lesson ids in ascending order as 'ids', a NumPy array, the vectors as 'vectors', a CSR array with
+            one row per lesson, the columns of the terms as 'vocabulary' and their inverse document frequencies as
+            'inverse_frequency'.
+    """
+    vocabulary = {}
+    ids, indices, counts, indptr = _read_terms(Lesson.objects.order_by('pk'), vocabulary)
+    document_frequency = np.bincount(indices, minlength=len(vocabulary))
+    inverse_frequency = np.log((1 + len(ids)) / (1 + document_frequency)).astype(np.float32) + 1
+    return {'ids': ids, 'vectors': _weigh(indices, counts, indptr, inverse_frequency), 'vocabulary': vocabulary,
+            'inverse_frequency': inverse_frequency}
+
+
+def update_index(index, lesson_ids):
+    """
+    Replaces the vectors of changed lessons in an index, keeping its vocabulary and document frequencies.
+
+    Only the changed lessons are read. Their terms missing from the vocabulary are added with the weight of a term
+    of a single lesson, and the lessons that no longer exist are dropped.
+
+    Args:
+        index (dict): The index, as returned by build_index, updated in place.
+        lesson_ids (set): The ids of the changed lessons.
+    """
+    vocabulary = index['vocabulary']
+    known_terms = len(vocabulary)
+    ids, indices, counts, indptr = _read_terms(Lesson.objects.filter(pk__in=lesson_ids).order_by('pk'), vocabulary)
+    rare_frequency = np.log((1 + len(index['ids'])) / 2).astype(np.float32) + 1
+    index['inverse_frequency'] = np.concatenate([
+        index['inverse_frequency'], np.full(len(vocabulary) - known_terms, rare_frequency, dtype=np.float32),
+    ])
+
+    kept = ~np.isin(index['ids'], np.fromiter(lesson_ids, dtype=np.int64, count=len(lesson_ids)))
+    unchanged = index['vectors'][kept]
+    unchanged = sparse.csr_array((unchanged.data, unchanged.indices, unchanged.indptr),
+                                 shape=(unchanged.shape[0], len(vocabulary)))
+    all_ids = np.concatenate([index['ids'][kept], ids])
+    order = np.argsort(all_ids, kind='stable')
+    index['ids'] = all_ids[order]
+    index['vectors'] = sparse.vstack([unchanged, _weigh(indices, counts, indptr, index['inverse_frequency'])],
+                                     format='csr')[order]
+
+
+def _prune(similarities):
+    """
+    Drops the similarities below RELATED_LESSONS_MIN_SCORE, which stem from a few shared common words.
+
+    Args:
+        similarities (sparray): A product of vectors.
+
+    Returns:
+        csr_array: The remaining similarities.
+    """
+    similarities = similarities.tocsr()
+    similarities.data[similarities.data < settings.RELATED_LESSONS_MIN_SCORE] = 0
+    similarities.eliminate_zeros()
+    return similarities
+
+
+def _top(neighbor_ids, scores, limit):
+    """
+    Selects the most similar neighbors, the most similar first and ties broken by the lower id.
+
+    Args:
+        neighbor_ids (ndarray): The ids of the candidate neighbors.
+        scores (ndarray): Their similarity.
+        limit (int): The number of neighbors to keep.
+
+    Returns:
+        list: Tuples of neighbor id and similarity.
+    """
+    if len(scores) > limit:
+        # Everything tied with the last kept score stays a candidate, so the lower ids win the ties
+        kept = scores >= -np.partition(-scores, limit - 1)[limit - 1]
+        neighbor_ids, scores = neighbor_ids[kept], scores[kept]
+    order = np.lexsort((neighbor_ids, -scores))[:limit]
+    return list(zip(neighbor_ids[order].tolist(), scores[order].tolist()))
+
+
+def _write_neighbors(neighbors):
+    """
+    Replaces the neighbors of lessons.
+
+    Args:
+        neighbors (dict): The neighbors keyed by lesson id, as lists of tuples of neighbor id and similarity.
+    """
+    with transaction.atomic():
+        LessonNeighbor.objects.filter(lesson_id__in=neighbors).delete()
+        LessonNeighbor.objects.bulk_create([
+            LessonNeighbor(lesson_id=lesson_id, neighbor_id=neighbor_id, rank=rank, score=score)
+            for lesson_id, lesson_neighbors in neighbors.items()
+            for rank, (neighbor_id, score) in enumerate(lesson_neighbors, start=1)
+        ], batch_size=1000)
+
+
+def _compute_neighbors(ids, vectors, rows):
+    """
+    Computes and stores the neighbors of some lessons among all lessons.
+
+    The similarities are computed with one sparse matrix product per RELATED_LESSONS_BATCH_SIZE lessons, which
+    bounds the memory held by the products, and pruned before the neighbors are selected.
+
+    Args:
+        ids (ndarray): The ids of all lessons, as in the index.
+        vectors (csr_array): The vectors of all lessons.
+        rows (ndarray): The rows of the lessons to compute the neighbors of.
+    """
+    transposed = vectors.T.tocsr()
+    for start in range(0, len(rows), settings.RELATED_LESSONS_BATCH_SIZE):
+        batch = rows[start:start + settings.RELATED_LESSONS_BATCH_SIZE]
+        similarities = _prune(vectors[batch] @ transposed)
+        neighbors = {}
+        for row, lesson_id in enumerate(ids[batch].tolist()):
+            columns = similarities.indices[similarities.indptr[row]:similarities.indptr[row + 1]]
+            scores = similarities.data[similarities.indptr[row]:similarities.indptr[row + 1]]
+            others = ids[columns] != lesson_id
+            neighbors[lesson_id] = _top(ids[columns][others], scores[others], settings.RELATED_LESSONS_LIMIT)
+        _write_neighbors(neighbors)
+
+
+def _merge_neighbors(ids, to_changed, changed_ids, rows):
+    """
+    Adds changed lessons to the stored neighbors of other lessons they became similar to.
+
+    Args:
+        ids (ndarray): The ids of all lessons, as in the index.
+        to_changed (csr_array): The similarities of all lessons to the changed lessons, one row per lesson.
+        changed_ids (ndarray): The ids of the changed lessons, in the order of the columns of to_changed.
+        rows (ndarray): The rows of the lessons to update.
+    """
+    for start in range(0, len(rows), settings.RELATED_LESSONS_BATCH_SIZE):
+        batch = rows[start:start + settings.RELATED_LESSONS_BATCH_SIZE]
+        candidates = {lesson_id: {} for lesson_id in ids[batch].tolist()}
+        stored = LessonNeighbor.objects.filter(lesson_id__in=candidates).values_list('lesson_id', 'neighbor_id',
+                                                                                     'score')
+        for lesson_id, neighbor_id, score in stored:
+            candidates[lesson_id][neighbor_id] = score
+        for row, lesson_id in zip(batch.tolist(), candidates):
+            start_index, end_index = to_changed.indptr[row], to_changed.indptr[row + 1]
+            candidates[lesson_id].update(zip(changed_ids[to_changed.indices[start_index:end_index]].tolist(),
+                                             to_changed.data[start_index:end_index].tolist()))
+        _write_neighbors({
+            lesson_id: _top(np.fromiter(scores.keys(), dtype=np.int64, count=len(scores)),
+                            np.fromiter(scores.values(), dtype=np.float64, count=len(scores)),
+                            settings.RELATED_LESSONS_LIMIT)
+            for lesson_id, scores in candidates.items()
+        })
+
+
+def _rows_of(ids, lesson_ids):
+    """
+    Finds the rows of lessons in the vectors, skipping the lessons that no longer exist.
+
+    Args:
+        ids (ndarray): The ids of all lessons, as in the index.
+        lesson_ids (set): The lesson ids.
+
+    Returns:
+        ndarray: The rows, in ascending order.
+    """
+    lesson_ids = np.fromiter(lesson_ids, dtype=np.int64, count=len(lesson_ids))
+    rows = np.searchsorted(ids, lesson_ids)
+    found = rows < len(ids)
+    rows = rows[found]
+    return np.unique(rows[ids[rows] == lesson_ids[found]])
+
+
+def dump_index(index):
+    """
+    Serializes an index to a compressed NumPy archive, without pickles.
+
+    The terms are stored as one UTF-8 text in the order of their columns; words never contain a line break.
+
+    Args:
+        index (dict): The index, as returned by build_index.
+
+    Returns:
+        bytes: The archive.
+    """
+    vectors = index['vectors']
+    output = io.BytesIO()
+    np.savez_compressed(
+        output, ids=index['ids'], data=vectors.data, indices=vectors.indices, indptr=vectors.indptr,
+        shape=np.array(vectors.shape), inverse_frequency=index['inverse_frequency'],
+        terms=np.frombuffer('\n'.join(index['vocabulary']).encode(), dtype=np.uint8),
+    )
+    return output.getvalue()
+
+
+def load_index(data):
+    """
+    Reads an index serialized by dump_index.
+
+    Args:
+        data (bytes): The archive.
+
+    Returns:
+        dict: The index, as returned by build_index.
+    """
+    with np.load(io.BytesIO(data)) as stored:
+        terms = stored['terms'].tobytes().decode()
+        return {
+            'ids': stored['ids'],
+            'vectors': sparse.csr_array((stored['data'], stored['indices'], stored['indptr']),
+                                        shape=tuple(stored['shape'].tolist())),
+            'vocabulary': {term: column for column, term in enumerate(terms.split('\n'))} if terms else {},
+            'inverse_frequency': stored['inverse_frequency'],
+        }
+
+
+def _save_state(position, index, rebuilt=False):
+    """
+    Records the change log position the neighbors are up to date with, together with the index for the next run.
+
+    The index is stored in the database rather than the cache, so every Celery worker finds it and it is never
+    evicted.
+
+    Args:
+        position (int): The id of the last change log entry taken into account.
+        index (dict): The index the neighbors were computed from.
+        rebuilt (bool): Whether the neighbors of all lessons were computed.
+    """
+    defaults = {'change_log_position': position, 'index': dump_index(index)}
+    if rebuilt:
+        defaults['rebuilt_at'] = timezone.now()
+    RelatedLessonsState.objects.update_or_create(pk=1, defaults=defaults)
+
+
+def rebuild_related_lessons():
+    """
+    Computes the vectors of all lessons from scratch, with new document frequencies, and the neighbors of all
+    lessons.
+
+    The index of the vectors is stored for the next refresh_related_lessons runs.
+
+    Returns:
+        int: The number of lessons whose neighbors were computed.
+    """
+    # Taken before the lessons are read, so the changes made meanwhile are picked up by the next refresh
+    position = current_position()
+    index = build_index()
+    _compute_neighbors(index['ids'], index['vectors'], np.arange(len(index['ids'])))
+    _save_state(position, index, rebuilt=True)
+    return len(index['ids'])
+
+
+def refresh_related_lessons():
+    """
+    Brings the neighbors up to date with the lessons changed since the last run, read from the change log.
+
+    Only the changed lessons are read and vectorized; the vectors of the others come from the index stored by the
+    previous run, with the vocabulary and document frequencies of the last rebuild. The changed lessons and the
+    lessons listing one of them get their neighbors computed again. A changed lesson is merged into the stored
+    neighbors of any other lesson it is now more similar to than the last of them. The products thus cover the
+    changed lessons and not the whole catalog. Lessons that listed a deleted lesson keep one neighbor less; the
+    daily rebuild_related_lessons corrects that and the drift of the document frequencies. Without a previous run,
+    or without a stored index, all lessons are computed.
+
+    Returns:
+        int: The number of lessons whose neighbors were updated.
+    """
+    state = RelatedLessonsState.objects.filter(pk=1).first()
+    if state is None or state.index is None:
+        return rebuild_related_lessons()
+    index = load_index(state.index)
+    position = current_position()
+    changed = set(settled_entries().filter(
+        pk__gt=state.change_log_position, pk__lte=position, model=ChangeLogEntry.MODEL_LESSON,
+    ).values_list('object_id', flat=True))
+    if changed:
+        update_index(index, changed)
+    ids, vectors = index['ids'], index['vectors']
+    if not changed or not len(ids):
+        _save_state(position, index)
+        return 0
+    changed_rows = _rows_of(ids, changed)
+    listing = set(LessonNeighbor.objects.filter(neighbor_id__in=changed).values_list('lesson_id', flat=True))
+    recomputed_rows = _rows_of(ids, changed | listing)
+    _compute_neighbors(ids, vectors, recomputed_rows)
+
+    to_changed = _prune(vectors @ vectors[changed_rows].T)
+    best = np.zeros(len(ids), dtype=np.float32)
+    np.maximum.at(best, np.repeat(np.arange(len(ids)), np.diff(to_changed.indptr)), to_changed.data)
+    # The similarity a new neighbor has to reach, 0 for lessons with fewer neighbors than the limit
+    threshold = np.zeros(len(ids), dtype=np.float32)
+    last = dict(LessonNeighbor.objects.filter(rank=settings.RELATED_LESSONS_LIMIT).values_list('lesson_id', 'score'))
+    last_ids = np.fromiter(last.keys(), dtype=np.int64, count=len(last))
+    last_rows = np.minimum(np.searchsorted(ids, last_ids), len(ids) - 1)
+    found = ids[last_rows] == last_ids
+    threshold[last_rows[found]] = np.fromiter(last.values(), dtype=np.float32, count=len(last))[found]
+    merged_rows = np.setdiff1d(np.flatnonzero((best > 0) & (best >= threshold)), recomputed_rows, assume_unique=True)
+    _merge_neighbors(ids, to_changed, ids[changed_rows], merged_rows)
+
+    _save_state(position, index)
+    return len(recomputed_rows) + len(merged_rows)
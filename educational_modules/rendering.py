@@ -0,0 +1,47 @@
+import threading
+
+import markdown
+import nh3
+
+MARKDOWN_EXTENSIONS = ('fenced_code', 'tables', 'sane_lists')
+
+# The HTML produced by the Markdown extensions above; everything else, e.g. raw <script> or event handler
+# attributes written into the content, is stripped
+ALLOWED_TAGS = {
+    'a', 'blockquote', 'br', 'code', 'del', 'em', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'img', 'li', 'ol', 'p',
+    'pre', 'strong', 'table', 'tbody', 'td', 'th', 'thead', 'tr', 'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'code': {'class'},
+    'img': {'src', 'alt', 'title'},
+    'ol': {'start'},
+    'td': {'align'},
+    'th': {'align'},
+}
+ALLOWED_URL_SCHEMES = {'http', 'https', 'mailto'}
+
+_cleaner = nh3.Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, url_schemes=ALLOWED_URL_SCHEMES,
+                       link_rel='noopener noreferrer nofollow')
+
+# Markdown converters keep state while converting, so every thread gets its own
+_local = threading.local()
+
+
+def render_markdown(text):
+    """
+    Renders lesson content written in Markdown to sanitized HTML.
+
+    Args:
+        text (str): The Markdown text.
+
+    Returns:
+        str: The HTML, safe to insert into a page.
+    """
+    if not text:
+        return ''
+    converter = getattr(_local, 'converter', None)
+    if converter is None:
+        converter = _local.converter = markdown.Markdown(extensions=list(MARKDOWN_EXTENSIONS))
+    html = converter.reset().convert(text)
+    return _cleaner.clean(html)
@@ -0,0 +1,14 @@
+from rest_framework import serializers
+
+
+class TitleSuggestionSerializer(serializers.Serializer):
+    """
+    Serializer describing a title suggestion of the autocomplete endpoints.
+
+    Attributes:
+        pk (serializers.IntegerField): The id of the suggested object.
+        title (serializers.CharField): The title of the suggested object.
+    """
+
+    pk = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(read_only=True)
@@ -0,0 +1,37 @@
+from rest_framework import serializers
+
+from educational_modules.models import ChangeLogEntry
+from educational_modules.serializers.lesson import LessonSerializer
+from educational_modules.serializers.module import ModuleSerializer
+
+
+class TombstoneSerializer(serializers.Serializer):
+    """
+    Serializer describing a deleted module or lesson in the delta sync response.
+
+    Attributes:
+        model (serializers.ChoiceField): The model of the deleted object.
+        pk (serializers.IntegerField): The id of the deleted object.
+    """
+
+    model = serializers.ChoiceField(choices=ChangeLogEntry.MODEL_CHOICES, read_only=True)
+    pk = serializers.IntegerField(read_only=True)
+
+
+class ChangesSerializer(serializers.Serializer):
+    """
+    Serializer describing the delta sync response.
+
+    Attributes:
+        cursor (serializers.CharField): The cursor to pass with the next request.
+        has_more (serializers.BooleanField): Whether more changes follow the returned ones.
+        modules (ModuleSerializer): The modules saved since the cursor.
+        lessons (LessonSerializer): The lessons saved since the cursor.
+        deleted (TombstoneSerializer): The modules and lessons deleted since the cursor.
+    """
+
+    cursor = serializers.CharField(read_only=True)
+    has_more = serializers.BooleanField(read_only=True)
+    modules = ModuleSerializer(many=True, read_only=True)
+    lessons = LessonSerializer(many=True, read_only=True)
+    deleted = TombstoneSerializer(many=True, read_only=True)
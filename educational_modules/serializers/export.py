@@ -0,0 +1,44 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from educational_modules.models import ModuleExport
+
+
+class ModuleExportSerializer(serializers.ModelSerializer):
+    """
+    Serializer for ModuleExport objects, polled by the client until the archive is ready.
+
+    Attributes:
+        download_url (serializers.SerializerMethodField): The URL of the archive once it is ready.
+        class Meta: Inner class containing metadata for the serializer.
+    """
+
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        """
+        Metadata for the ModuleExportSerializer.
+
+        Attributes:
+            model (ModuleExport): The model class associated with the serializer.
+            fields (tuple): Tuple containing the fields to be serialized.
+        """
+        model = ModuleExport
+        fields = ('pk', 'module', 'status', 'size', 'error', 'created_at', 'finished_at', 'expires_at',
+                  'download_url',)
+
+    def get_download_url(self, obj):
+        """
+        Returns the absolute URL of the archive.
+
+        Args:
+            obj (ModuleExport): The export.
+
+        Returns:
+            str | None: The URL, or None until the archive is ready.
+        """
+        if obj.status != ModuleExport.STATUS_READY:
+            return None
+        url = reverse('modules:module-export-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
@@ -0,0 +1,183 @@
+from collections import defaultdict
+
+from educational_modules.models import Lesson, Module
+from educational_modules.serializers.lesson import LessonSerializer, included_fields
+from educational_modules.serializers.module import ModuleSerializer
+
+
+class ValuesReadSerializer:
+    """
+    Read-only serializer that builds the representation of a ModelSerializer from .values() rows.
+
+    Only the declared fields are fetched and every object becomes a plain dictionary, so no model instances or
+    per-field serializer objects are created. The output is identical to the one of the ModelSerializer.
+
+    Attributes:
+        model: The model class.
+        fields (tuple): The fields of the representation, in the order of the ModelSerializer.
+        file_fields (tuple): The file fields, represented by their absolute URL.
+        optional_fields (tuple): The fields represented only when requested with '?include='.
+        context (dict): The serializer context with the request.
+    """
+    model = None
+    fields = ()
+    file_fields = ()
+    optional_fields = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        if self.optional_fields:
+            included = included_fields(self.context)
+            self.fields = tuple(field for field in self.fields
+                                if field not in self.optional_fields or field in included)
+
+    @property
+    def value_fields(self):
+        """
+        Returns the fields fetched from the database.
+
+        Returns:
+            tuple: The field names.
+        """
+        return self.fields
+
+    def values(self, queryset):
+        """
+        Returns the queryset fetching the rows of the representation.
+
+        Args:
+            queryset (QuerySet): The objects to represent.
+
+        Returns:
+            QuerySet: The rows as dictionaries.
+        """
+        return queryset.values(*self.value_fields)
+
+    def row_from_instance(self, instance):
+        """
+        Builds the row of an already fetched instance.
+
+        Args:
+            instance: The model instance.
+
+        Returns:
+            dict: The row.
+        """
+        row = {}
+        for field in self.value_fields:
+            if field == 'pk':
+                row[field] = instance.pk
+            else:
+                row[field] = getattr(instance, self.model._meta.get_field(field).attname)
+        for field in self.file_fields:
+            row[field] = row[field].name if row[field] else row[field]
+        return row
+
+    def file_url(self, field, name):
+        """
+        Returns the URL of a stored file like DRF's FileField does.
+
+        Args:
+            field (str): The name of the file field.
+            name (str): The name of the stored file.
+
+        Returns:
+            str | None: The absolute URL, or None for an empty field.
+        """
+        if not name:
+            return None
+        url = self.model._meta.get_field(field).storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def to_representation(self, row):
+        """
+        Converts a row into the representation of the object.
+
+        Args:
+            row (dict): The row.
+
+        Returns:
+            dict: The representation.
+        """
+        for field in self.file_fields:
+            row[field] = self.file_url(field, row[field])
+        return row
+
+    def represent(self, rows):
+        """
+        Converts a list of rows into representations.
+
+        Args:
+            rows (list): The rows.
+
+        Returns:
+            list: The representations.
+        """
+        return [self.to_representation(row) for row in rows]
+
+
+class LessonReadSerializer(ValuesReadSerializer):
+    """
+    Read-only counterpart of LessonSerializer.
+
+    Attributes:
+        model (Lesson): The model class.
+        fields (tuple): The fields of LessonSerializer.
+        file_fields (tuple): The file fields.
+        optional_fields (tuple): The optional fields of LessonSerializer.
+    """
+    model = Lesson
+    fields = LessonSerializer.Meta.fields
+    file_fields = ('preview',)
+    optional_fields = LessonSerializer.optional_fields
+
+
+class ModuleReadSerializer(ValuesReadSerializer):
+    """
+    Read-only counterpart of ModuleSerializer.
+
+    The lessons of all represented modules are fetched with one query.
+
+    Attributes:
+        model (Module): The model class.
+        fields (tuple): The fields of ModuleSerializer.
+        file_fields (tuple): The file fields.
+    """
+    model = Module
+    fields = ModuleSerializer.Meta.fields
+    file_fields = ('preview',)
+
+    @property
+    def value_fields(self):
+        """
+        Returns the fields fetched from the database, without the computed lessons fields.
+
+        Returns:
+            tuple: The field names.
+        """
+        return tuple(field for field in self.fields if field not in ('lessons_count', 'lessons'))
+
+    def represent(self, rows):
+        """
+        Converts a list of module rows into representations with their lessons.
+
+        Args:
+            rows (list): The module rows.
+
+        Returns:
+            list: The representations.
+        """
+        lesson_serializer = LessonReadSerializer(self.context)
+        lessons = defaultdict(list)
+        lesson_rows = lesson_serializer.values(Lesson.objects.filter(module_id__in=[row['pk'] for row in rows]))
+        for lesson in lesson_serializer.represent(list(lesson_rows)):
+            lessons[lesson['module']].append(lesson)
+
+        representations = []
+        for row in rows:
+            row = self.to_representation(row)
+            row['lessons_count'] = len(lessons[row['pk']])
+            row['lessons'] = lessons[row['pk']]
+            representations.append({field: row[field] for field in self.fields})
+        return representations
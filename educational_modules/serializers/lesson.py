@@ -1,17 +1,44 @@
 from rest_framework import serializers
 
-from educational_modules.models import Lesson
-from educational_modules.validiators import validate_module_owner
+from educational_modules.models import Lesson, MAX_TAG_LENGTH
+from educational_modules.validiators import validate_module_owner, normalize_tags
+
+
+def included_fields(context):
+    """
+    Returns the optional fields requested with the 'include' query parameter, e.g. '?include=content_html'.
+
+    Args:
+        context (dict): The serializer context.
+
+    Returns:
+        set: The field names.
+    """
+    request = context.get('request')
+    if request is None:
+        return set()
+    include = getattr(request, 'query_params', request.GET).get('include', '')
+    return {field.strip() for field in include.split(',') if field.strip()}
 
 
 class LessonSerializer(serializers.ModelSerializer):
     """
     Serializer for Lesson objects.
 
+    The optional fields are only represented when requested with '?include=', so lists stay small for the clients
+    that do not need them.
+
     Attributes:
+        tags (serializers.ListField): Field to represent the tags of the lesson.
+        optional_fields (tuple): The fields represented only on request.
         class Meta: Inner class containing metadata for the serializer.
     """
 
+    tags = serializers.ListField(child=serializers.CharField(max_length=MAX_TAG_LENGTH, allow_blank=True),
+                                 required=False)
+
+    optional_fields = ('content_html',)
+
     class Meta:
         """
         Metadata for the LessonSerializer.
@@ -21,7 +48,26 @@ class LessonSerializer(serializers.ModelSerializer):
             fields (tuple): Tuple containing the fields to be serialized.
         """
         model = Lesson
-        fields = ('pk', 'title', 'description', 'preview', 'video_url', 'content', 'module', 'owner',)
+        fields = ('pk', 'title', 'description', 'preview', 'video_url', 'content', 'module', 'owner', 'tags',
+                  'content_html',)
+
+    def get_fields(self):
+        """
+        Returns the fields, without the optional fields that were not requested.
+
+        The API documentation describes all fields.
+
+        Returns:
+            dict: The fields keyed by name.
+        """
+        fields = super().get_fields()
+        if getattr(self.context.get('view'), 'swagger_fake_view', False):
+            return fields
+        included = included_fields(self.context)
+        for name in self.optional_fields:
+            if name not in included:
+                fields.pop(name)
+        return fields
 
     def validate_module(self, module_value):
         """
@@ -38,3 +84,39 @@ class LessonSerializer(serializers.ModelSerializer):
         """
         user = self.context['request'].user
         return validate_module_owner(module_value, user)
+
+    def validate_tags(self, tags_value):
+        """
+        Normalizes the tags.
+
+        Args:
+            tags_value (list): The value of the tags field.
+
+        Returns:
+            list: The normalized tags.
+        """
+        return normalize_tags(tags_value)
+
+
+class LessonMoveSerializer(serializers.Serializer):
+    """
+    Serializer for moving a lesson inside its module.
+
+    The anchor is looked up among the other lessons of the module only, so the ids of lessons elsewhere, which may
+    belong to other users, get the same error as ids that do not exist.
+
+    Attributes:
+        after (serializers.PrimaryKeyRelatedField): The lesson to place the moved lesson after, or null to place it
+            first in the module.
+    """
+
+    after = serializers.PrimaryKeyRelatedField(queryset=Lesson.objects.all(), allow_null=True)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        lesson = self.context.get('lesson')
+        if lesson is not None:
+            siblings = Lesson.objects.filter(module_id=lesson.module_id).exclude(pk=lesson.pk)
+            if lesson.module_id is None:
+                siblings = siblings.filter(owner_id=lesson.owner_id)
+            self.fields['after'].queryset = siblings
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 
-from educational_modules.models import Module
+from educational_modules.models import Module, MAX_TAG_LENGTH
 from educational_modules.serializers.lesson import LessonSerializer
+from educational_modules.validiators import normalize_tags
 
 
 class ModuleSerializer(serializers.ModelSerializer):
@@ -11,11 +12,14 @@ class ModuleSerializer(serializers.ModelSerializer):
     Attributes:
         lessons_count (serializers.IntegerField): Field to represent the count of lessons in the module.
         lessons (LessonSerializer): Serializer for the lessons associated with the module.
+        tags (serializers.ListField): Field to represent the tags of the module.
         class Meta: Inner class containing metadata for the serializer.
     """
 
     lessons_count = serializers.IntegerField(source='lesson_set.all.count', required=False)
     lessons = LessonSerializer(source='lesson_set.all', many=True, required=False)
+    tags = serializers.ListField(child=serializers.CharField(max_length=MAX_TAG_LENGTH, allow_blank=True),
+                                 required=False)
 
     class Meta:
         """
@@ -28,5 +32,17 @@ class ModuleSerializer(serializers.ModelSerializer):
         """
         model = Module
         fields = (
-            'pk', 'title', 'description', 'preview', 'lessons_count', 'lessons', 'owner',)
+            'pk', 'title', 'description', 'preview', 'lessons_count', 'lessons', 'owner', 'tags',)
         read_only_fields = ('owner',)
+
+    def validate_tags(self, tags_value):
+        """
+        Normalizes the tags.
+
+        Args:
+            tags_value (list): The value of the tags field.
+
+        Returns:
+            list: The normalized tags.
+        """
+        return normalize_tags(tags_value)
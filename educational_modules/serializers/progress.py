@@ -0,0 +1,26 @@
+from rest_framework import serializers
+
+from educational_modules.models import ModuleProgress
+
+
+class ModuleProgressSerializer(serializers.ModelSerializer):
+    """
+    Serializer for ModuleProgress objects.
+
+    Attributes:
+        percent (serializers.FloatField): Field to represent the completion percentage of the module.
+        class Meta: Inner class containing metadata for the serializer.
+    """
+
+    percent = serializers.FloatField(read_only=True)
+
+    class Meta:
+        """
+        Metadata for the ModuleProgressSerializer.
+
+        Attributes:
+            model (ModuleProgress): The model class associated with the serializer.
+            fields (tuple): Tuple containing the fields to be serialized.
+        """
+        model = ModuleProgress
+        fields = ('module', 'completed_lessons', 'total_lessons', 'percent', 'updated_at',)
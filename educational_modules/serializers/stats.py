@@ -0,0 +1,62 @@
+from rest_framework import serializers
+
+from educational_modules.models import DailyContentStats, OwnerContentStats
+
+
+class DailyContentStatsSerializer(serializers.ModelSerializer):
+    """
+    Serializer for DailyContentStats objects.
+
+    Attributes:
+        class Meta: Inner class containing metadata for the serializer.
+    """
+
+    class Meta:
+        """
+        Metadata for the DailyContentStatsSerializer.
+
+        Attributes:
+            model (DailyContentStats): The model class associated with the serializer.
+            fields (tuple): Tuple containing the fields to be serialized.
+        """
+        model = DailyContentStats
+        fields = ('day', 'modules_created', 'lessons_created',)
+
+
+class OwnerContentStatsSerializer(serializers.ModelSerializer):
+    """
+    Serializer for OwnerContentStats objects.
+
+    Attributes:
+        class Meta: Inner class containing metadata for the serializer.
+    """
+
+    class Meta:
+        """
+        Metadata for the OwnerContentStatsSerializer.
+
+        Attributes:
+            model (OwnerContentStats): The model class associated with the serializer.
+            fields (tuple): Tuple containing the fields to be serialized.
+        """
+        model = OwnerContentStats
+        fields = ('owner_id', 'modules', 'lessons', 'lessons_with_video', 'updated_at',)
+
+
+class ContentStatsSerializer(serializers.Serializer):
+    """
+    Serializer describing the catalog statistics response.
+
+    Attributes:
+        modules (serializers.IntegerField): The number of modules.
+        lessons (serializers.IntegerField): The number of lessons.
+        lessons_with_video (serializers.IntegerField): The number of lessons with a video link.
+        updated_at (serializers.DateTimeField): The time of the last refresh, None before the first one.
+        daily (DailyContentStatsSerializer): The content created on the requested days, the latest first.
+    """
+
+    modules = serializers.IntegerField(read_only=True)
+    lessons = serializers.IntegerField(read_only=True)
+    lessons_with_video = serializers.IntegerField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True, allow_null=True)
+    daily = DailyContentStatsSerializer(many=True, read_only=True)
@@ -0,0 +1,14 @@
+from rest_framework import serializers
+
+
+class TagFacetSerializer(serializers.Serializer):
+    """
+    Serializer describing a tag facet of the tag endpoints.
+
+    Attributes:
+        tag (serializers.CharField): The tag.
+        count (serializers.IntegerField): The number of objects carrying the tag.
+    """
+
+    tag = serializers.CharField(read_only=True)
+    count = serializers.IntegerField(read_only=True)
@@ -0,0 +1,206 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from educational_modules.changes import record_changes
+from educational_modules.events import publish_module_event
+from educational_modules.models import ChangeLogEntry, Lesson, Module, LESSON_POSITION_GAP
+from educational_modules.rendering import render_markdown
+
+
+def next_lesson_position(module):
+    """
+    Returns the position for a lesson appended to the end of a module.
+
+    Args:
+        module (Module): The module of the lesson, or None for lessons without a module.
+
+    Returns:
+        int: The position after the last lesson of the module.
+    """
+    last_position = (
+        Lesson.objects.filter(module=module)
+        .order_by('-position')
+        .values_list('position', flat=True)
+        .first()
+    )
+    return (last_position or 0) + LESSON_POSITION_GAP
+
+
+def _lock_module(module_id):
+    """
+    Locks the row of a module until the end of the transaction, so the positions of its lessons are changed by one
+    transaction at a time.
+
+    Args:
+        module_id (int): The id of the module, or None for lessons without a module, which are not locked.
+    """
+    if module_id is not None:
+        list(Module.objects.select_for_update().filter(pk=module_id).values_list('pk', flat=True))
+
+
+@transaction.atomic
+def renumber_lessons(module_id):
+    """
+    Spaces the positions of all lessons in a module again, keeping their current order.
+
+    The bulk update bypasses the model signals, so the moved lessons are recorded in the change log here and the
+    subscribers of the module get a single 'lessons.renumbered' event.
+
+    Args:
+        module_id (int): The id of the module.
+    """
+    _lock_module(module_id)
+    lessons = list(Lesson.objects.filter(module_id=module_id).only('pk', 'position', 'owner_id'))
+    moved = []
+    for index, lesson in enumerate(lessons, start=1):
+        if lesson.position != index * LESSON_POSITION_GAP:
+            lesson.position = index * LESSON_POSITION_GAP
+            moved.append(lesson)
+    if not moved:
+        return
+    Lesson.objects.bulk_update(moved, ['position'])
+    record_changes(Lesson, [(lesson.pk, lesson.owner_id) for lesson in moved], ChangeLogEntry.ACTION_SAVE)
+    publish_module_event(module_id, 'lessons.renumbered',
+                         {'module': module_id, 'lessons': [lesson.pk for lesson in moved]})
+
+
+def render_lessons(everything=False, batch_size=500):
+    """
+    Renders the content of lessons to HTML in batches, e.g. after lessons were bulk created or the rendering changed.
+
+    The bulk update bypasses the model signals, so the rendered lessons are recorded in the change log with each
+    batch.
+
+    Args:
+        everything (bool): Whether to render all lessons, not only those without rendered content.
+        batch_size (int): The number of lessons rendered and updated per batch.
+
+    Returns:
+        int: The number of rendered lessons.
+    """
+    lessons = Lesson.objects.order_by('pk').only('pk', 'content', 'owner_id')
+    if not everything:
+        lessons = lessons.filter(content_html='').exclude(content='')
+    rendered, last_pk = 0, 0
+    while batch := list(lessons.filter(pk__gt=last_pk)[:batch_size]):
+        for lesson in batch:
+            lesson.content_html = render_markdown(lesson.content)
+        with transaction.atomic():
+            Lesson.objects.bulk_update(batch, ['content_html'])
+            record_changes(Lesson, [(lesson.pk, lesson.owner_id) for lesson in batch], ChangeLogEntry.ACTION_SAVE)
+        rendered += len(batch)
+        last_pk = batch[-1].pk
+    return rendered
+
+
+def _position_after(lesson, after):
+    """
+    Computes a free position right after the anchor lesson, or at the start of the module.
+
+    Args:
+        lesson (Lesson): The lesson being moved.
+        after (Lesson): The lesson to place it after, or None to place it first.
+
+    Returns:
+        int | None: The new position, or None if there is no gap left between the neighbours.
+    """
+    siblings = Lesson.objects.filter(module_id=lesson.module_id).exclude(pk=lesson.pk).order_by('position')
+    lower = after.position if after is not None else 0
+    if after is not None:
+        siblings = siblings.filter(position__gt=lower)
+    upper = siblings.values_list('position', flat=True).first()
+
+    if upper is None:
+        return lower + LESSON_POSITION_GAP
+    if upper - lower > 1:
+        return (lower + upper) // 2
+    return None
+
+
+@transaction.atomic
+@transaction.atomic
+def move_lesson(lesson, after=None):
+    """
+    Moves a lesson inside its module.
+
+    The new position is taken from the gap between the neighbours, so normally only the moved lesson's row is
+    updated. The module is renumbered only when the gap is exhausted. The module row is locked first, so concurrent
+    moves and renumberings of the module do not pick the same position.
+
+    Args:
+        lesson (Lesson): The lesson to move.
+        after (Lesson): The lesson of the same module to place it after, or None to place it first.
+
+    Returns:
+        Lesson: The moved lesson.
+    """
+    _lock_module(lesson.module_id)
+    if after is not None:
+        after.refresh_from_db(fields=['position'])
+    position = _position_after(lesson, after)
+    if position is None:
+        renumber_lessons(lesson.module_id)
+        if after is not None:
+            after.refresh_from_db(fields=['position'])
+        position = _position_after(lesson, after)
+
+    lesson.position = position
+    lesson.save(update_fields=['position'])
+    return lesson
+
+
+def autocomplete_titles(queryset, query, scope):
+    """
+    Returns the ids and titles of objects whose title contains the query, cached per query and scope.
+
+    Args:
+        queryset (QuerySet): The objects visible to the user.
+        query (str): The text typed by the user.
+        scope (str): Identifies the visibility of the queryset, e.g. 'all' or the user id, for the cache key.
+
+    Returns:
+        list: Dictionaries with the 'pk' and the 'title' of the matching objects.
+    """
+    query = query.strip()
+    if len(query) < settings.AUTOCOMPLETE_MIN_LENGTH:
+        return []
+
+    digest = hashlib.md5(query.lower().encode()).hexdigest()
+    cache_key = f'autocomplete:{queryset.model._meta.model_name}:{scope}:{digest}'
+    results = cache.get(cache_key)
+    if results is None:
+        results = list(
+            queryset.filter(title__icontains=query).order_by('title', 'pk')
+            .values('pk', 'title')[:settings.AUTOCOMPLETE_LIMIT]
+        )
+        cache.set(cache_key, results, settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+    return results
+
+
+def tag_facets(queryset, limit=None):
+    """
+    Counts how many objects of a queryset carry every tag, with one grouped query.
+
+    Args:
+        queryset (QuerySet): The objects to count the tags of, already scoped and filtered.
+        limit (int): The maximum number of tags to return, TAG_FACETS_LIMIT by default.
+
+    Returns:
+        list: Dictionaries with the 'tag' and its 'count', the most frequent tags first.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.order_by().values('tags').query.sql_with_params()
+    if connection.vendor == 'postgresql':
+        expand, tag_column = 'CROSS JOIN LATERAL jsonb_array_elements_text(tagged.tags) AS tag', 'tag'
+    else:
+        expand, tag_column = 'CROSS JOIN json_each(tagged.tags) AS tag', 'tag.value'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT {tag_column}, COUNT(*) FROM ({sql}) AS tagged {expand} '
+            f'GROUP BY {tag_column} ORDER BY COUNT(*) DESC, {tag_column} LIMIT %s',
+            (*params, limit or settings.TAG_FACETS_LIMIT),
+        )
+        return [{'tag': tag, 'count': count} for tag, count in cursor.fetchall()]
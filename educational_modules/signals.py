@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from educational_modules.changes import record_change
+from educational_modules.events import publish_module_event
+from educational_modules.export import delete_unused_archives
+from educational_modules.models import ChangeLogEntry, Lesson, Module, ModuleExport
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_save, sender=Lesson)
+def log_saved(sender, instance, **kwargs):
+    """
+    Records a created or saved module or lesson in the change log.
+
+    Args:
+        sender: The model class.
+        instance (Module | Lesson): The saved object.
+        **kwargs: Additional keyword arguments of the signal.
+    """
+    record_change(instance, ChangeLogEntry.ACTION_CREATE if kwargs['created'] else ChangeLogEntry.ACTION_SAVE)
+
+
+@receiver(post_delete, sender=Module)
+@receiver(post_delete, sender=Lesson)
+def log_deleted(sender, instance, **kwargs):
+    """
+    Records a deleted module or lesson in the change log as a tombstone.
+
+    Lessons deleted together with their module are recorded as well.
+
+    Args:
+        sender: The model class.
+        instance (Module | Lesson): The deleted object.
+        **kwargs: Additional keyword arguments of the signal.
+    """
+    record_change(instance, ChangeLogEntry.ACTION_DELETE)
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def publish_module_change(sender, instance, **kwargs):
+    """
+    Notifies the subscribers of a module that it was saved or deleted.
+
+    Args:
+        sender: The model class.
+        instance (Module): The changed module.
+        **kwargs: Additional keyword arguments of the signal.
+    """
+    event = 'module.saved' if kwargs['signal'] is post_save else 'module.deleted'
+    publish_module_event(instance.pk, event, {'module': instance.pk})
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def publish_lesson_change(sender, instance, **kwargs):
+    """
+    Notifies the subscribers of the lesson's module that the lesson was saved or deleted.
+
+    Args:
+        sender: The model class.
+        instance (Lesson): The changed lesson.
+        **kwargs: Additional keyword arguments of the signal.
+    """
+    if instance.module_id is None:
+        return
+    event = 'lesson.saved' if kwargs['signal'] is post_save else 'lesson.deleted'
+    publish_module_event(instance.module_id, event, {'lesson': instance.pk, 'module': instance.module_id})
+
+
+@receiver(post_delete, sender=ModuleExport)
+def delete_export_archive(sender, instance, **kwargs):
+    """
+    Deletes the archive of a deleted export once the deletion is committed, unless another export holds it.
+
+    Exports deleted together with their module are handled as well.
+
+    Args:
+        sender: The model class.
+        instance (ModuleExport): The deleted export.
+        **kwargs: Additional keyword arguments of the signal.
+    """
+    if instance.archive:
+        name = instance.archive.name
+        transaction.on_commit(lambda: delete_unused_archives({name}))
@@ -0,0 +1,194 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from educational_modules.changes import settled_entries
+from educational_modules.models import CatalogStats, ChangeLogEntry, DailyContentStats, Lesson, Module, \
+    OwnerContentStats
+
+WITH_VIDEO = Q(video_url__isnull=False) & ~Q(video_url='')
+
+STAT_FIELDS = ('modules', 'lessons', 'lessons_with_video')
+
+
+def _owner_scope(queryset, owner_ids):
+    """
+    Restricts a queryset to the objects of the given owners.
+
+    Args:
+        queryset (QuerySet): The modules or lessons.
+        owner_ids (set): The owner ids, None standing for the objects without an owner.
+
+    Returns:
+        QuerySet: Filtered queryset.
+    """
+    condition = Q(owner_id__in=[owner_id for owner_id in owner_ids if owner_id is not None])
+    if None in owner_ids:
+        condition |= Q(owner_id__isnull=True)
+    return queryset.filter(condition)
+
+
+def count_owner_content(owner_ids=None):
+    """
+    Counts the modules, lessons and lessons with a video of owners with two grouped queries.
+
+    Args:
+        owner_ids (set): The owner ids to count, None standing for the objects without an owner; all owners by
+            default.
+
+    Returns:
+        dict: The counts keyed by owner id, as dictionaries with the STAT_FIELDS.
+    """
+    modules, lessons = Module.objects.all(), Lesson.objects.all()
+    if owner_ids is not None:
+        modules, lessons = _owner_scope(modules, owner_ids), _owner_scope(lessons, owner_ids)
+
+    counts = {owner_id: dict.fromkeys(STAT_FIELDS, 0) for owner_id in owner_ids or ()}
+    for row in modules.values('owner_id').annotate(modules=Count('pk')).order_by():
+        counts.setdefault(row['owner_id'], dict.fromkeys(STAT_FIELDS, 0))['modules'] = row['modules']
+    for row in lessons.values('owner_id').annotate(lessons=Count('pk'),
+                                                   lessons_with_video=Count('pk', filter=WITH_VIDEO)).order_by():
+        owner_counts = counts.setdefault(row['owner_id'], dict.fromkeys(STAT_FIELDS, 0))
+        owner_counts['lessons'], owner_counts['lessons_with_video'] = row['lessons'], row['lessons_with_video']
+    return counts
+
+
+def _write_owner_stats(counts):
+    """
+    Replaces the rollup rows of the counted owners and returns how much the totals changed.
+
+    Owners left without content lose their row.
+
+    Args:
+        counts (dict): The counts keyed by owner id, as returned by count_owner_content.
+
+    Returns:
+        dict: The change of every STAT_FIELDS total.
+    """
+    existing = {row.owner_id: row for row in _owner_scope(OwnerContentStats.objects.all(), counts.keys())}
+    delta = dict.fromkeys(STAT_FIELDS, 0)
+    created, updated, emptied = [], [], []
+    for owner_id, owner_counts in counts.items():
+        row = existing.get(owner_id)
+        for field in STAT_FIELDS:
+            delta[field] += owner_counts[field] - (getattr(row, field) if row else 0)
+        if not any(owner_counts.values()):
+            if row:
+                emptied.append(row.pk)
+        elif row is None:
+            created.append(OwnerContentStats(owner_id=owner_id, **owner_counts))
+        else:
+            for field in STAT_FIELDS:
+                setattr(row, field, owner_counts[field])
+            row.updated_at = timezone.now()
+            updated.append(row)
+
+    OwnerContentStats.objects.filter(pk__in=emptied).delete()
+    OwnerContentStats.objects.bulk_create(created)
+    OwnerContentStats.objects.bulk_update(updated, [*STAT_FIELDS, 'updated_at'])
+    return delta
+
+
+def _add_daily_counts(created):
+    """
+    Adds created objects to the daily rollup.
+
+    Args:
+        created (Counter): The number of created objects keyed by (day, model).
+    """
+    for day in sorted({day for day, _ in created}):
+        modules = created[(day, ChangeLogEntry.MODEL_MODULE)]
+        lessons = created[(day, ChangeLogEntry.MODEL_LESSON)]
+        if not DailyContentStats.objects.filter(day=day).update(modules_created=F('modules_created') + modules,
+                                                                 lessons_created=F('lessons_created') + lessons):
+            DailyContentStats.objects.create(day=day, modules_created=modules, lessons_created=lessons)
+
+
+def _lock_catalog_stats():
+    """
+    Returns the catalog totals row locked for the rest of the transaction, rebuilding the rollups on first use.
+
+    Returns:
+        CatalogStats: The locked row.
+    """
+    stats = CatalogStats.objects.select_for_update().filter(pk=1).first()
+    if stats is None:
+        stats = CatalogStats.objects.create(pk=1)
+        _rebuild_owner_stats(stats)
+    return stats
+
+
+def _rebuild_owner_stats(stats):
+    """
+    Recounts the content of all owners and the catalog totals.
+
+    Args:
+        stats (CatalogStats): The locked catalog totals row.
+    """
+    counts = count_owner_content()
+    OwnerContentStats.objects.all().delete()
+    _write_owner_stats(counts)
+    for field in STAT_FIELDS:
+        setattr(stats, field, sum(owner_counts[field] for owner_counts in counts.values()))
+    stats.save()
+
+
+def _refresh_batch():
+    """
+    Rolls up the next batch of settled change log entries.
+
+    Returns:
+        int: The number of rolled up entries.
+    """
+    with transaction.atomic():
+        stats = _lock_catalog_stats()
+        entries = list(
+            settled_entries().filter(pk__gt=stats.change_log_position).order_by('pk')
+            .values_list('pk', 'model', 'owner_id', 'action', 'changed_at')[:settings.CONTENT_STATS_BATCH_SIZE]
+        )
+        if not entries:
+            return 0
+
+        created = Counter(
+            (timezone.localdate(changed_at), model)
+            for _, model, _, action, changed_at in entries if action == ChangeLogEntry.ACTION_CREATE
+        )
+        _add_daily_counts(created)
+        delta = _write_owner_stats(count_owner_content({owner_id for _, _, owner_id, _, _ in entries}))
+        for field in STAT_FIELDS:
+            setattr(stats, field, getattr(stats, field) + delta[field])
+        stats.change_log_position = entries[-1][0]
+        stats.save()
+    return len(entries)
+
+
+def refresh_content_stats():
+    """
+    Brings the rollup tables up to date with the change log.
+
+    The owners touched by the new entries are recounted, so the work depends on the number of changes and not on
+    the size of the catalog. Created objects are added to the day of their creation.
+
+    Returns:
+        int: The number of rolled up change log entries.
+    """
+    refreshed = 0
+    while True:
+        count = _refresh_batch()
+        refreshed += count
+        if count < settings.CONTENT_STATS_BATCH_SIZE:
+            return refreshed
+
+
+@transaction.atomic
+def rebuild_content_stats():
+    """
+    Recounts the content of all owners and the catalog totals from the tables.
+
+    Writes that bypass the change log, such as the owner cleared when a user is deleted, are reconciled this way.
+    The daily rollup is kept, the change log does not reach back far enough to rebuild it.
+    """
+    _rebuild_owner_stats(_lock_catalog_stats())
@@ -0,0 +1,95 @@
+from celery import shared_task
+
+from educational_modules.changes import prune_change_log
+from educational_modules.export import build_export, delete_expired_exports
+from educational_modules.progress import flush_progress
+from educational_modules.related import rebuild_related_lessons, refresh_related_lessons
+from educational_modules.stats import rebuild_content_stats, refresh_content_stats
+
+
+@shared_task
+def flush_lesson_progress():
+    """
+    Celery task to write the buffered lesson views and completions to the database.
+
+    Returns:
+        int: The number of flushed (user, lesson) pairs.
+    """
+    return flush_progress()
+
+
+@shared_task
+def prune_changes():
+    """
+    Celery task to delete the change log entries older than CHANGE_LOG_RETENTION.
+
+    Returns:
+        int: The number of deleted entries.
+    """
+    return prune_change_log()
+
+
+@shared_task
+def refresh_stats():
+    """
+    Celery task to roll up the new change log entries into the moderator statistics.
+
+    Returns:
+        int: The number of rolled up change log entries.
+    """
+    return refresh_content_stats()
+
+
+@shared_task
+def rebuild_stats():
+    """
+    Celery task to recount the per-owner statistics and the catalog totals from the tables.
+    """
+    rebuild_content_stats()
+
+
+@shared_task
+def export_module(export_id):
+    """
+    Celery task to build the ZIP archive of a module export.
+
+    Args:
+        export_id (int): The id of the export.
+
+    Returns:
+        str | None: The final status of the export.
+    """
+    return build_export(export_id)
+
+
+@shared_task
+def delete_exports():
+    """
+    Celery task to delete the module exports older than MODULE_EXPORT_TTL together with their archives.
+
+    Returns:
+        int: The number of deleted exports.
+    """
+    return delete_expired_exports()
+
+
+@shared_task
+def refresh_related():
+    """
+    Celery task to update the related lessons of the lessons changed since the last run.
+
+    Returns:
+        int: The number of lessons whose neighbors were updated.
+    """
+    return refresh_related_lessons()
+
+
+@shared_task
+def rebuild_related():
+    """
+    Celery task to compute the related lessons of all lessons.
+
+    Returns:
+        int: The number of lessons whose neighbors were computed.
+    """
+    return rebuild_related_lessons()
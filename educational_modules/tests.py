@@ -1,11 +1,56 @@
-from unittest import TestCase
-
+import asyncio
+import datetime
+import gzip
+import io
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+import redis
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command, CommandError
+from django.core.paginator import EmptyPage
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db import connection, transaction, DatabaseError
+from django.test import LiveServerTestCase, override_settings, RequestFactory, TransactionTestCase
+from django.utils import timezone
+from PIL import Image
 from rest_framework import status, serializers
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase, APIRequestFactory
-
-from educational_modules.models import Lesson, Module
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.middleware import CompressionMiddleware, RouteMiddleware, choose_encoding, compress
+from config.renderers import ORJSONRenderer
+from config.schema import PrecomputedSchemaView
+from config.storage import ContentAddressedStorage, is_content_addressed
+from config.warmup import iter_views, warm_up
+from educational_modules.catalog import CatalogImporter
+from educational_modules.changes import decode_cursor, encode_cursor, settled_entries, settled_position
+from educational_modules.events import get_event_broker, module_channel
+from educational_modules.loadtest import parse_mix, percentile
+from educational_modules.management.commands.profile_imports import parse_importtime
+from educational_modules.models import Lesson, Module, LessonProgress, ModuleProgress, ChangeLogEntry, \
+    OwnerContentStats, RequestProfile, ModuleExport, LessonNeighbor, CatalogImportRecord, RelatedLessonsState
+from educational_modules.paginators import EstimatedCountPaginator
+from educational_modules.progress import get_progress_buffer, flush_progress
+from educational_modules.related import _read_terms
+from educational_modules.rendering import render_markdown
+from educational_modules.serializers.fast import LessonReadSerializer, ModuleReadSerializer
 from educational_modules.serializers.lesson import LessonSerializer
 from educational_modules.serializers.module import ModuleSerializer
+from educational_modules.tasks import prune_changes, refresh_stats, rebuild_stats, export_module, delete_exports, \
+    refresh_related, rebuild_related
 from educational_modules.validiators import validate_module_owner
 from users.models import User
 
@@ -68,7 +113,8 @@ class LessonTestCase(APITestCase):
                 'video_url': 'https://www.youtube.com/',
                 'content': 'test for create',
                 'module': None,
-                "owner": 1
+                "owner": 1,
+                "tags": []
             }
         )
 
@@ -99,6 +145,7 @@ class LessonTestCase(APITestCase):
             response.json(),
             {
                 "count": 1,
+                "count_is_estimated": False,
                 "next": None,
                 "previous": None,
                 "results": [
@@ -109,7 +156,8 @@ class LessonTestCase(APITestCase):
                      'video_url': 'https://www.youtube.com/',
                      'content': 'list test',
                      'module': None,
-                     'owner': None
+                     'owner': None,
+                     'tags': []
                      }
                 ]
             }
@@ -146,7 +194,8 @@ class LessonTestCase(APITestCase):
                 'video_url': 'https://www.youtube.com/',
                 'content': 'detail test',
                 'module': None,
-                'owner': None
+                'owner': None,
+                'tags': []
             }
         )
 
@@ -191,7 +240,8 @@ class LessonTestCase(APITestCase):
                 'video_url': 'https://www.youtube.com/',
                 'content': 'updated content',
                 'module': None,
-                'owner': None
+                'owner': None,
+                'tags': []
             }
         )
 
@@ -274,7 +324,8 @@ class ModuleTestCase(APITestCase):
                 'preview': None,
                 'lessons_count': 0,
                 'lessons': [],
-                "owner": 6
+                "owner": 6,
+                "tags": []
             }
         )
 
@@ -304,6 +355,7 @@ class ModuleTestCase(APITestCase):
             response.json(),
             {
                 "count": 1,
+                "count_is_estimated": False,
                 "next": None,
                 "previous": None,
                 "results": [
@@ -313,7 +365,8 @@ class ModuleTestCase(APITestCase):
                      'preview': None,
                      'lessons_count': 0,
                      'lessons': [],
-                     'owner': None
+                     'owner': None,
+                     'tags': []
                      }
                 ]
             }
@@ -348,7 +401,8 @@ class ModuleTestCase(APITestCase):
                 'preview': None,
                 'lessons_count': 0,
                 'lessons': [],
-                'owner': None
+                'owner': None,
+                'tags': []
             }
         )
 
@@ -388,7 +442,8 @@ class ModuleTestCase(APITestCase):
                 'preview': None,
                 'lessons_count': 0,
                 'lessons': [],
-                'owner': None
+                'owner': None,
+                'tags': []
             }
         )
 
@@ -558,3 +613,1625 @@ class ValidatorTestCase(APITestCase):
         module_without_owner = Module.objects.create(title='Module without owner')
         with self.assertRaises(serializers.ValidationError):
             validate_module_owner(module_without_owner, user)
+
+
+# Tests for catalog export and import commands
+class TransferCatalogTestCase(APITestCase):
+    """
+    Test case for the export_catalog and import_catalog management commands.
+
+    Attributes:
+        user: The owner of the exported catalog.
+        module: A module created for testing.
+        lesson: A lesson created for testing.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create a module with a lesson and a temporary transfer directory.
+        """
+        self.user = User.objects.create(email='catalog_owner@example.com')
+        self.module = Module.objects.create(title='Catalog module', description='Tab\there', owner=self.user,
+                                            tags=['python', 'with "quotes"'])
+        self.lesson = Lesson.objects.create(title='Catalog lesson', description='Line\nbreak', content='Back\\slash',
+                                            module=self.module, owner=self.user, tags=['intro'])
+        self.directory = tempfile.mkdtemp()
+
+    def assert_catalog_copied(self):
+        """
+        Checks that the module and the lesson were imported as new records linked to each other.
+        """
+        self.assertEqual(Module.objects.count(), 2)
+        imported_module = Module.objects.exclude(pk=self.module.pk).get()
+        imported_lesson = Lesson.objects.exclude(pk=self.lesson.pk).get()
+        self.assertEqual(imported_module.description, self.module.description)
+        self.assertEqual(imported_module.owner, self.user)
+        self.assertEqual(imported_module.tags, self.module.tags)
+        self.assertEqual(imported_lesson.tags, self.lesson.tags)
+        self.assertEqual(imported_lesson.module, imported_module)
+        self.assertEqual(imported_lesson.content, self.lesson.content)
+        self.assertEqual(imported_lesson.description, self.lesson.description)
+        self.assertIsNone(imported_lesson.video_url)
+
+    def test_jsonl_round_trip(self):
+        """
+        Test method to export the catalog as JSONL and import it back.
+        """
+        call_command('export_catalog', self.directory, stdout=io.StringIO())
+        call_command('import_catalog', self.directory, stdout=io.StringIO())
+        self.assert_catalog_copied()
+
+    def test_csv_round_trip(self):
+        """
+        Test method to export the catalog as CSV and import it back.
+        """
+        call_command('export_catalog', self.directory, format='csv', stdout=io.StringIO())
+        call_command('import_catalog', self.directory, format='csv', stdout=io.StringIO())
+        self.assert_catalog_copied()
+
+    def test_import_resumes_from_checkpoint(self):
+        """
+        Test method to check that an interrupted import resumes without duplicating records and that the checkpoint
+        file is deleted once it finishes.
+        """
+        call_command('export_catalog', self.directory, stdout=io.StringIO())
+        with patch.object(CatalogImporter, 'import_lessons', side_effect=RuntimeError('crash')):
+            with self.assertRaises(RuntimeError):
+                call_command('import_catalog', self.directory, batch_size=1, stdout=io.StringIO())
+        checkpoint_path = os.path.join(self.directory, '.import_checkpoint.json')
+        self.assertTrue(os.path.exists(checkpoint_path))
+        call_command('import_catalog', self.directory, batch_size=1, stdout=io.StringIO())
+        self.assertEqual(Module.objects.count(), 2)
+        self.assertEqual(Lesson.objects.count(), 2)
+        self.assertFalse(os.path.exists(checkpoint_path))
+
+    def test_import_skips_committed_batch(self):
+        """
+        Test method to check that a batch committed before the checkpoint was written is not inserted again.
+        """
+        call_command('export_catalog', self.directory, stdout=io.StringIO())
+        save_checkpoint = CatalogImporter._save_checkpoint
+        calls = []
+
+        def crash_after_first_batch(importer):
+            calls.append(importer)
+            if len(calls) == 2:
+                raise RuntimeError('crash')
+            save_checkpoint(importer)
+
+        with patch.object(CatalogImporter, '_save_checkpoint', crash_after_first_batch):
+            with self.assertRaises(RuntimeError):
+                call_command('import_catalog', self.directory, batch_size=1, stdout=io.StringIO())
+        call_command('import_catalog', self.directory, batch_size=1, stdout=io.StringIO())
+        self.assert_catalog_copied()
+        self.assertFalse(CatalogImportRecord.objects.exists())
+
+
+# Tests for lesson ordering inside modules
+class ReorderLessonsTestCase(APITestCase):
+    """
+    Test case for the lesson positions and the move action.
+
+    Attributes:
+        user: The owner of the module.
+        module: A module created for testing.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create a module with three lessons through the API.
+        """
+        self.user = User.objects.create(email='reorder@example.com')
+        self.client.force_authenticate(user=self.user)
+        self.module = Module.objects.create(title='Reorder module', description='Reorder module', owner=self.user)
+        self.lessons = []
+        for title in ('first', 'second', 'third'):
+            response = self.client.post('/lessons/', data={
+                'title': title, 'description': title, 'content': title, 'module': self.module.pk,
+            })
+            self.lessons.append(Lesson.objects.get(pk=response.json()['pk']))
+
+    def module_lesson_titles(self):
+        """
+        Returns the lesson titles in the order of the module detail response.
+
+        Returns:
+            list: The lesson titles.
+        """
+        response = self.client.get(f'/module/detail/{self.module.pk}/')
+        return [lesson['title'] for lesson in response.json()['lessons']]
+
+    def test_lessons_are_appended_in_order(self):
+        """
+        Test that new lessons are appended to the end of the module.
+        """
+        self.assertEqual(self.module_lesson_titles(), ['first', 'second', 'third'])
+
+    def test_move_lesson(self):
+        """
+        Test moving lessons to the start and between two other lessons.
+        """
+        first, second, third = self.lessons
+
+        response = self.client.post(f'/lessons/{third.pk}/move/', data={'after': None}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.module_lesson_titles(), ['third', 'first', 'second'])
+
+        response = self.client.post(f'/lessons/{second.pk}/move/', data={'after': third.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.module_lesson_titles(), ['third', 'second', 'first'])
+
+    def test_move_renumbers_when_gap_is_exhausted(self):
+        """
+        Test that the module is renumbered when there is no free position between the neighbours.
+        """
+        first, second, third = self.lessons
+        Lesson.objects.filter(pk=first.pk).update(position=1)
+        Lesson.objects.filter(pk=second.pk).update(position=2)
+
+        with patch('educational_modules.services.publish_module_event') as publish:
+            response = self.client.post(f'/lessons/{third.pk}/move/', data={'after': first.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.module_lesson_titles(), ['first', 'third', 'second'])
+        publish.assert_called_once_with(self.module.pk, 'lessons.renumbered',
+                                        {'module': self.module.pk, 'lessons': [first.pk, second.pk]})
+        self.assertTrue(ChangeLogEntry.objects.filter(model=ChangeLogEntry.MODEL_LESSON, object_id=second.pk,
+                                                      action=ChangeLogEntry.ACTION_SAVE).exists())
+
+    def test_move_after_lesson_of_another_module(self):
+        """
+        Test that a lesson cannot be placed after a lesson of another module.
+        """
+        other_lesson = Lesson.objects.create(title='other', description='other', content='other', owner=self.user)
+        response = self.client.post(f'/lessons/{self.lessons[0].pk}/move/', data={'after': other_lesson.pk},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Lessons elsewhere cannot be told apart from missing ones
+        missing = self.client.post(f'/lessons/{self.lessons[0].pk}/move/', data={'after': other_lesson.pk + 1000},
+                                   format='json')
+        self.assertEqual(response.json()['after'], [f'Invalid pk "{other_lesson.pk}" - object does not exist.'])
+        self.assertEqual(missing.json()['after'], [f'Invalid pk "{other_lesson.pk + 1000}" - object does not exist.'])
+
+
+# Tests for buffered lesson progress
+@override_settings(PROGRESS_BUFFER_BACKEND='educational_modules.progress.InMemoryProgressBuffer')
+class ProgressTestCase(APITestCase):
+    """
+    Test case for recording lesson progress and the precomputed module completion.
+
+    Attributes:
+        user: The learner.
+        module: A module with two lessons.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create a module with two lessons and an empty progress buffer.
+        """
+        self.user = User.objects.create(email='progress@example.com')
+        self.client.force_authenticate(user=self.user)
+        self.module = Module.objects.create(title='Progress module', description='Progress', owner=self.user)
+        self.lesson = Lesson.objects.create(title='first', description='first', content='first',
+                                            module=self.module, owner=self.user)
+        Lesson.objects.create(title='second', description='second', content='second', module=self.module,
+                              owner=self.user)
+        buffer = get_progress_buffer()
+        buffer.drain()
+        buffer.acknowledge()
+
+    def test_progress_is_buffered_until_flush(self):
+        """
+        Test that events are written to the database only by the flush.
+        """
+        for _ in range(2):
+            response = self.client.post(f'/lessons/{self.lesson.pk}/view/')
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.client.post(f'/lessons/{self.lesson.pk}/complete/')
+        self.assertFalse(LessonProgress.objects.exists())
+
+        self.assertEqual(flush_progress(), 1)
+        progress = LessonProgress.objects.get(user=self.user, lesson=self.lesson)
+        self.assertEqual(progress.views, 2)
+        self.assertIsNotNone(progress.completed_at)
+
+    def test_flush_accumulates_views_and_keeps_first_completion(self):
+        """
+        Test that later flushes add views to the stored row instead of overwriting it.
+        """
+        self.client.post(f'/lessons/{self.lesson.pk}/complete/')
+        flush_progress()
+        completed_at = LessonProgress.objects.get().completed_at
+
+        self.client.post(f'/lessons/{self.lesson.pk}/view/')
+        self.client.post(f'/lessons/{self.lesson.pk}/complete/')
+        flush_progress()
+        progress = LessonProgress.objects.get()
+        self.assertEqual(progress.views, 1)
+        self.assertEqual(progress.completed_at, completed_at)
+
+    def test_overlapping_flush_is_skipped(self):
+        """
+        Test that a flush started while another one holds the lock leaves the events to it.
+        """
+        self.client.post(f'/lessons/{self.lesson.pk}/view/')
+        buffer = get_progress_buffer()
+        with buffer.flush_lock() as acquired:
+            self.assertTrue(acquired)
+            self.assertEqual(flush_progress(), 0)
+        self.assertFalse(LessonProgress.objects.exists())
+        self.assertEqual(flush_progress(), 1)
+        self.assertEqual(LessonProgress.objects.get().views, 1)
+
+    def test_module_progress(self):
+        """
+        Test that the module completion percentage is read from the precomputed aggregate.
+        """
+        self.client.post(f'/lessons/{self.lesson.pk}/complete/')
+        flush_progress()
+        self.assertEqual(ModuleProgress.objects.get().completed_lessons, 1)
+
+        response = self.client.get('/module/progress/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.json()['results'][0]
+        self.assertEqual(result['module'], self.module.pk)
+        self.assertEqual(result['total_lessons'], 2)
+        self.assertEqual(result['percent'], 50.0)
+
+
+# Tests for estimated count pagination
+class PaginatorEstimateTestCase(APITestCase):
+    """
+    Test case for EstimatedCountPaginator and the estimate flag of the list endpoints.
+
+    Attributes:
+        user: A superuser created for authentication.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create three modules and authenticate a superuser.
+        """
+        self.user = User.objects.create(email='estimate@example.com', is_superuser=True)
+        self.client.force_authenticate(user=self.user)
+        for index in range(3):
+            Module.objects.create(title=f'estimate {index}', description='estimate')
+
+    @override_settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=1000)
+    @patch.object(EstimatedCountPaginator, '_estimate_count', return_value=5000)
+    def test_large_estimate_is_used(self, mock_estimate):
+        """
+        Test that an estimate above the threshold replaces the exact count and the next page is still detected.
+        """
+        response = self.client.get('/module/list/', {'page_size': 2})
+        self.assertEqual(response.json()['count'], 5000)
+        self.assertTrue(response.json()['count_is_estimated'])
+        self.assertIsNotNone(response.json()['next'])
+
+        response = self.client.get('/module/list/', {'page_size': 2, 'page': 2})
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertIsNone(response.json()['next'])
+
+    @override_settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=1000)
+    @patch.object(EstimatedCountPaginator, '_estimate_count', return_value=50)
+    def test_small_estimate_uses_exact_count(self, mock_estimate):
+        """
+        Test that the exact count is used below the threshold.
+        """
+        paginator = EstimatedCountPaginator(Module.objects.order_by('pk'), 2)
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.count_is_estimated)
+
+    def test_exact_count_read_with_page(self):
+        """
+        Test that the exact count comes with the rows of the page, and an empty page still counts to fail.
+        """
+        modules = Module.objects.order_by('pk').values('title')
+        paginator = EstimatedCountPaginator(modules, 2)
+        with self.assertNumQueries(1):
+            page = paginator.page(2)
+            self.assertEqual(paginator.count, 3)
+        self.assertEqual(list(page), [{'title': 'estimate 2'}])
+        self.assertFalse(page.has_next())
+
+        with self.assertNumQueries(2), self.assertRaises(EmptyPage):
+            EstimatedCountPaginator(modules, 2).page(3)
+
+    @override_settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=1000)
+    @patch.object(EstimatedCountPaginator, '_estimate_count', return_value=5000)
+    def test_admin_marks_estimate(self, mock_estimate):
+        """
+        Test that the admin changelist tells when the number of results is estimated.
+        """
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.client.get('/admin/educational_modules/module/')
+        self.assertContains(response, 'The number of modules is an estimate: about 5000.')
+
+
+# Tests for the precomputed OpenAPI document
+class SchemaDocsTestCase(APITestCase):
+    """
+    Test case for the generate_schema command and the docs endpoints serving its output.
+    """
+
+    def setUp(self):
+        """
+        Set up method to point OPENAPI_SCHEMA_PATH to a temporary file.
+        """
+        self.schema_path = os.path.join(tempfile.mkdtemp(), 'openapi.json')
+        settings_override = override_settings(OPENAPI_SCHEMA_PATH=self.schema_path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        PrecomputedSchemaView._schema_cache.clear()
+
+    def test_precomputed_schema_is_served_with_cache_headers(self):
+        """
+        Test that the generated file is served with an ETag and answers conditional requests with 304.
+        """
+        call_command('generate_schema', stdout=io.StringIO())
+        with open(self.schema_path, 'rb') as schema_file:
+            content = schema_file.read()
+
+        response = self.client.get('/docs/', {'format': 'openapi'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, content)
+        self.assertIn('max-age', response['Cache-Control'])
+
+        response = self.client.get('/docs/', {'format': 'openapi'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_schema_is_memoized_without_file(self):
+        """
+        Test that without the file the schema is generated once and then reused.
+        """
+        with patch('drf_yasg.generators.OpenAPISchemaGenerator.get_schema',
+                   return_value={'swagger': '2.0'}) as mock_get_schema:
+            first = self.client.get('/docs/', {'format': 'openapi'})
+            second = self.client.get('/docs/', {'format': 'openapi'})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(mock_get_schema.call_count, 1)
+
+
+# Tests for the import-time profiling command
+class StartupProfileTestCase(TestCase):
+    """
+    Test case for the profile_imports management command.
+    """
+
+    def test_parse_importtime(self):
+        """
+        Test parsing of the '-X importtime' output.
+        """
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   encodings.aliases\n'
+            'import time:      2500 |       2620 | encodings\n'
+        )
+        self.assertEqual(parse_importtime(output), [('encodings.aliases', 120, 120), ('encodings', 2500, 2620)])
+
+    def test_unknown_entry_point(self):
+        """
+        Test that an unknown entry point is rejected.
+        """
+        with self.assertRaises(CommandError):
+            call_command('profile_imports', 'scheduler', stdout=io.StringIO())
+
+
+# Tests for the title autocomplete endpoints
+class TitleAutocompleteTestCase(APITestCase):
+    """
+    Test case for the module and lesson title autocomplete.
+
+    Attributes:
+        user: The owner of the matching objects.
+        other_user: A user owning objects with similar titles.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create modules and lessons of two users and clear the cache.
+        """
+        cache.clear()
+        self.user = User.objects.create(email='autocomplete@example.com')
+        self.other_user = User.objects.create(email='autocomplete-other@example.com')
+        for title in ('Python basics', 'Advanced Python', 'Databases'):
+            Module.objects.create(title=title, description=title, owner=self.user)
+            Lesson.objects.create(title=title, description=title, content=title, owner=self.user)
+        Module.objects.create(title='Python for others', description='other', owner=self.other_user)
+        Lesson.objects.create(title='Python for others', description='other', content='other', owner=self.other_user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_module_autocomplete(self):
+        """
+        Test that only the user's modules containing the query are suggested, case-insensitively.
+        """
+        response = self.client.get('/module/autocomplete/', {'q': 'pyth'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([module['title'] for module in response.json()], ['Advanced Python', 'Python basics'])
+
+    def test_lesson_autocomplete(self):
+        """
+        Test that only the user's lessons are suggested, and moderators see everyone's lessons.
+        """
+        response = self.client.get('/lessons/autocomplete/', {'q': 'python'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+
+        moderator = User.objects.create(email='autocomplete-moderator@example.com')
+        moderator.groups.create(name='moderator')
+        self.client.force_authenticate(user=moderator)
+        response = self.client.get('/lessons/autocomplete/', {'q': 'python'})
+        self.assertEqual(len(response.json()), 3)
+
+    def test_short_query(self):
+        """
+        Test that queries shorter than the minimum length return no suggestions without querying the database.
+        """
+        # Only the moderator check
+        with self.assertNumQueries(1):
+            response = self.client.get('/module/autocomplete/', {'q': 'p'})
+        self.assertEqual(response.json(), [])
+
+    def test_suggestions_are_cached(self):
+        """
+        Test that a repeated query is answered from the cache.
+        """
+        self.client.get('/module/autocomplete/', {'q': 'Python'})
+        Module.objects.create(title='Python cached', description='cached', owner=self.user)
+        response = self.client.get('/module/autocomplete/', {'q': 'python'})
+        self.assertEqual(len(response.json()), 2)
+
+
+# Tests for tags
+class TagFilterTestCase(APITestCase):
+    """
+    Test case for the tags of modules and lessons, the tag filter and the facet counts.
+
+    Attributes:
+        user: The owner of the tagged objects.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create tagged modules and lessons of two users.
+        """
+        self.user = User.objects.create(email='tags@example.com')
+        other_user = User.objects.create(email='tags-other@example.com')
+        for tags in (['python', 'web'], ['python'], ['sql']):
+            Module.objects.create(title='Tagged', description='Tagged', owner=self.user, tags=tags)
+            Lesson.objects.create(title='Tagged', description='Tagged', content='Tagged', owner=self.user, tags=tags)
+        Module.objects.create(title='Other', description='Other', owner=other_user, tags=['python'])
+        self.client.force_authenticate(user=self.user)
+
+    def test_tags_are_normalized(self):
+        """
+        Test that tags are stripped, lowercased, deduplicated and sorted on save.
+        """
+        response = self.client.post('/module/create/', data={
+            'title': 'New', 'description': 'New', 'tags': [' Web ', 'python', 'WEB', ''],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['tags'], ['python', 'web'])
+
+    def test_filter_modules_by_tags(self):
+        """
+        Test that the module list returns only the user's modules having all the requested tags.
+        """
+        response = self.client.get('/module/list/', {'tags': 'python'})
+        self.assertEqual(response.json()['count'], 2)
+        response = self.client.get('/module/list/', {'tags': 'Python,web'})
+        self.assertEqual([module['tags'] for module in response.json()['results']], [['python', 'web']])
+
+    def test_filter_lessons_by_tags(self):
+        """
+        Test that the lesson list can be filtered by tags.
+        """
+        response = self.client.get('/lessons/', {'tags': 'sql'})
+        self.assertEqual(response.json()['count'], 1)
+
+    def test_tag_facets(self):
+        """
+        Test that the facet endpoints count the tags of the selected objects.
+        """
+        response = self.client.get('/module/tags/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [
+            {'tag': 'python', 'count': 2}, {'tag': 'sql', 'count': 1}, {'tag': 'web', 'count': 1},
+        ])
+        response = self.client.get('/lessons/tags/', {'tags': 'python'})
+        self.assertEqual(response.json(), [{'tag': 'python', 'count': 2}, {'tag': 'web', 'count': 1}])
+
+
+# Tests for the delta sync endpoint
+@override_settings(CHANGE_LOG_SETTLE_SECONDS=0)
+class SyncChangesTestCase(APITestCase):
+    """
+    Test case for the change log and the delta sync endpoint.
+
+    Attributes:
+        user: The syncing user.
+        cursor (str): The cursor taken before the changes of a test.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create a user with a module and take the current cursor.
+        """
+        self.user = User.objects.create(email='sync@example.com')
+        self.module = Module.objects.create(title='Synced', description='Synced', owner=self.user)
+        self.client.force_authenticate(user=self.user)
+        self.cursor = self.client.get('/changes/').json()['cursor']
+
+    def test_no_changes(self):
+        """
+        Test that a cursor taken after the last change returns nothing and stays valid.
+        """
+        response = self.client.get('/changes/', {'cursor': self.cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        # The cursor is reissued with the current time, only its position has to stay the same
+        self.assertEqual(decode_cursor(data.pop('cursor')), decode_cursor(self.cursor))
+        self.assertEqual(data, {'has_more': False, 'modules': [], 'lessons': [], 'deleted': []})
+
+    def test_saved_and_deleted_objects(self):
+        """
+        Test that saved objects are returned once with their latest state and deleted ones as tombstones.
+        """
+        lesson = Lesson.objects.create(title='New', description='New', content='New', owner=self.user,
+                                       module=self.module)
+        lesson.title = 'Renamed'
+        lesson.save()
+        Lesson.objects.create(title='Other', description='Other', content='Other',
+                              owner=User.objects.create(email='sync-other@example.com'))
+        deleted_module = Module.objects.create(title='Deleted', description='Deleted', owner=self.user)
+        deleted_module_pk = deleted_module.pk
+        deleted_module.delete()
+
+        response = self.client.get('/changes/', {'cursor': self.cursor})
+        data = response.json()
+        self.assertEqual([lesson['title'] for lesson in data['lessons']], ['Renamed'])
+        self.assertEqual(data['modules'], [])
+        self.assertEqual(data['deleted'], [{'model': 'module', 'pk': deleted_module_pk}])
+
+        response = self.client.get('/changes/', {'cursor': data['cursor']})
+        self.assertEqual(response.json()['lessons'], [])
+
+    def test_pages(self):
+        """
+        Test that changes are returned in pages of CHANGE_LOG_PAGE_SIZE entries.
+        """
+        for title in ('first', 'second', 'third'):
+            Lesson.objects.create(title=title, description=title, content=title, owner=self.user)
+        with self.settings(CHANGE_LOG_PAGE_SIZE=2):
+            first_page = self.client.get('/changes/', {'cursor': self.cursor}).json()
+            second_page = self.client.get('/changes/', {'cursor': first_page['cursor']}).json()
+        self.assertTrue(first_page['has_more'])
+        self.assertEqual([lesson['title'] for lesson in first_page['lessons'] + second_page['lessons']],
+                         ['first', 'second', 'third'])
+        self.assertFalse(second_page['has_more'])
+
+    def test_invalid_cursors(self):
+        """
+        Test that malformed cursors are rejected and expired ones require a full sync.
+        """
+        response = self.client.get('/changes/', {'cursor': 'not a cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        expired = encode_cursor(0, issued_at=timezone.now() - datetime.timedelta(days=365))
+        response = self.client.get('/changes/', {'cursor': expired})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_prune_change_log(self):
+        """
+        Test that the prune task deletes only the entries older than the retention.
+        """
+        ChangeLogEntry.objects.update(changed_at=timezone.now() - datetime.timedelta(days=365))
+        Lesson.objects.create(title='Kept', description='Kept', content='Kept', owner=self.user)
+        self.assertEqual(prune_changes(), 1)
+        self.assertEqual(ChangeLogEntry.objects.count(), 1)
+
+
+class SyncWritersTestCase(TransactionTestCase):
+    """
+    Test case for the change log writers outside of a test transaction, in autocommit mode.
+    """
+
+    def test_object_is_not_saved_without_its_entry(self):
+        """
+        Test that a failure to write the change log entry rolls back the saved object.
+        """
+        with patch('educational_modules.signals.record_change', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                Lesson.objects.create(title='Unlogged', description='Unlogged', content='Unlogged')
+        self.assertFalse(Lesson.objects.filter(title='Unlogged').exists())
+
+    @skipUnless(connection.vendor == 'postgresql', 'The writer locks are only taken on PostgreSQL.')
+    def test_uncommitted_writer_holds_back_later_entries(self):
+        """
+        Test that the entry of a committed writer is not served while an older writer is still running.
+        """
+        started, release = threading.Event(), threading.Event()
+
+        def slow_writer():
+            try:
+                with transaction.atomic():
+                    Lesson.objects.create(title='Slow', description='Slow', content='Slow')
+                    started.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=slow_writer)
+        thread.start()
+        try:
+            self.assertTrue(started.wait(10))
+            Lesson.objects.create(title='Fast', description='Fast', content='Fast')
+            fast_entry = ChangeLogEntry.objects.get()
+            self.assertLess(settled_position(), fast_entry.pk)
+            self.assertFalse(settled_entries().exists())
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(settled_entries().count(), 2)
+
+
+# Tests for the module change events
+@override_settings(EVENT_BROKER_BACKEND='educational_modules.events.InMemoryEventBroker', SSE_HEARTBEAT_SECONDS=0.05)
+class ServerSentEventsTestCase(APITestCase):
+    """
+    Test case for the Server-Sent Events stream of module changes.
+
+    Attributes:
+        user: The owner of the module.
+        module: The followed module.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create a module and an access token of its owner.
+        """
+        self.user = User.objects.create(email='events@example.com')
+        self.module = Module.objects.create(title='Live', description='Live', owner=self.user)
+        self.token = str(AccessToken.for_user(self.user))
+
+    def create_lesson(self):
+        """
+        Creates a lesson of the module and runs the on-commit callbacks that publish its event.
+
+        Returns:
+            Lesson: The created lesson.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            return Lesson.objects.create(title='Live', description='Live', content='Live', owner=self.user,
+                                         module=self.module)
+
+    async def test_stream_receives_lesson_events(self):
+        """
+        Test that a saved lesson is pushed to the stream of its module, with heartbeats in between.
+        """
+        response = await self.async_client.get(f'/module/events/{self.module.pk}/',
+                                                headers={'Authorization': f'Bearer {self.token}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        self.assertEqual(await anext(stream), b': heartbeat\n\n')
+
+        next_chunk = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        lesson = await sync_to_async(self.create_lesson)()
+        chunk = await next_chunk
+        while chunk == b': heartbeat\n\n':
+            chunk = await anext(stream)
+        self.assertEqual(json.loads(chunk.decode()[len('data: '):]),
+                         {'event': 'lesson.saved', 'data': {'lesson': lesson.pk, 'module': self.module.pk}})
+
+        # A client disconnect cancels the pending read, which unsubscribes
+        pending_chunk = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        pending_chunk.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending_chunk
+        self.assertNotIn(module_channel(self.module.pk), get_event_broker()._subscriptions)
+
+    @override_settings(SSE_MAX_STREAM_SECONDS=0.1)
+    async def test_stream_ends_after_max_duration(self):
+        """
+        Test that the stream ends on its own after SSE_MAX_STREAM_SECONDS and drops its subscription.
+        """
+        response = await self.async_client.get(f'/module/events/{self.module.pk}/', {'token': self.token})
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertTrue(chunks[0].startswith(b'retry:'))
+        self.assertIn(b': heartbeat\n\n', chunks)
+        self.assertNotIn(module_channel(self.module.pk), get_event_broker()._subscriptions)
+
+    async def test_stream_requires_access(self):
+        """
+        Test that the stream rejects anonymous users and hides the module from users who cannot see it.
+        """
+        response = await self.async_client.get(f'/module/events/{self.module.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        other_user = await User.objects.acreate(email='events-other@example.com')
+        response = await self.async_client.get(f'/module/events/{self.module.pk}/',
+                                                {'token': str(AccessToken.for_user(other_user))})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # A header without a token is rejected like a missing one
+        response = await self.async_client.get(f'/module/events/{self.module.pk}/', headers={'Authorization': 'Bearer'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_broker_failure_does_not_fail_save(self):
+        """
+        Test that a broker that cannot be reached is logged and the lesson is still saved.
+        """
+        with patch('educational_modules.events.get_event_broker', side_effect=redis.ConnectionError), \
+                self.assertLogs(level='ERROR'):
+            lesson = self.create_lesson()
+        self.assertTrue(Lesson.objects.filter(pk=lesson.pk).exists())
+
+
+# Tests for the read-only serialization path
+class ReadSerializerParityTestCase(APITestCase):
+    """
+    Test case checking that the read-only serializers and the orjson renderer match DRF's output.
+
+    Attributes:
+        request: A request used as serializer context.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create modules with and without lessons, previews and tags.
+        """
+        user = User.objects.create(email='parity@example.com')
+        module = Module.objects.create(title='Parity \u2028 module', description='Ünïcode', owner=user,
+                                       preview='module_previews/parity.png', tags=['a', 'b'])
+        Module.objects.create(title='Empty module', description='Empty')
+        for position, title in ((2, 'second'), (1, 'first')):
+            Lesson.objects.create(title=title, description=title, content='"quoted"', owner=user, module=module,
+                                  position=position, video_url='https://www.youtube.com/', tags=['x'])
+        Lesson.objects.create(title='Loose', description='Loose', content='Loose', preview='lesson_previews/l.png')
+        self.request = APIRequestFactory().get('/fake-path/')
+
+    def test_lesson_parity(self):
+        """
+        Test that LessonReadSerializer renders the same JSON as LessonSerializer.
+        """
+        queryset = Lesson.objects.all()
+        expected = LessonSerializer(queryset, many=True, context={'request': self.request}).data
+        read_serializer = LessonReadSerializer({'request': self.request})
+        fast = read_serializer.represent(list(read_serializer.values(queryset)))
+        self.assertEqual(ORJSONRenderer().render(fast), JSONRenderer().render(expected))
+
+        lesson = queryset.first()
+        self.assertEqual(read_serializer.to_representation(read_serializer.row_from_instance(lesson)),
+                         LessonSerializer(lesson, context={'request': self.request}).data)
+
+    def test_module_parity(self):
+        """
+        Test that ModuleReadSerializer renders the same JSON as ModuleSerializer.
+        """
+        queryset = Module.objects.order_by('pk')
+        expected = ModuleSerializer(queryset, many=True, context={'request': self.request}).data
+        read_serializer = ModuleReadSerializer({'request': self.request})
+        fast = read_serializer.represent(list(read_serializer.values(queryset)))
+        self.assertEqual(ORJSONRenderer().render(fast), JSONRenderer().render(expected))
+
+    def test_renderer_falls_back_for_indented_output(self):
+        """
+        Test that indented output is rendered by DRF's JSONRenderer.
+        """
+        data = {'key': [1, 2]}
+        self.assertEqual(ORJSONRenderer().render(data, 'application/json; indent=2'),
+                         JSONRenderer().render(data, 'application/json; indent=2'))
+
+
+# Tests for the response compression
+class ResponseCompressionTestCase(APITestCase):
+    """
+    Test case for the compression middleware.
+
+    Attributes:
+        user: The owner of the module.
+        module: A module with a large description.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create a module whose detail response is large enough to be cached compressed.
+        """
+        cache.clear()
+        self.user = User.objects.create(email='compression@example.com')
+        self.module = Module.objects.create(title='Large', description='lesson text ' * 2000, owner=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_large_response_is_compressed_once(self):
+        """
+        Test that a large response is gzipped and the compressed body is reused for the same content.
+        """
+        with patch('config.middleware.compress', wraps=compress) as compress_mock:
+            first = self.client.get(f'/module/detail/{self.module.pk}/', HTTP_ACCEPT_ENCODING='gzip')
+            second = self.client.get(f'/module/detail/{self.module.pk}/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', first['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(first.content))['description'], self.module.description)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(compress_mock.call_count, 1)
+
+    def test_small_and_unaccepted_responses_are_not_compressed(self):
+        """
+        Test that small responses and clients without gzip support get uncompressed bodies.
+        """
+        response = self.client.get('/module/autocomplete/', {'q': 'La'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.client.get(f'/module/detail/{self.module.pk}/', HTTP_ACCEPT_ENCODING='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response(self):
+        """
+        Test that streaming responses are compressed incrementally and event streams are left alone.
+        """
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        middleware = CompressionMiddleware(lambda request: None)
+        response = middleware.process_response(request, StreamingHttpResponse(
+            (f'line {number}\n'.encode() for number in range(1000)), content_type='text/plain'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)),
+                         b''.join(f'line {number}\n'.encode() for number in range(1000)))
+
+        response = middleware.process_response(request, StreamingHttpResponse(
+            iter([b'data: {}\n\n']), content_type='text/event-stream'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_choose_encoding(self):
+        """
+        Test the parsing of the Accept-Encoding header.
+        """
+        self.assertEqual(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(choose_encoding('GZIP;q=0.5, br;q=0'), 'gzip')
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertIsNone(choose_encoding('gzip;q=0'))
+
+
+# Tests for the moderator statistics
+@override_settings(CHANGE_LOG_SETTLE_SECONDS=0)
+class StatsRollupTestCase(APITestCase):
+    """
+    Test case for the rollup tables and the moderator statistics endpoints.
+
+    Attributes:
+        owner: The owner of the content.
+        moderator: The moderator reading the statistics.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create an owner with a module and two lessons, and a moderator.
+        """
+        self.owner = User.objects.create(email='stats-owner@example.com')
+        self.moderator = User.objects.create(email='stats-moderator@example.com')
+        self.moderator.groups.create(name='moderator')
+        module = Module.objects.create(title='Stats', description='Stats', owner=self.owner)
+        Lesson.objects.create(title='Video', description='Video', content='Video', module=module, owner=self.owner,
+                              video_url='https://www.youtube.com/watch?v=stats')
+        Lesson.objects.create(title='Text', description='Text', content='Text', module=module, owner=self.owner)
+        self.client.force_authenticate(user=self.moderator)
+
+    def test_statistics_are_rolled_up(self):
+        """
+        Test that the endpoints serve the rolled up totals, owners and daily created content.
+        """
+        refresh_stats()
+        data = self.client.get('/stats/').json()
+        self.assertEqual((data['modules'], data['lessons'], data['lessons_with_video']), (1, 2, 1))
+        self.assertEqual(data['daily'], [{'day': timezone.localdate().isoformat(), 'modules_created': 1,
+                                          'lessons_created': 2}])
+
+        response = self.client.get('/stats/owners/')
+        self.assertEqual([(row['owner_id'], row['lessons']) for row in response.json()['results']],
+                         [(self.owner.pk, 2)])
+
+    def test_refresh_is_incremental(self):
+        """
+        Test that later changes adjust the rollups without counting the earlier entries again.
+        """
+        self.assertEqual(refresh_stats(), 3)
+        lesson = Lesson.objects.get(title='Text')
+        lesson.video_url = 'https://www.youtube.com/watch?v=text'
+        lesson.save()
+        Lesson.objects.get(title='Video').delete()
+        self.assertEqual(refresh_stats(), 2)
+        self.assertEqual(refresh_stats(), 0)
+
+        data = self.client.get('/stats/').json()
+        self.assertEqual((data['modules'], data['lessons'], data['lessons_with_video']), (1, 1, 1))
+        self.assertEqual(data['daily'][0]['lessons_created'], 2)
+
+    def test_rebuild_reconciles_unlogged_writes(self):
+        """
+        Test that the rebuild moves the content of a deleted owner to the unowned row.
+        """
+        refresh_stats()
+        self.owner.delete()
+        rebuild_stats()
+        self.assertEqual(list(OwnerContentStats.objects.values_list('owner_id', 'modules', 'lessons')),
+                         [(None, 1, 2)])
+        self.assertEqual(self.client.get('/stats/').json()['lessons'], 2)
+
+    def test_statistics_are_for_moderators(self):
+        """
+        Test that other users cannot read the statistics.
+        """
+        self.client.force_authenticate(user=self.owner)
+        self.assertEqual(self.client.get('/stats/').status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get('/stats/owners/').status_code, status.HTTP_403_FORBIDDEN)
+
+
+# Tests for the owner scoped module lookups
+class OwnerScopedLookupTestCase(APITestCase):
+    """
+    Test case for the module lookups filtered by owner in SQL.
+
+    Attributes:
+        owner: The owner of the module.
+        module: The module.
+    """
+
+    def setUp(self):
+        """
+        Set up method to create a module of its owner.
+        """
+        self.owner = User.objects.create(email='scoped-owner@example.com')
+        self.module = Module.objects.create(title='Scoped', description='Scoped', owner=self.owner)
+
+    def test_other_users_miss(self):
+        """
+        Test that another user's lookups miss with one query and no object is changed.
+        """
+        self.client.force_authenticate(user=User.objects.create(email='scoped-other@example.com'))
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/module/detail/{self.module.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.patch(f'/module/update/{self.module.pk}/', {'title': 'Taken'}).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.delete(f'/module/delete/{self.module.pk}/').status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Module.objects.get(pk=self.module.pk).title, 'Scoped')
+
+    def test_owner_lookup_does_not_load_the_owner(self):
+        """
+        Test that the owner passes the object permission without an extra query for the owner.
+        """
+        self.client.force_authenticate(user=self.owner)
+        # The moderator check, the module and its lessons
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/module/detail/{self.module.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_moderators(self):
+        """
+        Test that moderators may read and update any module but delete only their own.
+        """
+        moderator = User.objects.create(email='scoped-moderator@example.com')
+        moderator.groups.create(name='moderator')
+        self.client.force_authenticate(user=moderator)
+        self.assertEqual(self.client.get(f'/module/detail/{self.module.pk}/').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.patch(f'/module/update/{self.module.pk}/', {'title': 'Moderated'}).status_code,
+                         status.HTTP_200_OK)
+        self.assertEqual(self.client.delete(f'/module/delete/{self.module.pk}/').status_code,
+                         status.HTTP_404_NOT_FOUND)
+
+
+# Tests for the load test command
+@override_settings(DEBUG=True)
+class LoadTestCommandTestCase(LiveServerTestCase):
+    """
+    Test case for the load test command, run against the live test server.
+    """
+
+    def test_load_test_reports_every_operation(self):
+        """
+        Test that a short run seeds and logs in the users and reports every operation of the mix without errors.
+        """
+        out = io.StringIO()
+        call_command('loadtest', url=self.live_server_url, users=2, concurrency=2, duration=1,
+                     mix='list=1,search=1,detail=1,create=1', stdout=out)
+        rows = {line.split()[0]: line.split() for line in out.getvalue().splitlines()[2:]}
+        self.assertEqual(set(rows), {'list', 'search', 'detail', 'create', 'total'})
+        self.assertGreater(int(rows['total'][1]), 0)
+        self.assertEqual(rows['total'][2], '0')
+        self.assertFalse(User.objects.filter(email__startswith='loadtest-').exists())
+
+    def test_only_localhost(self):
+        """
+        Test that remote servers and unknown operations are rejected before any request is sent.
+        """
+        with self.assertRaises(CommandError):
+            call_command('loadtest', url='http://example.com', stdout=io.StringIO())
+        with self.assertRaises(CommandError):
+            call_command('loadtest', url=self.live_server_url, mix='list=1,delete=1', stdout=io.StringIO())
+
+    def test_refused_without_debug(self):
+        """
+        Test that no user is seeded when DEBUG is off.
+        """
+        with self.settings(DEBUG=False), self.assertRaises(CommandError):
+            call_command('loadtest', url=self.live_server_url, stdout=io.StringIO())
+        self.assertFalse(User.objects.filter(email__startswith='loadtest-').exists())
+
+    def test_helpers(self):
+        """
+        Test the parsing of the mix and the nearest-rank percentiles.
+        """
+        self.assertEqual(parse_mix('list=3, create=1'), {'list': 3, 'create': 1})
+        with self.assertRaises(ValueError):
+            parse_mix('list=0')
+        self.assertEqual(percentile(list(range(1, 101)), 0.99), 99)
+        self.assertEqual(percentile([5], 0.5), 5)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+
+# Tests for the production server entry point
+class ServerWarmupTestCase(APITestCase):
+    """
+    Test case for the worker warm-up and the serve command.
+    """
+
+    def test_warm_up(self):
+        """
+        Test that the warm-up finds the views of every app and reports the time of every step.
+        """
+        view_names = {view.__name__ for view in iter_views()}
+        self.assertTrue({'ModuleListAPIView', 'LessonViewSet', 'UserViewSet'} <= view_names)
+        self.assertEqual(set(warm_up()), {'urlconf', 'serializers', 'connections'})
+
+    def test_asgi_warm_up_opens_no_connection(self):
+        """
+        Test that ASGI workers, which open a connection per request, skip opening the connections in advance.
+        """
+        with patch('config.warmup.open_connections') as mock_open_connections:
+            self.assertEqual(set(warm_up(asgi=True)), {'urlconf', 'serializers'})
+        mock_open_connections.assert_not_called()
+
+    @patch('educational_modules.management.commands.serve.ServerApplication')
+    def test_serve_options(self, mock_application):
+        """
+        Test that the workers are preloaded, recycled with jitter and warmed up after the fork.
+        """
+        call_command('serve', workers=3, max_requests=500, worker_class='wsgi')
+        application_path, options = mock_application.call_args.args
+        self.assertEqual(application_path, 'config.wsgi.application')
+        self.assertEqual((options['workers'], options['worker_class'], options['preload_app']), (3, 'sync', True))
+        self.assertEqual((options['max_requests'], options['max_requests_jitter']), (500, 100))
+        self.assertTrue(callable(options['post_worker_init']))
+        mock_application.return_value.run.assert_called_once()
+
+
+# Tests for the route-aware middleware
+class RouteMiddlewareTestCase(APITestCase):
+    """
+    Test case for the middleware run only for the admin paths.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(email='route@test.com', is_staff=True, is_superuser=True)
+        self.user.set_password('test')
+        self.user.save()
+
+    def test_api_skips_session(self):
+        """
+        Test that the API authenticates with JWT without sessions or CSRF cookies.
+        """
+        response = self.client.get('/module/list/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(hasattr(response.wsgi_request, 'session'))
+        self.assertNotIn('sessionid', response.cookies)
+        self.assertNotIn('csrftoken', response.cookies)
+
+    def test_admin_keeps_session(self):
+        """
+        Test that the admin still logs in with a session protected by CSRF.
+        """
+        response = self.client.get('/admin/login/')
+        self.assertIn('csrftoken', response.cookies)
+        self.assertTrue(hasattr(response.wsgi_request, 'session'))
+
+        self.client.login(email='route@test.com', password='test')
+        self.assertEqual(self.client.get('/admin/').status_code, status.HTTP_200_OK)
+
+        csrf_client = self.client_class(enforce_csrf_checks=True)
+        response = csrf_client.post('/admin/login/', {'username': 'route@test.com', 'password': 'test'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_async_dispatch(self):
+        """
+        Test that under ASGI the API requests skip the routed process_view hooks.
+        """
+        async def get_response(request):
+            return HttpResponse('ok')
+
+        middleware = RouteMiddleware(get_response)
+        request = RequestFactory().get('/module/list/')
+        self.assertIsNone(asyncio.run(middleware.process_view(request, get_response, (), {})))
+        response = asyncio.run(middleware(request))
+        self.assertEqual(response.content, b'ok')
+        self.assertFalse(hasattr(request, 'session'))
+
+
+# Tests for the content-addressed upload storage
+class PreviewStorageTestCase(APITestCase):
+    """
+    Test case for the deduplicated storage of previews and their immutable caching.
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create(email='preview@test.com')
+        self.client.force_authenticate(user=self.user)
+        image = io.BytesIO()
+        Image.new('RGB', (2, 2), 'red').save(image, 'PNG')
+        self.image = image.getvalue()
+
+    def upload(self, filename):
+        return SimpleUploadedFile(filename, self.image, content_type='image/png')
+
+    def test_identical_uploads_share_a_file(self):
+        """
+        Test that cloned modules and lessons with the same preview point to one stored file.
+        """
+        first, second = (
+            self.client.post('/module/create/', {'title': title, 'description': title,
+                                                 'preview': self.upload(filename)}, format='multipart')
+            for title, filename in (('A', 'a.png'), ('B', 'B.PNG'))
+        )
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.json()['preview'], second.json()['preview'])
+
+        names = set(Module.objects.values_list('preview', flat=True))
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertTrue(name.startswith('module_previews/') and name.endswith('.png'))
+        self.assertTrue(is_content_addressed(name))
+        self.assertEqual(os.listdir(os.path.join(self.media_root, os.path.dirname(name))), [os.path.basename(name)])
+
+        lesson = Lesson.objects.create(title='L', description='L', content='L', owner=self.user)
+        lesson.preview.save('other-name.png', ContentFile(self.image))
+        self.assertEqual(lesson.preview.name, name.replace('module_previews/', 'lesson_previews/'))
+
+    def test_immutable_cache_headers(self):
+        """
+        Test that content-addressed files are served as immutable and older uploads are revalidated.
+        """
+        self.user.avatar = ContentAddressedStorage().save('users_avatar/me.png', ContentFile(self.image))
+        self.user.save()
+        response = self.client.get(self.user.avatar.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), self.image)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+        os.makedirs(os.path.join(self.media_root, 'users_avatar'), exist_ok=True)
+        with open(os.path.join(self.media_root, 'users_avatar', 'old.png'), 'wb') as file:
+            file.write(self.image)
+        User.objects.filter(pk=self.user.pk).update(avatar='users_avatar/old.png')
+        response = self.client.get(ContentAddressedStorage().url('users_avatar/old.png'))
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+
+# Tests for the protected media view
+class ProtectedMediaTestCase(APITestCase):
+    """
+    Test case for the ownership checks of the media view and the hand-over to the front proxy.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create(email='media-owner@test.com')
+        self.other = User.objects.create(email='media-other@test.com')
+        self.moderator = User.objects.create(email='media-moderator@test.com')
+        self.moderator.groups.create(name='moderator')
+        self.name = 'lesson_previews/ab/' + 'c' * 62 + '.png'
+        Lesson.objects.create(title='L', description='L', content='L', owner=self.owner, preview=self.name)
+
+    def get(self, user, name=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'} if user else {}
+        return self.client.get(f'/media/{name or self.name}', **headers)
+
+    @override_settings(MEDIA_ACCEL='nginx', MEDIA_ACCEL_LOCATION='/protected-media/')
+    def test_nginx_redirect(self):
+        """
+        Test that the owner and moderators get an X-Accel-Redirect and other users a 404.
+        """
+        for user in (self.owner, self.moderator):
+            response = self.get(user)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+            self.assertEqual(response['Content-Type'], 'image/png')
+            self.assertEqual(response.content, b'')
+        self.assertEqual(self.get(self.other).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.get(None).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.get(f'/media/{self.name}', HTTP_AUTHORIZATION='Bearer').status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+        # Access tokens are not accepted in the URL, which ends up in logs and browser histories
+        self.assertEqual(self.client.get(f'/media/{self.name}', {'token': str(AccessToken.for_user(self.owner))})
+                         .status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(MEDIA_ACCEL='nginx', MEDIA_URL_MAX_AGE=60)
+    def test_signed_url(self):
+        """
+        Test that a signed URL opens its file only, until it expires, without authentication or queries.
+        """
+        url = Lesson.objects.get().preview.url
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(url.replace('.png?', '.jpg?')).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(url.replace('signature=', 'signature=x')).status_code,
+                         status.HTTP_403_FORBIDDEN)
+        with patch('config.storage.time.time', return_value=time.time() + 121):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(MEDIA_ACCEL='apache', MEDIA_ROOT='/srv/media')
+    def test_apache_sendfile(self):
+        """
+        Test that Apache gets the path of the file and names outside the known fields are refused.
+        """
+        response = self.get(self.owner)
+        self.assertEqual(response['X-Sendfile'], f'/srv/media/{self.name}')
+        self.assertEqual(self.get(self.owner, 'lesson_previews/../../etc/passwd').status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.get(self.owner, 'other/file.png').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_query_count(self):
+        """
+        Test that the permission check of an owner is one lookup on top of loading the user with the moderator flag.
+        """
+        with override_settings(MEDIA_ACCEL='nginx'), self.assertNumQueries(2):
+            self.get(self.owner)
+
+
+# Tests for the on-demand request profiling
+class RequestProfilingTestCase(APITestCase):
+    """
+    Test case for the profiles captured for superusers and their admin pages.
+    """
+
+    def setUp(self):
+        self.superuser = User.objects.create(email='profiler@test.com', is_staff=True, is_superuser=True)
+        self.user = User.objects.create(email='not-profiler@test.com')
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.superuser)}'}
+
+    def test_superuser_profile(self):
+        """
+        Test that a superuser's flagged API request is profiled and downloadable from the admin.
+        """
+        response = self.client.get('/module/list/', HTTP_X_PROFILE='1', **self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual((profile.method, profile.path, profile.status_code), ('GET', '/module/list/', 200))
+        self.assertEqual(profile.user, self.superuser)
+        self.assertIn('cumulative', profile.summary)
+        self.assertEqual(profile.memory_summary, '')
+
+        stats = pstats.Stats(self.write_stats(bytes(profile.stats)))
+        self.assertTrue(any(function == 'get_queryset' for _, _, function in stats.stats))
+
+        self.client.force_login(self.superuser)
+        self.assertContains(self.client.get('/admin/educational_modules/requestprofile/'), '/module/list/')
+        response = self.client.get(f'/admin/educational_modules/requestprofile/{profile.pk}/download/')
+        self.assertEqual(response.content, bytes(profile.stats))
+        self.assertIn('profile-', response['Content-Disposition'])
+
+    def test_memory_profile(self):
+        """
+        Test that the query flag asks for a memory trace and the access token is not stored with the path.
+        """
+        response = self.client.get('/module/list/', {'_profile': 'memory',
+                                                     'token': str(AccessToken.for_user(self.superuser))})
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual(profile.path, '/module/list/?_profile=memory')
+        self.assertGreater(profile.peak_memory, 0)
+        self.assertNotEqual(profile.memory_summary, '')
+
+    def test_ignored_flags(self):
+        """
+        Test that flags of other users and requests without a flag are not profiled.
+        """
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+        response = self.client.get('/module/list/', HTTP_X_PROFILE='1', **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertNotIn('X-Profile-Id', self.client.get('/module/list/', **self.headers))
+        self.assertNotIn('X-Profile-Id', self.client.get('/module/list/', HTTP_X_PROFILE='0', **self.headers))
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @override_settings(PROFILE_KEEP=2)
+    def test_retention(self):
+        """
+        Test that only the newest profiles are kept.
+        """
+        for _ in range(3):
+            self.client.get('/module/list/', HTTP_X_PROFILE='1', **self.headers)
+        self.assertEqual(RequestProfile.objects.count(), 2)
+
+    def write_stats(self, data):
+        file = tempfile.NamedTemporaryFile(suffix='.prof', delete=False)
+        self.addCleanup(os.remove, file.name)
+        with file:
+            file.write(data)
+        return file.name
+
+
+# Tests for the module archive export
+class OfflineExportTestCase(APITestCase):
+    """
+    Test case for the export of a module as a ZIP archive.
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create(email='export@test.com')
+        self.client.force_authenticate(user=self.user)
+        preview = ContentAddressedStorage().save('lesson_previews/p.png', ContentFile(b'image'))
+        self.module = Module.objects.create(title='Offline', description='Offline course', owner=self.user)
+        Lesson.objects.create(title='Second lesson', description='Two', content='Body 2', module=self.module,
+                              owner=self.user, position=2048, preview=preview, video_url='https://example.com/v')
+        Lesson.objects.create(title='First lesson', description='One', content='Body 1', module=self.module,
+                              owner=self.user, position=1024)
+
+    @patch('educational_modules.api_views.export.export_module.delay')
+    def test_export_and_download(self, mock_delay):
+        """
+        Test that the export is queued once, built by the task and downloaded as one archive.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/module/export/{self.module.pk}/')
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(response.json()['status'], ModuleExport.STATUS_PENDING)
+            self.assertEqual(self.client.post(f'/module/export/{self.module.pk}/').json()['pk'], response.json()['pk'])
+        export_id = response.json()['pk']
+        mock_delay.assert_called_once_with(export_id)
+        self.assertEqual(self.client.get(f'/module/exports/{export_id}/download/').status_code,
+                         status.HTTP_409_CONFLICT)
+
+        self.assertEqual(export_module.apply(args=[export_id]).get(), ModuleExport.STATUS_READY)
+        data = self.client.get(f'/module/exports/{export_id}/').json()
+        self.assertEqual(data['status'], ModuleExport.STATUS_READY)
+        self.assertTrue(data['download_url'].endswith(f'/module/exports/{export_id}/download/'))
+
+        response = self.client.get(f'/module/exports/{export_id}/download/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(f'module-{self.module.pk}.zip', response['Content-Disposition'])
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            names = archive.namelist()
+            self.assertEqual(json.loads(archive.read('module.json'))['title'], 'Offline')
+            lessons = [json.loads(line) for line in archive.read('lessons.jsonl').splitlines()]
+            self.assertEqual([lesson['title'] for lesson in lessons], ['First lesson', 'Second lesson'])
+            self.assertIn('lessons/001-first-lesson.md', names)
+            markdown = archive.read('lessons/002-second-lesson.md').decode()
+            self.assertIn('# Second lesson', markdown)
+            self.assertIn(f'](../{lessons[1]["preview"]})', markdown)
+            self.assertEqual(archive.read(lessons[1]['preview']), b'image')
+
+    def test_permissions(self):
+        """
+        Test that only users who may see the module export it and only the requester polls the export.
+        """
+        other = User.objects.create(email='export-other@test.com')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.post(f'/module/export/{self.module.pk}/').status_code,
+                         status.HTTP_404_NOT_FOUND)
+        export = ModuleExport.objects.create(module=self.module, requested_by=self.user,
+                                             expires_at=timezone.now() + datetime.timedelta(hours=1))
+        self.assertEqual(self.client.get(f'/module/exports/{export.pk}/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_expired_exports(self):
+        """
+        Test that expired exports are deleted with their archives.
+        """
+        for _ in range(2):
+            export = ModuleExport.objects.create(module=self.module, requested_by=self.user,
+                                                 expires_at=timezone.now())
+            export_module.apply(args=[export.pk])
+        name = ModuleExport.objects.first().archive.name
+        ModuleExport.objects.update(expires_at=timezone.now())
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, name)))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(delete_exports.apply().get(), 2)
+        self.assertFalse(ModuleExport.objects.exists())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, name)))
+
+    def test_archive_deleted_with_module(self):
+        """
+        Test that deleting a module deletes the archives of its exports once the deletion is committed.
+        """
+        export = ModuleExport.objects.create(module=self.module, requested_by=self.user, expires_at=timezone.now())
+        export_module.apply(args=[export.pk])
+        path = os.path.join(self.media_root, ModuleExport.objects.get().archive.name)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.module.delete()
+        self.assertTrue(os.path.exists(path))
+        for callback in callbacks:
+            callback()
+        self.assertFalse(os.path.exists(path))
+
+    def test_export_deleted_while_building(self):
+        """
+        Test that the archive of an export deleted while it is built is not left in the storage.
+        """
+        export = ModuleExport.objects.create(module=self.module, requested_by=self.user, expires_at=timezone.now())
+
+        def write_and_delete(module, output):
+            output.write(b'archive')
+            ModuleExport.objects.filter(pk=export.pk).delete()
+
+        with patch('educational_modules.export.write_archive', side_effect=write_and_delete):
+            self.assertIsNone(export_module.apply(args=[export.pk]).get())
+        self.assertEqual([files for _, _, files in os.walk(os.path.join(self.media_root, 'module_exports'))
+                          if files], [])
+
+
+# Tests for the rendered lesson content
+class RenderedContentTestCase(APITestCase):
+    """
+    Test case for the lesson content rendered to HTML.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(email='rendered@test.com')
+        self.client.force_authenticate(user=self.user)
+        self.module = Module.objects.create(title='Rendered', description='Rendered', owner=self.user)
+        self.lesson = Lesson.objects.create(title='Markdown', description='Markdown', module=self.module,
+                                            owner=self.user, content='# Title\n\nSome **bold** text.')
+
+    def test_sanitized(self):
+        """
+        Test that scripts, event handlers and javascript links are stripped from the rendered content.
+        """
+        html = render_markdown('<script>alert(1)</script>\n\n<img src="x.png" onerror="alert(1)">\n\n'
+                               '[link](javascript:alert(1)) [site](https://example.com)')
+        self.assertNotIn('<script', html)
+        self.assertNotIn('onerror', html)
+        self.assertNotIn('javascript:', html)
+        self.assertIn('<a href="https://example.com" rel="noopener noreferrer nofollow">site</a>', html)
+
+    def test_rendered_on_save(self):
+        """
+        Test that the content is rendered when it is saved and only then.
+        """
+        self.assertEqual(self.lesson.content_html, '<h1>Title</h1>\n<p>Some <strong>bold</strong> text.</p>')
+        self.lesson.content = 'Changed'
+        self.lesson.save(update_fields=['position'])
+        self.lesson.refresh_from_db()
+        self.assertIn('Title', self.lesson.content_html)
+        self.lesson.content = 'Changed'
+        self.lesson.save(update_fields=['content'])
+        self.lesson.refresh_from_db()
+        self.assertEqual(self.lesson.content_html, '<p>Changed</p>')
+
+    def test_optional_field(self):
+        """
+        Test that the rendered content is only represented when requested.
+        """
+        for path in ('/lessons/', f'/lessons/{self.lesson.pk}/', f'/module/detail/{self.module.pk}/'):
+            response = self.client.get(path)
+            self.assertNotIn('content_html', json.dumps(response.json()))
+            response = self.client.get(path, {'include': 'content_html'})
+            self.assertIn('<strong>bold</strong>', json.dumps(response.json()))
+
+    def test_render_lessons(self):
+        """
+        Test that the command renders the lessons inserted without saving them and records them in the change log.
+        """
+        bulk = Lesson.objects.bulk_create([Lesson(title=f'Bulk {index}', description='Bulk', content=f'*{index}*')
+                                           for index in range(3)])
+        Lesson.objects.filter(pk=self.lesson.pk).update(content_html='stale')
+        call_command('render_lessons', batch_size=2, stdout=io.StringIO())
+        self.assertEqual(sorted(Lesson.objects.filter(title__startswith='Bulk').values_list('content_html', flat=True)),
+                         ['<p><em>0</em></p>', '<p><em>1</em></p>', '<p><em>2</em></p>'])
+        self.assertEqual(set(ChangeLogEntry.objects.filter(action=ChangeLogEntry.ACTION_SAVE)
+                             .values_list('object_id', flat=True)), {lesson.pk for lesson in bulk})
+        self.assertEqual(Lesson.objects.get(pk=self.lesson.pk).content_html, 'stale')
+        call_command('render_lessons', '--all', stdout=io.StringIO())
+        self.assertIn('<h1>Title</h1>', Lesson.objects.get(pk=self.lesson.pk).content_html)
+
+
+# Tests for the related lessons
+@override_settings(CHANGE_LOG_SETTLE_SECONDS=0, RELATED_LESSONS_LIMIT=2, RELATED_LESSONS_BATCH_SIZE=2)
+class RelatedLessonsTestCase(APITestCase):
+    """
+    Test case for the related lessons computed from TF-IDF similarities.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(email='related@test.com')
+        self.client.force_authenticate(user=self.user)
+        texts = {
+            'django': 'Django models and Django views with the ORM',
+            'orm': 'Querying the Django ORM with models',
+            'bread': 'Baking bread with sourdough',
+            'cake': 'Baking a chocolate cake',
+        }
+        self.lessons = {key: Lesson.objects.create(title=key, description='Lesson', content=text, owner=self.user)
+                        for key, text in texts.items()}
+
+    def related(self, key):
+        response = self.client.get(f'/lessons/{self.lessons[key].pk}/related/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [lesson['title'] for lesson in response.json()]
+
+    def test_rebuild(self):
+        """
+        Test that every lesson gets its most similar lessons, the most similar first.
+        """
+        self.assertEqual(rebuild_related.apply().get(), 4)
+        self.assertEqual(self.related('django')[0], 'orm')
+        self.assertEqual(self.related('bread')[0], 'cake')
+        # Lessons sharing only stop words and the description of all lessons fall below the minimum score
+        self.assertEqual(LessonNeighbor.objects.count(), 4)
+        self.assertEqual(refresh_related.apply().get(), 0)
+
+    def test_refresh(self):
+        """
+        Test that the lessons changed since the last run are added to and removed from the neighbors.
+        """
+        self.assertEqual(refresh_related.apply().get(), 4)
+        pastry = Lesson.objects.create(title='pastry', description='Lesson', content='Baking sourdough bread rolls',
+                                       owner=self.user)
+        self.lessons['pastry'] = pastry
+        refresh_related.apply()
+        self.assertEqual(self.related('bread')[0], 'pastry')
+        self.assertEqual(self.related('pastry')[0], 'bread')
+
+        pastry.content = 'Django ORM models'
+        pastry.save()
+        refresh_related.apply()
+        self.assertNotIn('pastry', self.related('bread'))
+        self.assertIn('pastry', self.related('orm'))
+
+        pastry.delete()
+        refresh_related.apply()
+        self.assertEqual(self.related('orm')[0], 'django')
+
+    def test_refresh_reads_changed_lessons(self):
+        """
+        Test that the refresh only vectorizes the changed lessons, with the index stored by the previous run even
+        when the cache is cold, and computes all lessons without it.
+        """
+        refresh_related.apply()
+        lesson = self.lessons['cake']
+        lesson.content = 'Baking sourdough bread'
+        lesson.save()
+        cache.clear()
+        with patch('educational_modules.related._read_terms', wraps=_read_terms) as read_terms:
+            refresh_related.apply()
+        self.assertEqual([call.args[0].count() for call in read_terms.call_args_list], [1])
+        self.assertEqual(self.related('bread')[0], 'cake')
+
+        RelatedLessonsState.objects.update(index=None)
+        self.assertEqual(refresh_related.apply().get(), 4)
+
+    def test_visibility(self):
+        """
+        Test that only the related lessons visible to the user are returned.
+        """
+        other = User.objects.create(email='related-other@test.com')
+        Lesson.objects.filter(pk=self.lessons['orm'].pk).update(owner=other)
+        rebuild_related.apply()
+        self.assertNotIn('orm', self.related('django'))
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(f'/lessons/{self.lessons["django"].pk}/related/').status_code,
+                         status.HTTP_404_NOT_FOUND)
@@ -1,9 +1,16 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
+from educational_modules.api_views.changes import ChangesAPIView
+from educational_modules.api_views.events import module_events
+from educational_modules.api_views.export import ModuleExportCreateAPIView, ModuleExportDownloadAPIView, \
+    ModuleExportRetrieveAPIView
 from educational_modules.api_views.lesson import LessonViewSet
+from educational_modules.api_views.media import protected_media
 from educational_modules.api_views.module import ModuleCreateAPIView, ModuleListAPIView, ModuleRetrieveAPIView, \
-    ModuleUpdateAPIView, ModuleDestroyAPIView
+    ModuleUpdateAPIView, ModuleDestroyAPIView, ModuleAutocompleteAPIView, ModuleTagFacetAPIView
+from educational_modules.api_views.progress import ModuleProgressListAPIView
+from educational_modules.api_views.stats import ContentStatsAPIView, OwnerContentStatsListAPIView
 from educational_modules.apps import EducationalModulesConfig
 
 app_name = EducationalModulesConfig.name
@@ -17,4 +24,16 @@ urlpatterns = [
                   path('module/detail/<int:pk>/', ModuleRetrieveAPIView.as_view(), name='module-detail'),
                   path('module/update/<int:pk>/', ModuleUpdateAPIView.as_view(), name='module-update'),
                   path('module/delete/<int:pk>/', ModuleDestroyAPIView.as_view(), name='module-delete'),
+                  path('module/autocomplete/', ModuleAutocompleteAPIView.as_view(), name='module-autocomplete'),
+                  path('module/tags/', ModuleTagFacetAPIView.as_view(), name='module-tags'),
+                  path('module/events/<int:pk>/', module_events, name='module-events'),
+                  path('module/export/<int:pk>/', ModuleExportCreateAPIView.as_view(), name='module-export'),
+                  path('module/exports/<int:pk>/', ModuleExportRetrieveAPIView.as_view(), name='module-export-detail'),
+                  path('module/exports/<int:pk>/download/', ModuleExportDownloadAPIView.as_view(),
+                       name='module-export-download'),
+                  path('module/progress/', ModuleProgressListAPIView.as_view(), name='module-progress'),
+                  path('media/<path:path>', protected_media, name='media'),
+                  path('changes/', ChangesAPIView.as_view(), name='changes'),
+                  path('stats/', ContentStatsAPIView.as_view(), name='stats'),
+                  path('stats/owners/', OwnerContentStatsListAPIView.as_view(), name='stats-owners'),
               ] + router.urls
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from educational_modules.models import Module
+from educational_modules.models import Module, MAX_TAGS
 
 
 def validate_module_owner(value, user):
@@ -29,3 +29,22 @@ def validate_module_owner(value, user):
         raise serializers.ValidationError("You can't create lessons for other people's modules!")
 
     return value
+
+
+def normalize_tags(value):
+    """
+    Normalizes a list of tags: strips and lowercases them, drops empty ones and duplicates and sorts the rest.
+
+    Args:
+        value (list): The tags passed by the user.
+
+    Returns:
+        list: The normalized tags.
+
+    Raises:
+        serializers.ValidationError: If there are more than MAX_TAGS distinct tags.
+    """
+    tags = sorted({tag.strip().lower() for tag in value if tag.strip()})
+    if len(tags) > MAX_TAGS:
+        raise serializers.ValidationError(f'No more than {MAX_TAGS} tags are allowed.')
+    return tags
@@ -1,10 +1,11 @@
 from django.contrib import admin
 
-from users.models import User
+from educational_modules.paginators import EstimatedCountAdminMixin
+from users.models import User, OutgoingEmail
 
 
 @admin.register(User)
-class UsersAdmin(admin.ModelAdmin):
+class UsersAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """
     Admin configuration for the User model.
 
@@ -13,3 +14,17 @@ class UsersAdmin(admin.ModelAdmin):
     """
 
     list_display = ('pk', 'email', 'first_name', 'last_name', 'phone', 'country', 'avatar',)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for the OutgoingEmail model.
+
+    Attributes:
+        list_display (tuple): Tuple containing the fields to be displayed in the admin list view.
+        list_filter (tuple): Tuple containing the fields to filter the admin list view by.
+    """
+
+    list_display = ('pk', 'subject', 'recipients', 'status', 'attempts', 'next_attempt_at', 'sent_at',)
+    list_filter = ('status',)
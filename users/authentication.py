@@ -0,0 +1,49 @@
+from django.contrib.auth.models import Group
+from django.db.models import Exists, OuterRef
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """
+    JWT authentication that reads whether the user is a moderator in the query loading the user.
+
+    The flag is stored where educational_modules.permissions.is_moderator caches it, so the permission classes and
+    the owner scoping of the request run no query of their own.
+    """
+
+    def get_user(self, validated_token):
+        """
+        Returns the user of a validated token, with the checks of simplejwt.
+
+        Args:
+            validated_token: The validated access token.
+
+        Returns:
+            User: The user, with the _is_moderator flag set.
+
+        Raises:
+            InvalidToken: If the token holds no user id.
+            AuthenticationFailed: If the user does not exist, is inactive or changed the password.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        moderator = Group.objects.filter(user=OuterRef('pk'), name='moderator')
+        try:
+            user = self.user_model.objects.annotate(_is_moderator=Exists(moderator)).get(
+                **{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and \
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 NULLABLE = {'blank': True, 'null': True}
 
@@ -19,9 +20,65 @@ class User(AbstractUser):
 
     email = models.EmailField(unique=True, verbose_name='email')
 
-    avatar = models.ImageField(upload_to='users_avatar/', verbose_name='avatar', **NULLABLE)
+    avatar = models.ImageField(upload_to='users_avatar/', verbose_name='avatar', db_index=True, **NULLABLE)
     country = models.CharField(max_length=40, verbose_name='country', **NULLABLE)
     phone = models.CharField(max_length=30, verbose_name='phone', **NULLABLE)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
+
+
+class OutgoingEmail(models.Model):
+    """
+    An email waiting in the outbox to be delivered by the Celery worker.
+
+    Attributes:
+        subject (CharField): The subject of the email.
+        body (TextField): The text body of the email.
+        from_email (CharField): The sender address.
+        recipients (JSONField): The list of recipient addresses.
+        dedup_key (CharField): Optional unique key; enqueuing an email with an existing key is a no-op.
+        status (CharField): The delivery status of the email.
+        attempts (PositiveIntegerField): The number of failed delivery attempts.
+        next_attempt_at (DateTimeField): The time after which the email may be sent (again).
+        last_error (TextField): The error of the last failed attempt.
+        created_at (DateTimeField): The time the email was enqueued.
+        sent_at (DateTimeField): The time the email was delivered.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'pending'),
+        (STATUS_SENT, 'sent'),
+        (STATUS_FAILED, 'failed'),
+    )
+
+    subject = models.CharField(max_length=255, verbose_name='subject')
+    body = models.TextField(verbose_name='body')
+    from_email = models.CharField(max_length=255, verbose_name='sender', **NULLABLE)
+    recipients = models.JSONField(default=list, verbose_name='recipients')
+    dedup_key = models.CharField(max_length=255, unique=True, verbose_name='deduplication key', **NULLABLE)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='status')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='failed attempts')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='next attempt at')
+    last_error = models.TextField(verbose_name='last error', **NULLABLE)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='created at')
+    sent_at = models.DateTimeField(verbose_name='sent at', **NULLABLE)
+
+    def __str__(self):
+        """
+        Returns a string representation of the email.
+
+        Returns:
+            str: The subject and the recipients of the email.
+        """
+        return f'{self.subject} {", ".join(self.recipients)}'
+
+    class Meta:
+        verbose_name = 'outgoing email'
+        verbose_name_plural = 'outgoing emails'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='users_outbox_due_idx'),
+        ]
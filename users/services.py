@@ -1,18 +1,207 @@
+import datetime
+import smtplib
+
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from config.metrics import EMAILS_ENQUEUED_TOTAL, EMAILS_FAILED_TOTAL, EMAILS_SENT_TOTAL
+from users.models import OutgoingEmail
+
+# Errors of the mail connection rather than of the email, after which the connection is opened again
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+def enqueue_email(subject, message, recipient_list, from_email=None, dedup_key=None):
+    """
+    Puts an email into the outbox; it is delivered later by the send_outbox_emails task.
+
+    Args:
+        subject (str): The subject of the email.
+        message (str): The text body of the email.
+        recipient_list (list): The recipient addresses.
+        from_email (str): The sender address, EMAIL_HOST_USER by default.
+        dedup_key (str): Optional key; if an email with this key was already enqueued, nothing is added.
+
+    Returns:
+        OutgoingEmail: The enqueued (or previously enqueued) email.
+    """
+    fields = {
+        'subject': subject,
+        'body': message,
+        'from_email': from_email or settings.EMAIL_HOST_USER,
+        'recipients': list(recipient_list),
+    }
+    if dedup_key is None:
+        email, created = OutgoingEmail.objects.create(**fields), True
+    else:
+        email, created = OutgoingEmail.objects.get_or_create(dedup_key=dedup_key, defaults=fields)
+    if created:
+        EMAILS_ENQUEUED_TOTAL.inc()
+    return email
 
 
 def sending_notice(email, username):
     """
-    Sends a notice email to remind the user to visit the site.
+    Enqueues a notice email to remind the user to visit the site.
+
+    The notice is deduplicated per recipient and ISO week, so a retried or overlapping run of the weekly task
+    does not send it twice.
 
     Args:
         email (str): The email address of the recipient.
         username (str): The username of the recipient.
     """
-    send_mail(
+    year, week, _ = timezone.now().isocalendar()
+    enqueue_email(
         subject='Educational Modules',
         message=f"{username}, You haven't visited our site for a long time to learn something new, come back! ",
-        from_email=settings.EMAIL_HOST_USER,
-        recipient_list=[email]
+        recipient_list=[email],
+        dedup_key=f'notice:{email}:{year}-W{week}',
     )
+
+
+def retry_delay(attempts):
+    """
+    Returns the exponential backoff before the next delivery attempt.
+
+    Args:
+        attempts (int): The number of failed attempts so far.
+
+    Returns:
+        datetime.timedelta: The delay before the next attempt.
+    """
+    seconds = settings.OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1)
+    return datetime.timedelta(seconds=min(seconds, settings.OUTBOX_MAX_RETRY_DELAY))
+
+
+def _register_failure(email, error, now):
+    """
+    Records a failed delivery attempt, scheduling a retry or giving up after OUTBOX_MAX_ATTEMPTS.
+
+    Args:
+        email (OutgoingEmail): The email that failed.
+        error (Exception): The delivery error.
+        now (datetime.datetime): The current time.
+    """
+    email.attempts += 1
+    email.last_error = repr(error)
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.STATUS_FAILED
+    else:
+        email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+def _send(message):
+    """
+    Sends an email message.
+
+    Args:
+        message (EmailMessage): The message.
+
+    Returns:
+        Exception | None: The delivery error, None if the message was sent.
+    """
+    try:
+        message.send()
+    except Exception as error:
+        return error
+    return None
+
+
+def _claim_batch(batch_size, now):
+    """
+    Takes a batch of due emails from the outbox in a short transaction.
+
+    The rows are locked with SKIP LOCKED while their next attempt is moved OUTBOX_CLAIM_TIMEOUT ahead, so other
+    workers skip them until the claim expires, e.g. because the worker holding them died.
+
+    Args:
+        batch_size (int): The maximum number of emails to take.
+        now (datetime.datetime): The current time.
+
+    Returns:
+        list: The claimed emails.
+    """
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            next_attempt_at=now + datetime.timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT),
+        )
+    return emails
+
+
+def send_outbox_batch(connection, batch_size):
+    """
+    Delivers one batch of due emails over an already opened mail connection.
+
+    The batch is claimed first and sent outside of any transaction, so no row lock is held while talking to the
+    mail server. When the connection drops, it is opened again and the email sent once more, so one dead connection
+    does not cost the remaining emails an attempt. If the server cannot be reached again, the error is raised and
+    the emails not tried yet are left to a later run, once their claim expires.
+
+    Args:
+        connection: The mail backend connection.
+        batch_size (int): The maximum number of emails to deliver.
+
+    Returns:
+        tuple: The number of emails taken from the outbox and the number of emails delivered.
+    """
+    now = timezone.now()
+    emails = _claim_batch(batch_size, now)
+    attempted, sent = [], 0
+    try:
+        for email in emails:
+            message = EmailMessage(email.subject, email.body, email.from_email, email.recipients,
+                                   connection=connection)
+            error = _send(message)
+            if isinstance(error, CONNECTION_ERRORS):
+                # Opening the connection again raises if the mail server cannot be reached
+                connection.close()
+                connection.open()
+                error = _send(message)
+            if error is not None:
+                _register_failure(email, error, now)
+            else:
+                email.status = OutgoingEmail.STATUS_SENT
+                email.sent_at = timezone.now()
+                sent += 1
+            attempted.append(email)
+    finally:
+        OutgoingEmail.objects.bulk_update(attempted, ['status', 'attempts', 'next_attempt_at', 'last_error',
+                                                      'sent_at'])
+        EMAILS_SENT_TOTAL.inc(sent)
+        EMAILS_FAILED_TOTAL.inc(len(attempted) - sent)
+    return len(emails), sent
+
+
+def send_outbox(batch_size=None, max_batches=None):
+    """
+    Drains the outbox in batches over a single mail connection.
+
+    Args:
+        batch_size (int): The number of emails per batch, OUTBOX_BATCH_SIZE by default.
+        max_batches (int): The maximum number of batches per run, OUTBOX_MAX_BATCHES by default.
+
+    Returns:
+        int: The number of delivered emails.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    max_batches = max_batches or settings.OUTBOX_MAX_BATCHES
+    if not OutgoingEmail.objects.filter(status=OutgoingEmail.STATUS_PENDING,
+                                        next_attempt_at__lte=timezone.now()).exists():
+        return 0
+
+    sent = 0
+    with get_connection() as connection:
+        for _ in range(max_batches):
+            taken, delivered = send_outbox_batch(connection, batch_size)
+            sent += delivered
+            if taken < batch_size:
+                break
+    return sent
@@ -1,14 +1,9 @@
 import datetime
-import os
-import django
-from celery import shared_task
-
-from users.services import sending_notice
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
-django.setup()
+from celery import shared_task
 
 from users.models import User
+from users.services import sending_notice, send_outbox
 
 
 @shared_task
@@ -22,3 +17,16 @@ def notice_for_users():
     user_for_notice = User.objects.filter(last_login__lt=time_for_notice, is_active=True)
     for user in user_for_notice:
         sending_notice(user.email, user.first_name)
+
+
+@shared_task
+def send_outbox_emails():
+    """
+    Celery task to deliver the emails waiting in the outbox.
+
+    The outbox is drained in batches over one mail connection; failed emails are retried with exponential backoff.
+
+    Returns:
+        int: The number of delivered emails.
+    """
+    return send_outbox()
@@ -1,17 +1,25 @@
 import datetime
+import smtplib
+import time
 from unittest.mock import patch
 
+from django.contrib.auth.models import Group
 from django.core import mail
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
 
-from users.models import User
+from config.metrics import get_metrics_backend
+from config.task_metrics import PUBLISHED_AT_HEADER
+from educational_modules.permissions import is_moderator
+from users.authentication import JWTAuthentication
+from users.models import User, OutgoingEmail
 from users.permissions import IsOwner
 from users.serializers.user import UserSerializer
-from users.services import sending_notice
-from users.tasks import notice_for_users
+from users.services import sending_notice, enqueue_email
+from users.tasks import notice_for_users, send_outbox_emails
 
 
 # Tests for CRUD operations User model
@@ -191,6 +199,29 @@ class IsOwnerTestCase(TestCase):
         self.assertTrue(permission.has_object_permission(request, None, obj))
 
 
+# Tests for the JWT authentication
+class JWTAuthenticationTestCase(TestCase):
+    """
+    Test case for the JWT authentication loading the moderator flag with the user.
+    """
+
+    def test_moderator_flag_is_loaded_with_user(self):
+        """
+        Test that the user and the moderator flag are read in one query and checked without another.
+        """
+        moderator = User.objects.create(email='jwt-moderator@example.com')
+        moderator.groups.add(Group.objects.create(name='moderator'))
+        user = User.objects.create(email='jwt-user@example.com')
+        authentication = JWTAuthentication()
+
+        for account, expected in ((moderator, True), (user, False)):
+            request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(account)}')
+            with self.assertNumQueries(1):
+                authenticated, _ = authentication.authenticate(request)
+                self.assertEqual(is_moderator(authenticated), expected)
+            self.assertEqual(authenticated, account)
+
+
 # Tests for Sending Notice and Notice Task
 class SendingNoticeTestCase(TestCase):
     """
@@ -204,12 +235,91 @@ class SendingNoticeTestCase(TestCase):
         email = 'test_for_mail@example.com'
         username = 'test_user_mail'
         sending_notice(email, username)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(send_outbox_emails(), 1)
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, 'Educational Modules')
         self.assertEqual(mail.outbox[0].to, [email])
         self.assertIn(username, mail.outbox[0].body)
 
 
+class OutboxTestCase(TestCase):
+    """
+    Test case for the email outbox and the send_outbox_emails celery task.
+    """
+
+    def test_notice_is_deduplicated(self):
+        """
+        Test that enqueuing the same notice twice in a week sends it once.
+        """
+        sending_notice('dedup@example.com', 'dedup_user')
+        sending_notice('dedup@example.com', 'dedup_user')
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+        send_outbox_emails()
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_outbox_is_drained_in_batches(self):
+        """
+        Test that every pending email is delivered even when the outbox exceeds one batch.
+        """
+        for index in range(5):
+            enqueue_email('Batch', 'body', [f'batch{index}@example.com'])
+        with self.settings(OUTBOX_BATCH_SIZE=2):
+            self.assertEqual(send_outbox_emails(), 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.STATUS_SENT).exists())
+
+    @patch('users.services.EmailMessage.send', side_effect=smtplib.SMTPDataError(554, 'Rejected by the server'))
+    def test_failed_email_is_retried_later(self, mock_send):
+        """
+        Test that a failed email stays in the outbox and is scheduled for a retry with backoff.
+        """
+        email = enqueue_email('Retry', 'body', ['retry@example.com'])
+        self.assertEqual(send_outbox_emails(), 0)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.STATUS_PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn('Rejected by the server', email.last_error)
+
+        # The email is not due yet, so the next run does not try it again
+        send_outbox_emails()
+        self.assertEqual(mock_send.call_count, 1)
+
+    def test_dropped_connection_is_reopened(self):
+        """
+        Test that a dropped connection is opened again without costing the emails an attempt.
+        """
+        for index in range(3):
+            enqueue_email('Drop', 'body', [f'drop{index}@example.com'])
+        send = mail.EmailMessage.send
+        calls = []
+
+        def drop_first_send(message, *args, **kwargs):
+            calls.append(message)
+            if len(calls) == 1:
+                raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+            return send(message, *args, **kwargs)
+
+        with patch('users.services.EmailMessage.send', drop_first_send):
+            self.assertEqual(send_outbox_emails(), 3)
+        self.assertFalse(OutgoingEmail.objects.exclude(status=OutgoingEmail.STATUS_SENT).exists())
+        self.assertFalse(OutgoingEmail.objects.filter(attempts__gt=0).exists())
+
+    def test_unreachable_server_leaves_emails_claimed(self):
+        """
+        Test that the emails are left to a later run without an attempt when the server cannot be reached again.
+        """
+        email = enqueue_email('Down', 'body', ['down@example.com'])
+        with patch('users.services.EmailMessage.send', side_effect=smtplib.SMTPServerDisconnected), \
+                patch('django.core.mail.backends.locmem.EmailBackend.open', side_effect=[None, ConnectionRefusedError]):
+            with self.assertRaises(ConnectionRefusedError):
+                send_outbox_emails()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutgoingEmail.STATUS_PENDING, 0))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+
 class NoticeForUsersTestCase(TestCase):
     """
     Test case for the notice_for_users celery task.
@@ -234,3 +344,52 @@ class NoticeForUsersTestCase(TestCase):
         notice_for_users()
         self.assertEqual(mock_sending_notice.call_count, 1)
         mock_sending_notice.assert_called_once_with(self.user1.email, self.user1.first_name)
+
+
+@override_settings(METRICS_BACKEND='config.metrics.InMemoryMetricsBackend', METRICS_TOKEN='scrape-token')
+class TaskMetricsTestCase(TestCase):
+    """
+    Test case for the Celery task metrics and the /metrics/ endpoint.
+    """
+
+    def setUp(self):
+        """
+        Set up method to start every test with empty metrics.
+        """
+        get_metrics_backend().clear()
+
+    def test_task_runs_are_measured(self):
+        """
+        Test that a task run records its queue latency, run time, state and the delivered emails.
+        """
+        for index in range(2):
+            enqueue_email('Metrics', 'body', [f'metrics{index}@example.com'])
+        send_outbox_emails.apply(headers={PUBLISHED_AT_HEADER: time.time() - 3})
+
+        values = get_metrics_backend().read()
+        task = 'task="users.tasks.send_outbox_emails"'
+        self.assertEqual(values['emails_enqueued_total'], 2)
+        self.assertEqual(values['emails_sent_total'], 2)
+        self.assertEqual(values[f'celery_tasks_total{{{task},state="SUCCESS"}}'], 1)
+        self.assertEqual(values[f'celery_task_runtime_seconds_count{{{task}}}'], 1)
+        self.assertGreaterEqual(values[f'celery_task_queue_seconds_sum{{{task}}}'], 3)
+        self.assertNotIn(f'celery_task_queue_seconds_bucket{{{task},le="2.5"}}', values)
+        self.assertEqual(values[f'celery_task_queue_seconds_bucket{{{task},le="5"}}'], 1)
+
+    def test_metrics_endpoint(self):
+        """
+        Test that the scraper needs the token and receives every bucket of the observed histograms.
+        """
+        send_outbox_emails.apply()
+        self.assertEqual(self.client.get('/metrics/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.get('/metrics/', headers={'Authorization': 'Bearer scrape-token'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.content.decode()
+        self.assertIn('# TYPE celery_task_runtime_seconds histogram', body)
+        self.assertIn('celery_task_runtime_seconds_bucket{task="users.tasks.send_outbox_emails",le="+Inf"} 1', body)
+        self.assertIn('celery_task_runtime_seconds_bucket{task="users.tasks.send_outbox_emails",le="0.005"}', body)
+        self.assertIn('celery_tasks_total{task="users.tasks.send_outbox_emails",state="SUCCESS"} 1', body)
+
+        with self.settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get('/metrics/').status_code, status.HTTP_404_NOT_FOUND)